@@ -0,0 +1,61 @@
+"""Add sync_runs table
+
+Revision ID: 3f9a0c5e1d27
+Revises: b7d41c2a9e63
+Create Date: 2026-10-19 11:03:27.904116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a0c5e1d27'
+down_revision: Union[str, None] = 'b7d41c2a9e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sync_runs',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('SYNC', 'TIMELINE_GENERATION', name='syncrunkindenum'), nullable=False),
+    sa.Column('trigger', sa.Enum('MANUAL', 'SCHEDULED', name='syncruntriggerenum'), nullable=False),
+    sa.Column('status', sa.Enum('COMPLETED', 'FAILED', name='syncrunstatusenum'), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('duration_ms', sa.Integer(), nullable=False),
+    sa.Column('step_durations_ms', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('requests_total', sa.Integer(), nullable=False),
+    sa.Column('requests_by_endpoint', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('not_modified_responses', sa.Integer(), nullable=False),
+    sa.Column('bytes_received', sa.BigInteger(), nullable=False),
+    sa.Column('rows_written', sa.Integer(), nullable=False),
+    sa.Column('rows_written_by_table', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('rate_limited_responses', sa.Integer(), nullable=False),
+    sa.Column('min_rate_limit_remaining', sa.Integer(), nullable=True),
+    sa.Column('llm_calls', sa.Integer(), nullable=False),
+    sa.Column('llm_tokens', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sync_runs_id'), 'sync_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_sync_runs_started_at'), 'sync_runs', ['started_at'], unique=False)
+    op.create_index(op.f('ix_sync_runs_user_id'), 'sync_runs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_sync_runs_user_id'), table_name='sync_runs')
+    op.drop_index(op.f('ix_sync_runs_started_at'), table_name='sync_runs')
+    op.drop_index(op.f('ix_sync_runs_id'), table_name='sync_runs')
+    op.drop_table('sync_runs')
+    sa.Enum(name='syncrunstatusenum').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='syncruntriggerenum').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='syncrunkindenum').drop(op.get_bind(), checkfirst=True)
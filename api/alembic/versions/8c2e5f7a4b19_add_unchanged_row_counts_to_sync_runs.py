@@ -0,0 +1,38 @@
+"""Add inserted and unchanged row counts to sync_runs
+
+Revision ID: 8c2e5f7a4b19
+Revises: 3f9a0c5e1d27
+Create Date: 2026-10-19 13:41:08.227390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e5f7a4b19'
+down_revision: Union[str, None] = '3f9a0c5e1d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sync_runs', sa.Column('rows_inserted', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('sync_runs', sa.Column('rows_unchanged', sa.Integer(), server_default='0', nullable=False))
+    op.add_column(
+        'sync_runs',
+        sa.Column(
+            'rows_unchanged_by_table', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sync_runs', 'rows_unchanged_by_table')
+    op.drop_column('sync_runs', 'rows_unchanged')
+    op.drop_column('sync_runs', 'rows_inserted')
@@ -0,0 +1,60 @@
+"""Add indexes for hot queries
+
+Revision ID: a41f6b9d2c85
+Revises: d5a8e3c61f42
+Create Date: 2026-10-19 16:20:47.118350
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f6b9d2c85'
+down_revision: Union[str, None] = 'd5a8e3c61f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    (
+        'ix_github_commits_repository_id_profile_id_authored_at',
+        'github_commits',
+        ['repository_id', 'external_profile_id', 'authored_at'],
+        None,
+    ),
+    ('ix_github_issues_repository_id', 'github_issues', ['repository_id'], None),
+    ('ix_github_repositories_external_profile_id', 'github_repositories', ['external_profile_id'], None),
+    ('ix_external_profiles_user_id_platform', 'external_profiles', ['user_id', 'platform'], None),
+    ('ix_timelines_user_id_updated_at', 'timelines', ['user_id', 'updated_at'], None),
+    ('ix_timeline_nodes_timeline_id_start_date', 'timeline_nodes', ['timeline_id', 'start_date'], None),
+    ('ix_timeline_nodes_parent_id', 'timeline_nodes', ['parent_id'], 'parent_id IS NOT NULL'),
+    ('ix_node_artifacts_node_id', 'node_artifacts', ['node_id'], None),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY does not block writes, but cannot run inside a transaction. A build that
+    # fails leaves an INVALID index behind: drop it and rerun the migration.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
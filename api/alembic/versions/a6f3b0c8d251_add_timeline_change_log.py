@@ -0,0 +1,49 @@
+"""Add timeline change log
+
+Revision ID: a6f3b0c8d251
+Revises: d93a5c2e6b10
+Create Date: 2026-10-19 23:18:44.203571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f3b0c8d251'
+down_revision: Union[str, None] = 'd93a5c2e6b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'timeline_changes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('timeline_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('node_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.Enum('CREATED', 'UPDATED', 'DELETED', name='nodechangekind'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['timeline_id'], ['timelines.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_timeline_changes_timeline_id_version', 'timeline_changes', ['timeline_id', 'version'], unique=False
+    )
+    op.create_index('ix_timeline_changes_created_at', 'timeline_changes', ['created_at'], unique=False)
+    op.add_column('timelines', sa.Column('change_log_floor', sa.Integer(), server_default='1', nullable=False))
+    # Nothing before this migration was logged, so existing timelines have no history to replay
+    op.execute('UPDATE timelines SET change_log_floor = version')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('timelines', 'change_log_floor')
+    op.drop_index('ix_timeline_changes_created_at', table_name='timeline_changes')
+    op.drop_index('ix_timeline_changes_timeline_id_version', table_name='timeline_changes')
+    op.drop_table('timeline_changes')
+    sa.Enum(name='nodechangekind').drop(op.get_bind(), checkfirst=True)
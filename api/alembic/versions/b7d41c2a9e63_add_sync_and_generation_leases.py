@@ -0,0 +1,49 @@
+"""Add sync and generation leases
+
+Revision ID: b7d41c2a9e63
+Revises: e770355d5b73
+Create Date: 2026-10-19 09:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41c2a9e63'
+down_revision: Union[str, None] = 'e770355d5b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('external_profiles', sa.Column('sync_lease_token', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('external_profiles', sa.Column('sync_lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        op.f('ix_external_profiles_sync_lease_expires_at'), 'external_profiles', ['sync_lease_expires_at'], unique=False
+    )
+    op.add_column(
+        'github_repositories', sa.Column('generation_lease_token', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.add_column(
+        'github_repositories', sa.Column('generation_lease_expires_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.create_index(
+        op.f('ix_github_repositories_generation_lease_expires_at'),
+        'github_repositories',
+        ['generation_lease_expires_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_github_repositories_generation_lease_expires_at'), table_name='github_repositories')
+    op.drop_column('github_repositories', 'generation_lease_expires_at')
+    op.drop_column('github_repositories', 'generation_lease_token')
+    op.drop_index(op.f('ix_external_profiles_sync_lease_expires_at'), table_name='external_profiles')
+    op.drop_column('external_profiles', 'sync_lease_expires_at')
+    op.drop_column('external_profiles', 'sync_lease_token')
@@ -0,0 +1,29 @@
+"""Add version to timelines
+
+Revision ID: b8e1d4f07a29
+Revises: f2c6a0d9b813
+Create Date: 2026-10-19 21:47:35.902116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1d4f07a29'
+down_revision: Union[str, None] = 'f2c6a0d9b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant server default is a metadata-only change in Postgres 11+, so existing rows are not rewritten
+    op.add_column('timelines', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('timelines', 'version')
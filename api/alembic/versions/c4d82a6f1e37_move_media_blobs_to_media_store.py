@@ -0,0 +1,133 @@
+"""Move media blobs to the media store
+
+Revision ID: c4d82a6f1e37
+Revises: e7b3c9a1d054
+Create Date: 2026-10-19 19:12:47.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.util import await_only
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d82a6f1e37'
+down_revision: Union[str, None] = 'e7b3c9a1d054'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Blobs are held in memory a batch at a time.
+BATCH_SIZE = 100
+
+node_artifacts = sa.table(
+    'node_artifacts',
+    sa.column('id', sa.Integer),
+    sa.column('media_data', sa.LargeBinary),
+    sa.column('content_hash', sa.String),
+    sa.column('size_bytes', sa.BigInteger),
+)
+users = sa.table(
+    'users',
+    sa.column('id', sa.Integer),
+    sa.column('avatar_blob', sa.LargeBinary),
+    sa.column('avatar_hash', sa.String),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('node_artifacts', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('node_artifacts', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+    op.add_column('users', sa.Column('avatar_hash', sa.String(length=64), nullable=True))
+
+    # Each batch commits on its own; rows already moved are skipped, so an interrupted run just resumes.
+    with op.get_context().autocommit_block():
+        move_blobs_to_store(
+            node_artifacts, node_artifacts.c.media_data, node_artifacts.c.content_hash, node_artifacts.c.size_bytes
+        )
+        move_blobs_to_store(users, users.c.avatar_blob, users.c.avatar_hash)
+
+    with op.batch_alter_table('node_artifacts') as batch_op:
+        batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.alter_column('size_bytes', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column('media_data')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('avatar_blob')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('node_artifacts', sa.Column('media_data', sa.LargeBinary(), nullable=True))
+    op.add_column('users', sa.Column('avatar_blob', sa.LargeBinary(), nullable=True))
+
+    # Files stay in the store; only copies are read back into the rows.
+    with op.get_context().autocommit_block():
+        copy_blobs_from_store(node_artifacts, node_artifacts.c.media_data, node_artifacts.c.content_hash)
+        copy_blobs_from_store(users, users.c.avatar_blob, users.c.avatar_hash)
+
+    with op.batch_alter_table('node_artifacts') as batch_op:
+        batch_op.alter_column('media_data', existing_type=sa.LargeBinary(), nullable=False)
+        batch_op.drop_column('size_bytes')
+        batch_op.drop_column('content_hash')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('avatar_hash')
+
+
+def media_store():
+    # Imported here so the app's settings are only needed when there are blobs to move.
+    from src.services.factory import ServiceFactory
+
+    return ServiceFactory.create_media_store()
+
+
+def move_blobs_to_store(
+    table: sa.TableClause, blob: sa.ColumnClause, hash_: sa.ColumnClause, size: sa.ColumnClause | None = None
+) -> None:
+    """Write every blob to the media store and record its key (and size) on the row."""
+    bind = op.get_bind()
+    store = None
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, blob)
+            .where(table.c.id > last_id, blob.is_not(None), hash_.is_(None))
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        store = store or media_store()
+
+        # Migrations run inside the async engine's greenlet, so the store's coroutines can be awaited from here
+        moved = []
+        for row_id, data in rows:
+            values = {'b_id': row_id, hash_.name: await_only(store.save_bytes(data))}
+            if size is not None:
+                values[size.name] = len(data)
+            moved.append(values)
+
+        bind.execute(sa.update(table).where(table.c.id == sa.bindparam('b_id')), moved)
+
+
+def copy_blobs_from_store(table: sa.TableClause, blob: sa.ColumnClause, hash_: sa.ColumnClause) -> None:
+    """Read every stored file back into the row that references it."""
+    bind = op.get_bind()
+    store = None
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, hash_)
+            .where(table.c.id > last_id, hash_.is_not(None))
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        store = store or media_store()
+
+        copied = [{'b_id': row_id, blob.name: await_only(store.read(key))} for row_id, key in rows]
+        bind.execute(sa.update(table).where(table.c.id == sa.bindparam('b_id')), copied)
@@ -0,0 +1,88 @@
+"""Compact github_commits.files and add github_commit_patches
+
+Revision ID: d5a8e3c61f42
+Revises: 8c2e5f7a4b19
+Create Date: 2026-10-19 14:58:31.604117
+
+"""
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a8e3c61f42'
+down_revision: Union[str, None] = '8c2e5f7a4b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COMPACT_FILE_FIELDS = ('filename', 'status', 'additions', 'deletions')
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('github_commit_patches',
+    sa.Column('sha', sa.String(), nullable=False),
+    sa.Column('patches', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['sha'], ['github_commits.sha'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('sha')
+    )
+
+    # Statements commit as they run, so a large table is never rewritten in one long transaction.
+    with op.get_context().autocommit_block():
+        compact_commit_files()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Compacted file lists stay compact; patch text stored meanwhile is dropped with its table.
+    op.drop_table('github_commit_patches')
+
+
+def compact_commit_files() -> None:
+    """Strip every stored file down to its summary, moving existing patch text to github_commit_patches."""
+    bind = op.get_bind()
+    commits = sa.table('github_commits', sa.column('sha', sa.String), sa.column('files', postgresql.JSONB))
+    patches_table = sa.table('github_commit_patches', sa.column('sha', sa.String), sa.column('patches', sa.LargeBinary))
+
+    last_sha = ''
+    while True:
+        rows = bind.execute(
+            sa.select(commits.c.sha, commits.c.files)
+            .where(commits.c.sha > last_sha, commits.c.files.is_not(None))
+            .order_by(commits.c.sha)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_sha = rows[-1].sha
+
+        compacted = []
+        patches = []
+        for sha, files in rows:
+            if all(set(file) <= set(COMPACT_FILE_FIELDS) for file in files):
+                continue
+            compacted.append(
+                {'b_sha': sha, 'files': [{k: file.get(k) for k in COMPACT_FILE_FIELDS} for file in files]}
+            )
+            file_patches = {file['filename']: file['patch'] for file in files if file.get('patch')}
+            if file_patches:
+                patches.append(
+                    {'sha': sha, 'patches': zlib.compress(json.dumps(file_patches, sort_keys=True).encode())}
+                )
+
+        # Patches are (re)written before the files they came from are compacted, so a batch interrupted
+        # between statements is simply redone on the next run.
+        if patches:
+            bind.execute(patches_table.delete().where(patches_table.c.sha.in_([p['sha'] for p in patches])))
+            bind.execute(sa.insert(patches_table), patches)
+        if compacted:
+            bind.execute(
+                sa.update(commits).where(commits.c.sha == sa.bindparam('b_sha')).values(files=sa.bindparam('files')),
+                compacted,
+            )
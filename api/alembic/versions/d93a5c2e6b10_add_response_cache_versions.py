@@ -0,0 +1,32 @@
+"""Add response cache versions
+
+Revision ID: d93a5c2e6b10
+Revises: b8e1d4f07a29
+Create Date: 2026-10-19 22:31:08.614920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93a5c2e6b10'
+down_revision: Union[str, None] = 'b8e1d4f07a29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('timelines_version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column(
+        'external_profiles', sa.Column('repositories_version', sa.Integer(), server_default='1', nullable=False)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('external_profiles', 'repositories_version')
+    op.drop_column('users', 'timelines_version')
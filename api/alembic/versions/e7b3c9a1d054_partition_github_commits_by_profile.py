@@ -0,0 +1,161 @@
+"""Partition github_commits by external profile
+
+Revision ID: e7b3c9a1d054
+Revises: a41f6b9d2c85
+Create Date: 2026-10-19 17:42:09.531870
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c9a1d054'
+down_revision: Union[str, None] = 'a41f6b9d2c85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match the settings `python -m src.workers.partitions` runs with.
+PARTITION_PROFILES = int(os.getenv('GITHUB_COMMIT_PARTITION_PROFILES', '10000'))
+PARTITIONS_AHEAD = int(os.getenv('GITHUB_COMMIT_PARTITIONS_AHEAD', '2'))
+
+# (name, columns)
+COMMIT_INDEXES = [
+    ('ix_github_commits_sha', ['sha']),
+    ('ix_github_commits_authored_at', ['authored_at']),
+    ('ix_github_commits_repository_id_profile_id_authored_at', ['repository_id', 'external_profile_id', 'authored_at']),
+]
+COMMIT_FOREIGN_KEYS = [
+    ('fk_github_commits_external_profile_id_external_profiles', 'external_profiles', 'external_profile_id'),
+    ('fk_github_commits_repository_id_github_repositories', 'github_repositories', 'repository_id'),
+]
+PATCHES_FK = 'fk_github_commit_patches_external_profile_id_github_commits'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Patches follow their commit's new key, so they learn its profile first.
+    op.add_column('github_commit_patches', sa.Column('external_profile_id', sa.Integer(), nullable=True))
+    op.execute(
+        'UPDATE github_commit_patches SET external_profile_id = ('
+        'SELECT github_commits.external_profile_id FROM github_commits '
+        'WHERE github_commits.sha = github_commit_patches.sha)'
+    )
+    op.execute('DELETE FROM github_commit_patches WHERE external_profile_id IS NULL')
+
+    with op.batch_alter_table('github_commit_patches') as batch_op:
+        batch_op.drop_constraint(referencing_fk('github_commit_patches'), type_='foreignkey')
+
+    if op.get_bind().dialect.name == 'postgresql':
+        partition_commits()
+    else:
+        with op.batch_alter_table('github_commits') as batch_op:
+            batch_op.drop_constraint('pk_github_commits', type_='primary')
+            batch_op.create_primary_key('pk_github_commits', ['external_profile_id', 'sha'])
+
+    with op.batch_alter_table('github_commit_patches') as batch_op:
+        batch_op.alter_column('external_profile_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_constraint('pk_github_commit_patches', type_='primary')
+        batch_op.create_primary_key('pk_github_commit_patches', ['external_profile_id', 'sha'])
+        batch_op.create_foreign_key(
+            PATCHES_FK,
+            'github_commits',
+            ['external_profile_id', 'sha'],
+            ['external_profile_id', 'sha'],
+            ondelete='CASCADE',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # A commit synced by several profiles keeps the copy (and patches) of the oldest profile.
+    op.execute(
+        'DELETE FROM github_commit_patches WHERE EXISTS (SELECT 1 FROM github_commit_patches AS other '
+        'WHERE other.sha = github_commit_patches.sha '
+        'AND other.external_profile_id < github_commit_patches.external_profile_id)'
+    )
+    with op.batch_alter_table('github_commit_patches') as batch_op:
+        batch_op.drop_constraint(PATCHES_FK, type_='foreignkey')
+
+    if op.get_bind().dialect.name == 'postgresql':
+        unpartition_commits()
+    else:
+        op.execute(
+            'DELETE FROM github_commits WHERE EXISTS (SELECT 1 FROM github_commits AS other '
+            'WHERE other.sha = github_commits.sha AND other.external_profile_id < github_commits.external_profile_id)'
+        )
+        with op.batch_alter_table('github_commits') as batch_op:
+            batch_op.drop_constraint('pk_github_commits', type_='primary')
+            batch_op.create_primary_key('pk_github_commits', ['sha'])
+
+    with op.batch_alter_table('github_commit_patches') as batch_op:
+        batch_op.drop_constraint('pk_github_commit_patches', type_='primary')
+        batch_op.create_primary_key('pk_github_commit_patches', ['sha'])
+        batch_op.drop_column('external_profile_id')
+        batch_op.create_foreign_key(
+            'fk_github_commit_patches_sha_github_commits', 'github_commits', ['sha'], ['sha'], ondelete='CASCADE'
+        )
+
+
+def referencing_fk(table: str) -> str:
+    """Name of the foreign key from `table` to github_commits, whatever the database named it."""
+    [fk] = [fk for fk in sa.inspect(op.get_bind()).get_foreign_keys(table) if fk['referred_table'] == 'github_commits']
+    return fk['name']
+
+
+def partition_commits() -> None:
+    """Rebuild github_commits as a table range-partitioned by external_profile_id and copy every row over."""
+    bind = op.get_bind()
+    old_pk = sa.inspect(bind).get_pk_constraint('github_commits')['name']
+
+    # Runs in the migration's transaction: writers wait on the copy, readers see the old table until commit.
+    op.rename_table('github_commits', 'github_commits_unpartitioned')
+    op.drop_constraint(old_pk, 'github_commits_unpartitioned', type_='primary')
+    for name, _ in COMMIT_INDEXES:
+        op.drop_index(name, table_name='github_commits_unpartitioned', if_exists=True)
+
+    op.execute(
+        'CREATE TABLE github_commits (LIKE github_commits_unpartitioned INCLUDING DEFAULTS) '
+        'PARTITION BY RANGE (external_profile_id)'
+    )
+    op.create_primary_key('pk_github_commits', 'github_commits', ['external_profile_id', 'sha'])
+    for name, referred_table, column in COMMIT_FOREIGN_KEYS:
+        op.create_foreign_key(name, 'github_commits', referred_table, [column], ['id'], ondelete='CASCADE')
+    for name, columns in COMMIT_INDEXES:
+        op.create_index(name, 'github_commits', columns, unique=False)
+
+    op.execute('CREATE TABLE github_commits_default PARTITION OF github_commits DEFAULT')
+    max_profile_id = bind.scalar(sa.text('SELECT coalesce(max(id), 0) FROM external_profiles'))
+    for index in range(max_profile_id // PARTITION_PROFILES + PARTITIONS_AHEAD + 1):
+        op.execute(
+            f'CREATE TABLE github_commits_p{index} PARTITION OF github_commits '
+            f'FOR VALUES FROM ({index * PARTITION_PROFILES}) TO ({(index + 1) * PARTITION_PROFILES})'
+        )
+
+    op.execute('INSERT INTO github_commits SELECT * FROM github_commits_unpartitioned')
+    op.drop_table('github_commits_unpartitioned')
+
+
+def unpartition_commits() -> None:
+    """Rebuild github_commits as a plain table keyed by sha."""
+    op.rename_table('github_commits', 'github_commits_partitioned')
+    op.drop_constraint('pk_github_commits', 'github_commits_partitioned', type_='primary')
+    for name, _ in COMMIT_INDEXES:
+        op.drop_index(name, table_name='github_commits_partitioned')
+
+    op.execute('CREATE TABLE github_commits (LIKE github_commits_partitioned INCLUDING DEFAULTS)')
+    op.execute(
+        'INSERT INTO github_commits SELECT DISTINCT ON (sha) * FROM github_commits_partitioned '
+        'ORDER BY sha, external_profile_id'
+    )
+    op.create_primary_key('pk_github_commits', 'github_commits', ['sha'])
+    for name, referred_table, column in COMMIT_FOREIGN_KEYS:
+        op.create_foreign_key(name, 'github_commits', referred_table, [column], ['id'], ondelete='CASCADE')
+    for name, columns in COMMIT_INDEXES:
+        op.create_index(name, 'github_commits', columns, unique=False)
+
+    # Takes its partitions with it
+    op.execute('DROP TABLE github_commits_partitioned CASCADE')
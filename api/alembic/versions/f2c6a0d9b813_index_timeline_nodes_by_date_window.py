@@ -0,0 +1,42 @@
+"""Index timeline nodes by date window
+
+Revision ID: f2c6a0d9b813
+Revises: c4d82a6f1e37
+Create Date: 2026-10-19 21:04:12.530187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c6a0d9b813'
+down_revision: Union[str, None] = 'c4d82a6f1e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The new index starts with the old one's columns, so it serves every query the old one did
+OLD_INDEX = ('ix_timeline_nodes_timeline_id_start_date', ['timeline_id', 'start_date'])
+NEW_INDEX = ('ix_timeline_nodes_timeline_id_start_date_end_date', ['timeline_id', 'start_date', 'end_date'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built CONCURRENTLY so node writes are not blocked; the old index is only dropped once the new one exists
+    with op.get_context().autocommit_block():
+        name, columns = NEW_INDEX
+        op.create_index(
+            name, 'timeline_nodes', columns, unique=False, if_not_exists=True, postgresql_concurrently=True
+        )
+        op.drop_index(OLD_INDEX[0], table_name='timeline_nodes', if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        name, columns = OLD_INDEX
+        op.create_index(
+            name, 'timeline_nodes', columns, unique=False, if_not_exists=True, postgresql_concurrently=True
+        )
+        op.drop_index(NEW_INDEX[0], table_name='timeline_nodes', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,120 @@
+"""
+Compare commit ingest throughput of the single-statement upsert with the staged COPY + chunked merge path.
+
+Runs against an already migrated database (`alembic upgrade head`) and cleans up after itself:
+
+    DATABASE_URL=postgresql+asyncpg://... uv run python -m benchmarks.ingest_commits --rows 100000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+from src.db.bulk import staged_upsert
+from src.models.integrations import ExternalProfile, PlatformEnum
+from src.models.integrations.github import GithubCommit, GithubRepository
+from src.models.users import User
+
+UPDATE_COLUMNS = ["message", "authored_at", "additions", "deletions", "total", "files"]
+
+
+def synthetic_commits(count: int, profile_id: int, repo_id: int) -> list[dict[str, Any]]:
+    run = uuid.uuid4().hex[:8]
+    authored_at = datetime.now(timezone.utc)
+    return [
+        {
+            "sha": f"{run}{i:032x}",
+            "external_profile_id": profile_id,
+            "repository_id": repo_id,
+            "author_id": 1,
+            "message": f"Synthetic commit {i}",
+            "authored_at": authored_at,
+            "html_url": f"https://github.com/bench/bench/commit/{run}{i:032x}",
+            "additions": i % 50,
+            "deletions": i % 7,
+            "total": i % 50 + i % 7,
+            "files": [{"filename": f"src/module_{i % 100}.py", "status": "modified", "additions": 1, "deletions": 0}],
+        }
+        for i in range(count)
+    ]
+
+
+async def legacy_upsert(db: AsyncSession, rows: list[dict[str, Any]]) -> int:
+    """The previous path: one executemany INSERT ... ON CONFLICT ... RETURNING over every row."""
+    insert = sqlite.insert if db.bind.dialect.name == "sqlite" else postgresql.insert
+    stmt = insert(GithubCommit)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GithubCommit.external_profile_id, GithubCommit.sha],
+        set_={name: stmt.excluded[name] for name in UPDATE_COLUMNS},
+    ).returning(GithubCommit)
+    result = await db.execute(stmt, rows)
+    return len(result.scalars().all())
+
+
+async def staged(db: AsyncSession, rows: list[dict[str, Any]]) -> int:
+    merged = await staged_upsert(
+        db=db,
+        model=GithubCommit,
+        rows=rows,
+        conflict_columns=["external_profile_id", "sha"],
+        update_columns=UPDATE_COLUMNS,
+    )
+    return len(merged.rows)
+
+
+async def main(database_url: str, rows: int) -> None:
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async with session_factory() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex}@example.com", name="Ingest Benchmark", hashed_password="x")  # noqa: S106
+        db.add(user)
+        await db.flush()
+        profile = ExternalProfile(external_id=user.id, user_id=user.id, platform=PlatformEnum.GITHUB)
+        db.add(profile)
+        await db.flush()
+        repo = GithubRepository(
+            external_profile_id=profile.id,
+            github_repo_id=-user.id,
+            name="bench",
+            full_name="bench/bench",
+            html_url="https://github.com/bench/bench",
+            stargazers_count=0,
+            forks_count=0,
+            is_fork=False,
+            repo_created_at=datetime.now(timezone.utc),
+            repo_updated_at=datetime.now(timezone.utc),
+        )
+        db.add(repo)
+        await db.commit()
+
+    try:
+        for name, upsert in (("single statement", legacy_upsert), ("staged + chunked merge", staged)):
+            data = synthetic_commits(count=rows, profile_id=profile.id, repo_id=repo.id)
+            async with session_factory() as db:
+                started = time.perf_counter()
+                written = await upsert(db, data)
+                await db.commit()
+                elapsed = time.perf_counter() - started
+            print(f"{name:<24} {written:>8} rows  {elapsed:8.2f}s  {written / elapsed:>10.0f} rows/s")  # noqa: T201
+    finally:
+        async with session_factory() as db:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    asyncio.run(main(database_url=args.database_url, rows=args.rows))
@@ -0,0 +1,120 @@
+"""
+Compare the timeline detail endpoint's ORM path (eager-loaded tree validated into the response schema) with
+the single query that is encoded to JSON straight from its rows.
+
+Runs against an already migrated database (`alembic upgrade head`) and cleans up after itself:
+
+    DATABASE_URL=postgresql+asyncpg://... uv run python -m benchmarks.timeline_tree --nodes 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.core.config import settings
+from src.models.node_artifacts import NodeArtifact
+from src.models.timeline_nodes import NodeType, TimelineNode
+from src.models.timelines import Timeline
+from src.models.users import User
+from src.schemas.timelines import Timeline as TimelineSchema
+from src.services.factory import ServiceFactory
+from src.services.timeline_service import TimelineService
+
+# One node in CHILD_EVERY hangs below the parent before it, and one in ARTIFACT_EVERY carries an artifact
+CHILD_EVERY = 4
+ARTIFACT_EVERY = 3
+RUNS = 5
+
+
+async def seed(session_factory: async_sessionmaker, user_id: int, nodes: int) -> int:
+    start = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    async with session_factory() as db:
+        timeline = Timeline(user_id=user_id, title=f"Tree benchmark ({nodes} nodes)")
+        db.add(timeline)
+        await db.flush()
+
+        parent_id = None
+        for i in range(nodes):
+            node = TimelineNode(
+                timeline_id=timeline.id,
+                parent_id=parent_id if i % CHILD_EVERY else None,
+                title=f"Node {i}",
+                description="A synthetic node with a sentence of description.",
+                type=NodeType.PROJECT,
+                start_date=start + timedelta(days=i),
+                end_date=start + timedelta(days=i + 30),
+                is_current=False,
+            )
+            db.add(node)
+            await db.flush()
+            if i % CHILD_EVERY == 0:
+                parent_id = node.id
+            if i % ARTIFACT_EVERY == 0:
+                await db.execute(
+                    insert(NodeArtifact).values(
+                        node_id=node.id,
+                        content_hash=f"{i:064x}",
+                        size_bytes=1,
+                        media_type="image/png",
+                        caption=f"Artifact {i}",
+                    )
+                )
+        await db.commit()
+        return timeline.id
+
+
+async def orm_tree(service: TimelineService, timeline_id: int, user_id: int) -> bytes:
+    """The previous path: load the ORM tree, then validate and dump it through the response schema."""
+    timeline = await service.get_timeline_details(timeline_id=timeline_id, user_id=user_id)
+    return TimelineSchema.model_validate(timeline).model_dump_json().encode()
+
+
+async def row_tree(service: TimelineService, timeline_id: int, user_id: int) -> bytes:
+    return await service.get_timeline_details_json(timeline_id=timeline_id, user_id=user_id)
+
+
+async def main(database_url: str, sizes: list[int]) -> None:
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    paths: tuple[tuple[str, Callable[[TimelineService, int, int], Awaitable[bytes]]], ...] = (
+        ("ORM + schema", orm_tree),
+        ("single query + rows", row_tree),
+    )
+
+    async with session_factory() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex}@example.com", name="Tree Benchmark", hashed_password="x")  # noqa: S106
+        db.add(user)
+        await db.commit()
+
+    try:
+        print(f"{'nodes':>8}  {'path':<22} {'best':>9}  {'bytes':>10}")  # noqa: T201
+        for nodes in sizes:
+            timeline_id = await seed(session_factory, user_id=user.id, nodes=nodes)
+            for name, load in paths:
+                timings = []
+                for _ in range(RUNS):
+                    async with session_factory() as db:
+                        service = ServiceFactory.create_timeline_service(db)
+                        started = time.perf_counter()
+                        encoded = await load(service, timeline_id, user.id)
+                        timings.append(time.perf_counter() - started)
+                print(f"{nodes:>8}  {name:<22} {min(timings) * 1000:>7.1f}ms  {len(encoded):>10}")  # noqa: T201
+    finally:
+        async with session_factory() as db:
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    args = parser.parse_args()
+    asyncio.run(main(database_url=args.database_url, sizes=args.nodes))
@@ -56,6 +56,16 @@ def redis_set(key: str, value: RedisEncodable, ex: int | None = None) -> None:
         raise ExternalServiceError(details={"error": str(e)}) from e
 
 
+def redis_delete(key: str) -> None:
+    """Wrapper around redis.delete with the same error handling as redis_set."""
+    try:
+        redis_client.delete(key)
+    except ConnectionError as e:
+        raise ExternalServiceError(Errors.REDIS_CONNECTION_ERROR.value, details={"error": str(e)}) from e
+    except Exception as e:
+        raise ExternalServiceError(details={"error": str(e)}) from e
+
+
 def redis_get(key: str, model: type[T] | None = None) -> T | str | None:
     """
     Wrapper around redis.get that optionally deserializes into a model.
@@ -0,0 +1,88 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from fastapi import Response, status
+from loguru import logger
+
+from src.core.redis_utils import redis_get, redis_set
+from src.exceptions.external import ExternalServiceError
+
+
+class ResponseCache:
+    """
+    Serialised responses in Redis, keyed by their ETag.
+
+    Tags embed the version of the data a response was built from (e.g. `timeline-12-v7`), and versions are
+    bumped in the same transaction as the writes, so a cached response is never stale: a write makes the
+    next read look up a new key, and superseded entries simply expire. A write committed between reading the
+    tag and building would pair newer content with the older tag, so the tag is read again after the build
+    and the response is only stored if it still holds. Concurrent misses for one tag in this
+    process are built once and shared (single-flight). Redis being down only costs the cache.
+    """
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._in_flight: dict[str, asyncio.Future[bytes]] = {}
+
+    async def get_or_build(
+        self, tag: str, build: Callable[[], Awaitable[bytes]], current_tag: Callable[[], Awaitable[str | None]]
+    ) -> bytes:
+        key = f"response:{tag}"
+        try:
+            cached = redis_get(key=key)
+        except ExternalServiceError as e:
+            logger.warning(f"Response cache lookup skipped Redis: {e.details}")
+            cached = None
+        if cached is not None:
+            return cached.encode()
+
+        pending = self._in_flight.get(key)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request building it was cancelled, so this one builds it instead
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            content = await build()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marks the exception as retrieved when no other request was waiting for it
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+        future.set_result(content)
+        if await current_tag() != tag:
+            logger.debug(f"Response for {tag} not cached: the data changed while it was built")
+            return content
+        try:
+            redis_set(key=key, value=content.decode(), ex=self.ttl_seconds)
+        except ExternalServiceError as e:
+            logger.warning(f"Response not cached: {e.details}")
+        return content
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header names the ETag (or is `*`)."""
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def cached_json_response(tag: str, content: bytes | None) -> Response:
+    """A JSON response revalidated by its ETag on every use, or a 304 when there is no content to send."""
+    headers = {"ETag": f'"{tag}"', "Cache-Control": "private, no-cache"}
+    if content is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,147 @@
+"""
+High-volume upserts through a staging table.
+
+Rows are first loaded into a temporary staging table — with asyncpg's binary COPY on Postgres, or an
+executemany INSERT on other drivers (SQLite in tests) — and then merged into the target table with
+INSERT ... SELECT ... ON CONFLICT in bounded chunks. Statement size no longer grows with the batch, so
+large accounts never hit Postgres' 32,767 bind-parameter limit, and COPY skips per-row statement cost.
+
+Conflicting rows are only updated when an incoming value differs (IS DISTINCT FROM), so re-syncing
+unchanged data writes no new row versions, WAL or index entries, and RETURNING ships back only the
+rows that were actually inserted or changed.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import BigInteger, Table, and_, column, func, or_, select, table, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from src.core.config import settings
+from src.db.database import Base
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+SEQ_COLUMN = "_seq"
+
+
+@dataclass
+class UpsertResult(Generic[ModelT]):
+    rows: list[ModelT] = field(default_factory=list)  # Inserted or changed rows only
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+async def staged_upsert(
+    db: AsyncSession,
+    model: type[ModelT],
+    rows: Sequence[dict[str, Any]],
+    conflict_columns: list[str],
+    update_columns: list[str],
+    chunk_size: int | None = None,
+) -> UpsertResult[ModelT]:
+    """
+    Insert `rows` into `model`'s table, updating `update_columns` of existing rows whose values differ.
+    Returns the inserted or changed rows as ORM objects, with counts. Does not commit.
+    """
+    rows = deduplicate(rows=rows, key_columns=conflict_columns)
+    if not rows:
+        return UpsertResult()
+
+    chunk_size = chunk_size or settings.INGEST_MERGE_CHUNK_SIZE
+    target: Table = model.__table__
+    columns = list(rows[0].keys())
+    stage_name = f"_stage_{target.name}"
+    stage = table(stage_name, *(column(name, target.c[name].type) for name in columns), column(SEQ_COLUMN, BigInteger))
+
+    conn = await db.connection()
+    await _create_stage(conn=conn, stage_name=stage_name, target=target, columns=columns)
+    try:
+        if conn.dialect.driver == "asyncpg":
+            await _copy_into_stage(conn=conn, stage_name=stage_name, target=target, columns=columns, rows=rows)
+        else:
+            await conn.execute(stage.insert(), [{**row, SEQ_COLUMN: seq} for seq, row in enumerate(rows)])
+
+        existing = await conn.scalar(
+            select(func.count())
+            .select_from(stage)
+            .join(target, and_(*(stage.c[name] == target.c[name] for name in conflict_columns)))
+        )
+
+        merged: list[ModelT] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = (
+                select(*(stage.c[name] for name in columns))
+                .where(stage.c[SEQ_COLUMN] >= start, stage.c[SEQ_COLUMN] < start + chunk_size)
+                # Touch conflicting rows in key order so concurrent syncs lock them in the same order.
+                .order_by(*(stage.c[name] for name in conflict_columns))
+            )
+            stmt = _dialect_insert(conn.dialect, model).from_select(columns, chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_columns,
+                set_={name: stmt.excluded[name] for name in update_columns},
+                where=or_(*(target.c[name].is_distinct_from(stmt.excluded[name]) for name in update_columns)),
+            ).returning(model)
+            # Refresh objects the session already holds instead of handing back their stale state.
+            result = await db.execute(stmt, execution_options={"populate_existing": True})
+            merged.extend(result.scalars().all())
+
+        inserted = len(rows) - existing
+        updated = len(merged) - inserted
+        return UpsertResult(rows=merged, inserted=inserted, updated=updated, unchanged=existing - updated)
+    finally:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {stage_name}"))
+
+
+def deduplicate(rows: Sequence[dict[str, Any]], key_columns: list[str]) -> list[dict[str, Any]]:
+    """Keep the last row per conflict key; ON CONFLICT cannot touch the same row twice in one statement."""
+    return list({tuple(row[name] for name in key_columns): row for row in rows}.values())
+
+
+async def _create_stage(conn: AsyncConnection, stage_name: str, target: Table, columns: list[str]) -> None:
+    """Create an empty temp table with the target's column types (and none of its constraints)."""
+    # Identifiers come from model metadata, never from request data.
+    column_list = ", ".join(f'"{name}"' for name in columns)
+    await conn.execute(text(f"DROP TABLE IF EXISTS {stage_name}"))
+    if conn.dialect.name == "postgresql":
+        await conn.execute(
+            text(
+                f"CREATE TEMP TABLE {stage_name} ON COMMIT DROP AS "  # noqa: S608
+                f"SELECT {column_list}, 0::bigint AS {SEQ_COLUMN} FROM {target.name} WITH NO DATA"
+            )
+        )
+    else:
+        await conn.execute(
+            text(
+                f"CREATE TEMP TABLE {stage_name} AS SELECT {column_list}, 0 AS {SEQ_COLUMN} FROM {target.name} WHERE 0"  # noqa: S608
+            )
+        )
+
+
+async def _copy_into_stage(
+    conn: AsyncConnection, stage_name: str, target: Table, columns: list[str], rows: list[dict[str, Any]]
+) -> None:
+    """Stream rows into the staging table with asyncpg's binary COPY, inside the session's transaction."""
+    # COPY bypasses SQLAlchemy, so apply the column types' bind processing (enums, JSON) ourselves.
+    processors = [target.c[name].type.bind_processor(conn.dialect) for name in columns]
+    records = [
+        (
+            *(process(row[name]) if process else row[name] for name, process in zip(columns, processors, strict=True)),
+            seq,
+        )
+        for seq, row in enumerate(rows)
+    ]
+    raw_connection = await conn.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        stage_name, records=records, columns=[*columns, SEQ_COLUMN]
+    )
+
+
+def _dialect_insert(dialect: Dialect, model: type[ModelT]) -> postgresql.Insert | sqlite.Insert:
+    if dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
@@ -1,7 +1,10 @@
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any
 
 from sqlalchemy import MetaData
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
@@ -9,10 +12,84 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.orm import DeclarativeBase
 
 from src.core.config import settings
+from src.db.pool import InstrumentedPool
+from src.db.routing import RoutingSession
+from src.schemas.db_pool import PoolStats
 
 DATABASE_URL = settings.DATABASE_URL
-engine = create_async_engine(DATABASE_URL)
-SessionLocal = async_sessionmaker(autocommit=False, expire_on_commit=False, autoflush=False, bind=engine)
+
+
+def engine_options(database_url: str, pool_size: int, max_overflow: int, pool_timeout: float) -> dict[str, Any]:
+    """Keyword arguments for `create_async_engine`, from the pool settings."""
+    options: dict[str, Any] = {
+        "poolclass": InstrumentedPool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if make_url(database_url).get_driver_name() == "asyncpg":
+        # asyncpg's own statement cache and SQLAlchemy's cache of asyncpg prepared statements
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
+
+def api_engine(database_url: str) -> AsyncEngine:
+    return create_async_engine(
+        database_url,
+        **engine_options(
+            database_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+def routing_sessionmaker(primary: AsyncEngine, replicas: Sequence[AsyncEngine]) -> async_sessionmaker[AsyncSession]:
+    """Sessions on `primary` whose read-only repository methods run on one of `replicas`."""
+    return async_sessionmaker(
+        autocommit=False,
+        expire_on_commit=False,
+        autoflush=False,
+        bind=primary,
+        sync_session_class=RoutingSession,
+        replicas=[replica.sync_engine for replica in replicas],
+    )
+
+
+# Serve request handlers
+engine = api_engine(DATABASE_URL)
+replica_engines = [api_engine(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+SessionLocal = routing_sessionmaker(primary=engine, replicas=replica_engines)
+
+# Serves background syncs, timeline generations and the standalone workers
+worker_engine = create_async_engine(
+    DATABASE_URL,
+    **engine_options(
+        DATABASE_URL,
+        pool_size=settings.WORKER_DB_POOL_SIZE,
+        max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+        pool_timeout=settings.WORKER_DB_POOL_TIMEOUT_SECONDS,
+    ),
+)
+WorkerSessionLocal = async_sessionmaker(autocommit=False, expire_on_commit=False, autoflush=False, bind=worker_engine)
+
+ENGINES: dict[str, AsyncEngine] = {
+    "api": engine,
+    "worker": worker_engine,
+    **{f"replica-{i}": replica for i, replica in enumerate(replica_engines)},
+}
+
+
+def pool_stats() -> list[PoolStats]:
+    """Current pool gauges of every engine in this process."""
+    return [db_engine.pool.stats(name) for name, db_engine in ENGINES.items()]
+
 
 POSTGRES_NAMING_CONVENTION = {
     "ix": "ix_%(column_0_label)s",
@@ -0,0 +1,36 @@
+"""SQL constructs that need different spellings on Postgres and on SQLite (tests)."""
+
+from typing import Any
+
+from sqlalchemy import JSON, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class json_array_field(FunctionElement):  # noqa: N801 - named like the SQL functions it stands for
+    """
+    The values of `field` across a JSON array of objects, as a JSON array.
+
+    `json_array_field(GithubCommit.files, "filename")` loads `["a.py", "b.py"]` instead of the whole
+    file list. A NULL array yields an empty list.
+    """
+
+    type = JSON()
+    inherit_cache = True
+
+    def __init__(self, array: ColumnElement[Any], field: str) -> None:
+        super().__init__(array, literal(field))
+
+
+@compiles(json_array_field, "postgresql")
+def _compile_json_array_field_postgresql(element: json_array_field, compiler: SQLCompiler, **kw: object) -> str:
+    array, field = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"coalesce(jsonb_path_query_array({array}, CAST('$[*].' || {field} AS jsonpath)), '[]'::jsonb)"
+
+
+@compiles(json_array_field, "sqlite")
+def _compile_json_array_field_sqlite(element: json_array_field, compiler: SQLCompiler, **kw: object) -> str:
+    array, field = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"(SELECT json_group_array(json_extract(value, '$.' || {field})) FROM json_each({array}))"  # noqa: S608
@@ -0,0 +1,88 @@
+"""
+Range partitions of `github_commits`, keyed by external profile id.
+
+Partition `github_commits_p<n>` holds profile ids `[n * size, (n + 1) * size)`, so all of a user's commits
+live in exactly one partition: their reads prune to it and disconnecting them deletes from it alone. Rows
+of profiles past the last partition land in `github_commits_default` until their partition is created.
+Other dialects have no partitions and every function here is a no-op on them.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+COMMITS_TABLE = "github_commits"
+DEFAULT_PARTITION = f"{COMMITS_TABLE}_default"
+
+
+def commit_partition_index(external_profile_id: int, size: int) -> int:
+    return external_profile_id // size
+
+
+def commit_partition_name(index: int) -> str:
+    return f"{COMMITS_TABLE}_p{index}"
+
+
+def commit_partition_bounds(index: int, size: int) -> tuple[int, int]:
+    """Lower (inclusive) and upper (exclusive) profile id of a partition."""
+    return index * size, (index + 1) * size
+
+
+async def ensure_commit_partitions(conn: AsyncConnection, size: int, ahead: int) -> list[str]:
+    """
+    Create every missing partition up to `ahead` partitions past the newest external profile.
+
+    Rows that already fell into the default partition for a new range are moved into it, together with
+    their patches. Returns the names of the partitions created.
+    """
+    if conn.dialect.name != "postgresql":
+        return []
+
+    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {COMMITS_TABLE} DEFAULT"))
+    max_profile_id = await conn.scalar(text("SELECT coalesce(max(id), 0) FROM external_profiles"))
+    existing = set(
+        await conn.scalars(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+            ),
+            {"parent": COMMITS_TABLE},
+        )
+    )
+
+    created = []
+    for index in range(commit_partition_index(max_profile_id, size) + ahead + 1):
+        name = commit_partition_name(index)
+        if name not in existing:
+            await _create_commit_partition(conn, name, *commit_partition_bounds(index, size))
+            created.append(name)
+    return created
+
+
+async def _create_commit_partition(conn: AsyncConnection, name: str, lower: int, upper: int) -> None:
+    # Postgres refuses to create a partition whose range still has rows in the default partition.
+    in_range = f"external_profile_id >= {lower} AND external_profile_id < {upper}"
+    stranded = await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"))  # noqa: S608 - integer bounds
+    if not stranded:
+        await conn.execute(
+            text(f"CREATE TABLE {name} PARTITION OF {COMMITS_TABLE} FOR VALUES FROM ({lower}) TO ({upper})")
+        )
+        return
+
+    # Deleting the commits cascades to their patches, so both are set aside first and written back
+    # through the parent once the partition exists.
+    await conn.execute(
+        text(f"CREATE TEMP TABLE _moved_commits ON COMMIT DROP AS SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}")  # noqa: S608
+    )
+    await conn.execute(
+        text(
+            "CREATE TEMP TABLE _moved_patches ON COMMIT DROP AS "
+            "SELECT github_commit_patches.* FROM github_commit_patches "
+            "JOIN _moved_commits USING (external_profile_id, sha)"
+        )
+    )
+    await conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"))  # noqa: S608
+    await conn.execute(text(f"CREATE TABLE {name} PARTITION OF {COMMITS_TABLE} FOR VALUES FROM ({lower}) TO ({upper})"))
+    await conn.execute(text(f"INSERT INTO {COMMITS_TABLE} SELECT * FROM _moved_commits"))  # noqa: S608
+    await conn.execute(text("INSERT INTO github_commit_patches SELECT * FROM _moved_patches"))
+    await conn.execute(text("DROP TABLE _moved_commits, _moved_patches"))
@@ -0,0 +1,62 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from src.schemas.db_pool import PoolStats
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that also records how long checkouts waited for a connection.
+
+    Occupancy (checked out, overflow) is read live from the pool; wait counters accumulate for the life
+    of the process, so a rising `wait_seconds_total` or any `timeouts` means the pool is too small for
+    the load it sees. Checkouts that timed out are counted apart, so they don't skew the average wait.
+    """
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.timeout_wait_seconds_total = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            self.timeout_wait_seconds_total += time.perf_counter() - start
+            raise
+
+        waited = time.perf_counter() - start
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        return entry
+
+    def recreate(self) -> "InstrumentedPool":
+        # Carry the counters over when the engine replaces the pool (e.g. after a disconnect storm).
+        pool = super().recreate()
+        pool.checkouts, pool.wait_seconds_total = self.checkouts, self.wait_seconds_total
+        pool.wait_seconds_max, pool.timeouts = self.wait_seconds_max, self.timeouts
+        pool.timeout_wait_seconds_total = self.timeout_wait_seconds_total
+        return pool
+
+    def stats(self, name: str) -> PoolStats:
+        return PoolStats(
+            name=name,
+            size=self.size(),
+            max_overflow=self._max_overflow,
+            checked_out=self.checkedout(),
+            checked_in=self.checkedin(),
+            overflow=max(self.overflow(), 0),
+            checkouts=self.checkouts,
+            wait_seconds_total=self.wait_seconds_total,
+            wait_seconds_max=self.wait_seconds_max,
+            timeouts=self.timeouts,
+            timeout_wait_seconds_total=self.timeout_wait_seconds_total,
+        )
@@ -0,0 +1,107 @@
+"""
+Read-replica routing.
+
+Sessions built with `RoutingSession` send every statement to their primary bind, except SELECTs issued
+inside a `@read_only` repository method, which go to one of the replicas. A session goes back to the
+primary for good once it writes, and so does every session of a user who wrote within the last
+REPLICA_STICKY_SECONDS (remembered in Redis), so users always read their own writes despite replica lag.
+Without replicas, or when Redis cannot say, everything goes to the primary.
+"""
+
+import functools
+import random
+from collections.abc import Awaitable, Callable, Sequence
+from contextvars import ContextVar
+from typing import Any, ParamSpec, TypeVar
+
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from src.core.config import settings
+from src.core.redis_db import redis_client
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_read_only: ContextVar[bool] = ContextVar("db_read_only", default=False)
+_current_user_id: ContextVar[int | None] = ContextVar("db_current_user_id", default=None)
+
+WROTE = "routing_wrote"
+STICKY = "routing_sticky"
+
+
+def read_only(method: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+    """Mark a repository method as safe to serve from a replica."""
+
+    @functools.wraps(method)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        token = _read_only.set(True)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+
+    return wrapper
+
+
+def bind_user(user_id: int) -> None:
+    """Attribute the current request's reads and writes to a user, for read-your-writes stickiness."""
+    _current_user_id.set(user_id)
+
+
+def sticky_key(user_id: int) -> str:
+    return f"db:primary_until:{user_id}"
+
+
+class RoutingSession(Session):
+    def __init__(self, *args: Any, replicas: Sequence[Engine] = (), **kwargs: Any) -> None:  # noqa: ANN401
+        super().__init__(*args, **kwargs)
+        # One replica per session, so its reads never go back in time by hopping to a laggier one
+        self.replica = random.choice(replicas) if replicas else None  # noqa: S311
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:  # noqa: ANN401
+        if (
+            self.replica is not None
+            and _read_only.get()
+            and getattr(clause, "is_select", False)
+            and not self._flushing
+            and not self.info.get(WROTE)
+            and not self.user_is_sticky()
+        ):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    def user_is_sticky(self) -> bool:
+        """Whether the current user wrote recently; asked once per session."""
+        if STICKY not in self.info:
+            user_id = _current_user_id.get()
+            try:
+                self.info[STICKY] = user_id is not None and bool(redis_client.exists(sticky_key(user_id)))
+            except RedisError as e:
+                logger.warning(f"Could not read replica stickiness for user {user_id}: {e}")
+                self.info[STICKY] = True
+        return self.info[STICKY]
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_statement_writes(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[WROTE] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_flush_writes(session: Session, flush_context: object) -> None:
+    session.info[WROTE] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_user_writes(session: Session) -> None:
+    user_id = _current_user_id.get()
+    if not session.info.get(WROTE) or user_id is None or not session.replica:
+        return
+    try:
+        redis_client.set(sticky_key(user_id), 1, ex=settings.REPLICA_STICKY_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Could not record replica stickiness for user {user_id}: {e}")
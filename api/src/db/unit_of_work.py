@@ -0,0 +1,40 @@
+from types import TracebackType
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing_extensions import Self
+
+DEPTH = "unit_of_work_depth"
+
+
+class UnitOfWork:
+    """
+    One transaction around the related writes of an operation.
+
+    Repositories never commit; they execute (and flush) into the session's open transaction. The service
+    owning the operation wraps those calls in `async with uow:`, which commits once when the block exits
+    cleanly and rolls everything back otherwise, so an operation is either fully written or not at all.
+
+    Blocks nest, on any UnitOfWork over the same session: only the outermost block commits, so a service
+    can call another service's unit of work from inside its own.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def __aenter__(self) -> Self:
+        self.db.info[DEPTH] = self.db.info.get(DEPTH, 0) + 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.db.info[DEPTH] -= 1
+        if self.db.info[DEPTH]:
+            return
+        if exc_type is None:
+            await self.db.commit()
+        else:
+            await self.db.rollback()
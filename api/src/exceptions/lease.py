@@ -0,0 +1,8 @@
+from src.exceptions.base import BaseCustomException
+
+
+class LeaseLostError(BaseCustomException):
+    """Raised when a background worker no longer holds the lease it was working under."""
+
+    def __init__(self, message: str = "Lease lost", details: dict = None) -> None:
+        super().__init__(message=message, status_code=409, error_code="LEASE_LOST", details=details)
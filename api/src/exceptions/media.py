@@ -0,0 +1,15 @@
+from src.exceptions.base import BaseCustomException
+
+
+class MediaNotFoundError(BaseCustomException):
+    """Raised when a stored media file is missing."""
+
+    def __init__(self, message: str = "Media not found", details: dict = None) -> None:
+        super().__init__(message=message, status_code=404, error_code="MEDIA_NOT_FOUND", details=details)
+
+
+class MediaTooLargeError(BaseCustomException):
+    """Raised when an upload exceeds its size limit."""
+
+    def __init__(self, message: str = "Uploaded file is too large", details: dict = None) -> None:
+        super().__init__(message=message, status_code=413, error_code="MEDIA_TOO_LARGE", details=details)
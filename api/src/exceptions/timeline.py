@@ -15,8 +15,22 @@ class TimelineNodeNotFoundError(BaseCustomException):
         super().__init__(message=message, status_code=404, error_code="TIMELINE_NODE_NOT_FOUND", details=details)
 
 
+class NodeArtifactNotFoundError(BaseCustomException):
+    """Raised when a node artifact is not found."""
+
+    def __init__(self, message: str = "Node artifact not found", details: dict = None) -> None:
+        super().__init__(message=message, status_code=404, error_code="NODE_ARTIFACT_NOT_FOUND", details=details)
+
+
 class InvalidTimelineNodeError(BaseCustomException):
     """Raised when a timeline node is invalid."""
 
     def __init__(self, message: str = "Invalid timeline node", details: dict = None) -> None:
         super().__init__(message=message, status_code=400, error_code="INVALID_TIMELINE_NODE", details=details)
+
+
+class InvalidTimelineWindowError(BaseCustomException):
+    """Raised when a requested date window of a timeline is invalid."""
+
+    def __init__(self, message: str = "Invalid timeline window", details: dict = None) -> None:
+        super().__init__(message=message, status_code=400, error_code="INVALID_TIMELINE_WINDOW", details=details)
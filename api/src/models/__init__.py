@@ -1,5 +1,6 @@
 from . import integrations
 from .node_artifacts import NodeArtifact
+from .timeline_changes import NodeChangeKind, TimelineChange
 from .timeline_nodes import DateGranularity, NodeType, TimelineNode
 from .timelines import Timeline
 from .users import User
@@ -12,4 +13,6 @@ __all__ = [
     "NodeType",
     "DateGranularity",
     "Timeline",
+    "TimelineChange",
+    "NodeChangeKind",
 ]
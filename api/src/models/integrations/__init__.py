@@ -1,10 +1,15 @@
 from . import github
 from .external_profiles import ExternalProfile, PlatformEnum, SyncStatusEnum, SyncStepEnum
+from .sync_runs import SyncRun, SyncRunKindEnum, SyncRunStatusEnum, SyncRunTriggerEnum
 
 __all__ = [
     "ExternalProfile",
     "PlatformEnum",
     "SyncStatusEnum",
     "SyncStepEnum",
+    "SyncRun",
+    "SyncRunKindEnum",
+    "SyncRunStatusEnum",
+    "SyncRunTriggerEnum",
     "github",
 ]
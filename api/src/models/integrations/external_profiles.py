@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy import Enum as SAEnum
 
 from src.db.database import Base
@@ -44,3 +44,10 @@ class ExternalProfile(Base, TimestampMixin):
     sync_step = Column(SAEnum(SyncStepEnum), default=SyncStepEnum.NONE, nullable=False)
     last_sync_error = Column(String, nullable=True)
     last_sync_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    # Fencing token, bumped on every acquisition, and expiry of the lease held by the running sync worker
+    sync_lease_token = Column(Integer, default=0, server_default="0", nullable=False)
+    sync_lease_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # Bumped by every write to the profile's repositories; cached responses of the list are keyed by it
+    repositories_version = Column(Integer, default=1, server_default="1", nullable=False)
+
+    __table_args__ = (Index("ix_external_profiles_user_id_platform", "user_id", "platform"),)
@@ -1,9 +1,11 @@
+from .github_commit_patches import GithubCommitPatch
 from .github_commits import GithubCommit, SignificanceLevel
 from .github_issues import GithubIssue
 from .github_repositories import GithubRepository
 
 __all__ = [
     "GithubCommit",
+    "GithubCommitPatch",
     "SignificanceLevel",
     "GithubIssue",
     "GithubRepository",
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, ForeignKeyConstraint, Integer, LargeBinary, String
+
+from src.db.database import Base
+
+
+class GithubCommitPatch(Base):
+    """Per-file patch text of a commit, kept out of `github_commits` and only read on demand."""
+
+    __tablename__ = "github_commit_patches"
+
+    external_profile_id = Column(Integer, primary_key=True)
+    sha = Column(String, primary_key=True)
+    patches = Column(LargeBinary, nullable=False)  # zlib-compressed JSON object of filename -> patch
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["external_profile_id", "sha"],
+            ["github_commits.external_profile_id", "github_commits.sha"],
+            ondelete="CASCADE",
+        ),
+    )
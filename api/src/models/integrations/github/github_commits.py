@@ -1,6 +1,6 @@
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, PrimaryKeyConstraint, String
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -17,7 +17,7 @@ class SignificanceLevel(str, Enum):
 class GithubCommit(Base):
     __tablename__ = "github_commits"
 
-    sha = Column(String, primary_key=True, index=True)
+    sha = Column(String, nullable=False, index=True)
     external_profile_id = Column(Integer, ForeignKey("external_profiles.id", ondelete="CASCADE"), nullable=False)
     author_id = Column(Integer, nullable=False)
     repository_id = Column(Integer, ForeignKey("github_repositories.id", ondelete="CASCADE"), nullable=False)
@@ -30,3 +30,17 @@ class GithubCommit(Base):
     files = Column(JSONB, nullable=True)
     significance_score = Column(Float, nullable=True, default=0.0)
     significance_classification = Column(SAEnum(SignificanceLevel), nullable=True)
+
+    __table_args__ = (
+        # The partition key has to be part of the primary key; the same commit may belong to several profiles
+        PrimaryKeyConstraint("external_profile_id", "sha"),
+        # Per-repo commit history, oldest first (timeline generation)
+        Index(
+            "ix_github_commits_repository_id_profile_id_authored_at",
+            "repository_id",
+            "external_profile_id",
+            "authored_at",
+        ),
+        # Each user's commits live in one partition (see src/db/partitions.py)
+        {"postgresql_partition_by": "RANGE (external_profile_id)"},
+    )
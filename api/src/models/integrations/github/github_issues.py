@@ -9,7 +9,9 @@ class GithubIssue(Base, TimestampMixin):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     external_profile_id = Column(Integer, ForeignKey("external_profiles.id", ondelete="CASCADE"), nullable=False)
-    repository_id = Column(Integer, ForeignKey("github_repositories.id", ondelete="CASCADE"), nullable=False)
+    repository_id = Column(
+        Integer, ForeignKey("github_repositories.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     github_issue_id = Column(BigInteger, nullable=False, unique=True, index=True)
     number = Column(Integer, nullable=False)
     state = Column(String, nullable=False)
@@ -17,7 +17,9 @@ class GithubRepository(Base):
     __tablename__ = "github_repositories"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    external_profile_id = Column(Integer, ForeignKey("external_profiles.id", ondelete="CASCADE"), nullable=False)
+    external_profile_id = Column(
+        Integer, ForeignKey("external_profiles.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     github_repo_id = Column(Integer, nullable=False, unique=True, index=True)
     name = Column(String, nullable=False)
     full_name = Column(String, nullable=False)
@@ -35,3 +37,6 @@ class GithubRepository(Base):
     )
     last_generation_attempt_at = Column(DateTime(timezone=True), nullable=True)
     last_generation_error = Column(String, nullable=True)
+    # Fencing token, bumped on every acquisition, and expiry of the lease held by the generating worker
+    generation_lease_token = Column(Integer, default=0, server_default="0", nullable=False)
+    generation_lease_expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
@@ -0,0 +1,52 @@
+from enum import Enum
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.db.database import Base
+
+
+class SyncRunKindEnum(str, Enum):
+    SYNC = "sync"  # GitHub data sync (repos, issues, commits)
+    TIMELINE_GENERATION = "timeline_generation"  # Timeline nodes generated from synced commits
+
+
+class SyncRunTriggerEnum(str, Enum):
+    MANUAL = "manual"  # Started by the user
+    SCHEDULED = "scheduled"  # Started by the auto-sync scheduler
+
+
+class SyncRunStatusEnum(str, Enum):
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class SyncRun(Base):
+    """One row per background sync or timeline generation run, for capacity planning."""
+
+    __tablename__ = "sync_runs"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(SAEnum(SyncRunKindEnum), nullable=False)
+    trigger = Column(SAEnum(SyncRunTriggerEnum), nullable=False)
+    status = Column(SAEnum(SyncRunStatusEnum), nullable=False)
+    error = Column(String, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    finished_at = Column(DateTime(timezone=True), nullable=False)
+    duration_ms = Column(Integer, nullable=False)
+    step_durations_ms = Column(JSONB, nullable=False, default=dict)
+    requests_total = Column(Integer, nullable=False, default=0)
+    requests_by_endpoint = Column(JSONB, nullable=False, default=dict)
+    not_modified_responses = Column(Integer, nullable=False, default=0)
+    bytes_received = Column(BigInteger, nullable=False, default=0)
+    rows_written = Column(Integer, nullable=False, default=0)
+    rows_written_by_table = Column(JSONB, nullable=False, default=dict)
+    rows_inserted = Column(Integer, nullable=False, default=0)  # Of rows_written; the rest were updates
+    rows_unchanged = Column(Integer, nullable=False, default=0)  # Upserted rows skipped as identical
+    rows_unchanged_by_table = Column(JSONB, nullable=False, default=dict)
+    rate_limited_responses = Column(Integer, nullable=False, default=0)
+    min_rate_limit_remaining = Column(Integer, nullable=True)
+    llm_calls = Column(Integer, nullable=False, default=0)
+    llm_tokens = Column(Integer, nullable=False, default=0)
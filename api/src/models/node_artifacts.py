@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.db.database import Base
@@ -10,8 +10,10 @@ class NodeArtifact(Base, TimestampMixin):
 
     __tablename__ = "node_artifacts"
     id = Column(Integer, primary_key=True, index=True)
-    node_id = Column(Integer, ForeignKey("timeline_nodes.id", ondelete="CASCADE"), nullable=False)
-    media_data = Column(LargeBinary, nullable=False)
+    node_id = Column(Integer, ForeignKey("timeline_nodes.id", ondelete="CASCADE"), nullable=False, index=True)
+    # The bytes live in the media store under their SHA-256; identical uploads share one file
+    content_hash = Column(String(64), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
     media_type = Column(String, nullable=False)
     caption = Column(String, nullable=True)
     node = relationship("TimelineNode", back_populates="media")
@@ -0,0 +1,31 @@
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, func
+from sqlalchemy import Enum as SAEnum
+
+from src.db.database import Base
+
+
+class NodeChangeKind(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+class TimelineChange(Base):
+    """One node change, recorded at the timeline version the change produced."""
+
+    __tablename__ = "timeline_changes"
+
+    id = Column(Integer, primary_key=True)
+    timeline_id = Column(Integer, ForeignKey("timelines.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    # Not a foreign key: deleted nodes stay in the log
+    node_id = Column(Integer, nullable=False)
+    kind = Column(SAEnum(NodeChangeKind), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_timeline_changes_timeline_id_version", "timeline_id", "version"),
+        Index("ix_timeline_changes_created_at", "created_at"),
+    )
@@ -1,6 +1,6 @@
 from enum import Enum
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.orm import backref, relationship
 
@@ -46,3 +46,15 @@ class TimelineNode(Base, TimestampMixin):
     timeline = relationship("Timeline", back_populates="nodes")
     media = relationship("NodeArtifact", back_populates="node", cascade="all, delete-orphan")
     children = relationship("TimelineNode", backref=backref("parent", remote_side=[id]), cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Also answers date-window reads: end_date is checked in the index, without visiting the rows
+        Index("ix_timeline_nodes_timeline_id_start_date_end_date", "timeline_id", "start_date", "end_date"),
+        # Most nodes are top-level; only children are ever looked up by parent
+        Index(
+            "ix_timeline_nodes_parent_id",
+            "parent_id",
+            postgresql_where=parent_id.is_not(None),
+            sqlite_where=parent_id.is_not(None),
+        ),
+    )
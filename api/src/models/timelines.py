@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from src.db.database import Base
@@ -15,4 +15,10 @@ class Timeline(Base, TimestampMixin):
     slug = Column(String, unique=True, index=True, nullable=True)
     is_public = Column(Boolean, default=False, nullable=False)
     default_zoom_level = Column(Integer, default=1)
+    # Bumped by every change to the timeline's nodes; caches derived from the nodes are keyed by it
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    # The change log holds every change after this version; older ones have been compacted away
+    change_log_floor = Column(Integer, default=1, server_default="1", nullable=False)
     nodes = relationship("TimelineNode", back_populates="timeline", cascade="all, delete-orphan")
+
+    __table_args__ = (Index("ix_timelines_user_id_updated_at", "user_id", "updated_at"),)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from sqlalchemy import Column, DateTime, Integer, String
 
 from src.db.database import Base
 from src.models.base import TimestampMixin
@@ -17,5 +17,7 @@ class User(Base, TimestampMixin):
 
     # Profile & Settings
     headline = Column(String, nullable=True)
-    avatar_blob = Column(LargeBinary, nullable=True)
+    avatar_hash = Column(String(64), nullable=True)  # Key of the image in the media store
     media_type = Column(String, nullable=True)
+    # Bumped whenever the user's list of timelines changes; cached responses of the list are keyed by it
+    timelines_version = Column(Integer, default=1, server_default="1", nullable=False)
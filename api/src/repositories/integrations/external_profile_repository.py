@@ -4,6 +4,9 @@ from typing import Annotated
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import Errors
+from src.db.routing import read_only
+from src.exceptions.lease import LeaseLostError
 from src.models.integrations import ExternalProfile, PlatformEnum, SyncStatusEnum, SyncStepEnum
 
 
@@ -14,7 +17,7 @@ class ExternalProfileRepository:
     async def create_external_profile(self, external_profile: ExternalProfile) -> ExternalProfile:
         """Create a new external profile in the database."""
         self.db.add(external_profile)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(external_profile)
         return external_profile
 
@@ -28,45 +31,165 @@ class ExternalProfileRepository:
         result = await self.db.execute(statement)
         return result.scalar_one_or_none()
 
+    @read_only
+    async def get_repositories_version(self, user_id: int, platform: PlatformEnum) -> tuple[int, int] | None:
+        """
+        (id, repositories_version) of the user's profile, read as columns so the version is current even when
+        the profile is already loaded in the session. Read from the same copy as the repository list it tags,
+        so a lagging replica's list is never cached under the primary's newer version.
+        """
+        statement = select(ExternalProfile.id, ExternalProfile.repositories_version).where(
+            ExternalProfile.user_id == user_id, ExternalProfile.platform == platform
+        )
+        row = (await self.db.execute(statement)).one_or_none()
+        return None if row is None else tuple(row)
+
+    async def get_external_profile_by_id(self, profile_id: int) -> ExternalProfile | None:
+        """Fetch an external profile by its primary key."""
+        statement = select(ExternalProfile).where(ExternalProfile.id == profile_id)
+        result = await self.db.execute(statement)
+        return result.scalar_one_or_none()
+
+    async def get_profiles_due_for_sync(
+        self,
+        platform: PlatformEnum,
+        synced_before: Annotated[datetime, "Profiles last synced before this (naive UTC) moment are due"],
+        limit: int,
+    ) -> list[int]:
+        """
+        Return the IDs of profiles whose data is stale and that are not currently syncing.
+        Never-synced profiles come first, then the stalest ones.
+        """
+        statement = (
+            select(ExternalProfile.id)
+            .where(
+                ExternalProfile.platform == platform,
+                ExternalProfile.sync_status != SyncStatusEnum.SYNCING,
+                ExternalProfile.refresh_token.is_not(None),
+                (ExternalProfile.last_synced_at.is_(None)) | (ExternalProfile.last_synced_at < synced_before),
+            )
+            .order_by(ExternalProfile.last_synced_at.asc().nulls_first(), ExternalProfile.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(statement)
+        return list(result.scalars().all())
+
+    async def mark_synced(
+        self, profile_id: Annotated[int, "The ID of the external profile that finished syncing"]
+    ) -> None:
+        """Stamp `last_synced_at` after a successful sync (the column stores naive UTC)."""
+        stmt = (
+            update(ExternalProfile)
+            .where(ExternalProfile.id == profile_id)
+            .values(last_synced_at=datetime.now(timezone.utc).replace(tzinfo=None))
+        )
+        await self.db.execute(stmt)
+
     async def update_external_profile(self, external_profile: ExternalProfile) -> ExternalProfile:
         """Merge and update an existing external profile in the database."""
         updated = await self.db.merge(external_profile)
-        await self.db.commit()
+        await self.db.flush()
         await self.db.refresh(updated)
         return updated
 
-    async def attempt_sync_lock(
+    async def acquire_sync_lease(
         self,
-        profile_id: Annotated[int, "The ID of the external profile to lock for synchronization"],
+        profile_id: Annotated[int, "The ID of the external profile to lease for synchronization"],
         platform: Annotated[PlatformEnum, "The platform of the external profile being synchronized"],
-    ) -> bool:
+        ttl: Annotated[timedelta, "How long the lease lives without a heartbeat"],
+    ) -> int | None:
         """
-        Atomically tries to set status to SYNCING.
-        Returns True if successful, False if it was already syncing.
+        Atomically takes the sync lease and sets status to SYNCING.
+        Returns the new fencing token, or None if a live lease is held by another worker.
         """
         now = datetime.now(timezone.utc)
-        stale_threshold = now - timedelta(minutes=15)
 
-        # ATOMIC UPDATE: "Set to SYNCING *ONLY IF* it is currently not syncing,
-        # OR if it's been syncing for more than 15 minutes (stale)."
+        # ATOMIC UPDATE: "Take the lease *ONLY IF* nobody holds it, or the holder stopped renewing it."
         stmt = (
             update(ExternalProfile)
             .where(
                 ExternalProfile.id == profile_id,
                 ExternalProfile.platform == platform,
-                (ExternalProfile.sync_status != SyncStatusEnum.SYNCING)
-                | (ExternalProfile.last_sync_attempt_at < stale_threshold),
+                ExternalProfile.sync_lease_expires_at.is_(None) | (ExternalProfile.sync_lease_expires_at < now),
             )
             .values(
                 sync_status=SyncStatusEnum.SYNCING,
                 last_sync_error=None,
+                last_sync_attempt_at=now,
+                sync_lease_token=ExternalProfile.sync_lease_token + 1,
+                sync_lease_expires_at=now + ttl,
+            )
+            .returning(ExternalProfile.sync_lease_token)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def renew_sync_lease(
+        self,
+        profile_id: Annotated[int, "The ID of the external profile whose lease is renewed"],
+        lease_token: Annotated[int, "Fencing token returned when the lease was acquired"],
+        ttl: Annotated[timedelta, "How long the lease lives without a heartbeat"],
+    ) -> bool:
+        """
+        Heartbeat: extend a lease that is still held and unexpired.
+        Returns False once the lease was reaped or taken over, after which the holder must stop writing.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = (
+            update(ExternalProfile)
+            .where(
+                ExternalProfile.id == profile_id,
+                ExternalProfile.sync_lease_token == lease_token,
+                ExternalProfile.sync_lease_expires_at > now,
+            )
+            .values(sync_lease_expires_at=now + ttl)
+        )
+        result = await self.db.execute(stmt)
+        return result.rowcount > 0
+
+    async def release_sync_lease(
+        self,
+        profile_id: Annotated[int, "The ID of the external profile whose lease is released"],
+        lease_token: Annotated[int, "Fencing token returned when the lease was acquired"],
+        status: SyncStatusEnum,
+        error: str | None = None,
+    ) -> bool:
+        """
+        Record the outcome of a sync and drop its lease.
+        A no-op (returns False) if the lease was already released, reaped or taken over.
+        """
+        stmt = (
+            update(ExternalProfile)
+            .where(
+                ExternalProfile.id == profile_id,
+                ExternalProfile.sync_lease_token == lease_token,
+                ExternalProfile.sync_lease_expires_at.is_not(None),
+            )
+            .values(
+                sync_status=status,
+                last_sync_error=error,
                 last_sync_attempt_at=datetime.now(timezone.utc),
+                sync_lease_expires_at=None,
             )
         )
         result = await self.db.execute(stmt)
-        await self.db.commit()
         return result.rowcount > 0
 
+    async def reap_expired_sync_leases(self) -> list[int]:
+        """Fail syncs whose worker stopped renewing its lease. Returns the reaped profile IDs."""
+        stmt = (
+            update(ExternalProfile)
+            .where(ExternalProfile.sync_lease_expires_at < datetime.now(timezone.utc))
+            .values(
+                sync_status=SyncStatusEnum.FAILED,
+                last_sync_error=Errors.SYNC_LEASE_EXPIRED.value,
+                sync_lease_expires_at=None,
+            )
+            .returning(ExternalProfile.id)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
     async def set_sync_status(
         self,
         profile_id: Annotated[int, "The ID of the external profile being updated"],
@@ -81,28 +204,32 @@ class ExternalProfileRepository:
             .returning(ExternalProfile)
         )
         result = await self.db.execute(stmt)
-        await self.db.commit()
         return result.scalar_one()
 
     async def set_sync_step(
-        self, profile_id: Annotated[int, "The ID of the external profile being updated"], step: SyncStepEnum
+        self,
+        profile_id: Annotated[int, "The ID of the external profile being updated"],
+        step: SyncStepEnum,
+        lease_token: Annotated[int | None, "When given, only write while this lease is still held"] = None,
     ) -> ExternalProfile:
         """Record the last successfully completed synchronization step."""
-        stmt = (
-            update(ExternalProfile)
-            .where(ExternalProfile.id == profile_id)
-            .values(sync_step=step)
-            .returning(ExternalProfile)
-        )
-        result = await self.db.execute(stmt)
-        await self.db.commit()
-        return result.scalar_one()
+        stmt = update(ExternalProfile).where(ExternalProfile.id == profile_id)
+        if lease_token is not None:
+            stmt = stmt.where(ExternalProfile.sync_lease_token == lease_token)
+
+        result = await self.db.execute(stmt.values(sync_step=step).returning(ExternalProfile))
+        if lease_token is None:
+            return result.scalar_one()
+
+        profile = result.scalar_one_or_none()
+        if profile is None:
+            raise LeaseLostError(Errors.LEASE_LOST.value, details={"profile_id": profile_id})
+        return profile
 
     async def delete_external_profile(self, profile_id: int) -> bool:
         """Delete an external profile from the database."""
         stmt = delete(ExternalProfile).where(ExternalProfile.id == profile_id)
         result = await self.db.execute(stmt)
-        await self.db.commit()
 
         # Returns True if a row was actually deleted, False otherwise
         return result.rowcount > 0
@@ -1,17 +1,30 @@
+import json
+import zlib
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
-from sqlalchemy import select, update
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import delete, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import Errors, settings
 from src.core.redis_utils import redis_get, redis_set
+from src.db.bulk import UpsertResult, staged_upsert
+from src.db.functions import json_array_field
+from src.db.routing import read_only
 from src.exceptions.external import GitHubIntegrationError
-from src.models.integrations.github import GithubCommit, GithubIssue
+from src.models.integrations import ExternalProfile
+from src.models.integrations.github import GithubCommit, GithubCommitPatch, GithubIssue
 from src.models.integrations.github import GithubRepository as GithubRepositoryModel
 from src.models.integrations.github.github_repositories import GenerationStatusEnum
-from src.schemas.integrations.github import Commit, GithubToken, Issue, Repository, StateRecord
+from src.schemas.integrations.github import (
+    COMPACT_FILE_FIELDS,
+    Commit,
+    CommitSummary,
+    GithubToken,
+    Issue,
+    Repository,
+    StateRecord,
+)
 
 
 class GithubRepository:
@@ -19,6 +32,7 @@ class GithubRepository:
         self.state_store: dict[str, StateRecord] = {}
         self.token_store: dict[str, GithubToken] = {}
         self.access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        self.COMMIT_SUMMARY_BATCH_SIZE = 1000
         self.db = db
 
     async def save_state(
@@ -70,14 +84,30 @@ class GithubRepository:
             )
         return token
 
-    async def get_commits_by_repo_id(self, repo_id: int, external_profile_id: int) -> list[GithubCommit]:
-        """Fetch commits from the database for a given repository ID."""
-        stmt = select(GithubCommit).where(
-            GithubCommit.repository_id == repo_id, GithubCommit.external_profile_id == external_profile_id
+    @read_only
+    async def get_commit_summaries_by_repo_id(self, repo_id: int, external_profile_id: int) -> list[CommitSummary]:
+        """
+        Fetch the fields timeline generation needs for a repository's commits, oldest first.
+        Only filenames are pulled out of `files`. Rows are fetched from the cursor in batches of
+        COMMIT_SUMMARY_BATCH_SIZE (`yield_per`), but the returned list holds them all.
+        """
+        stmt = (
+            select(
+                GithubCommit.sha,
+                GithubCommit.message,
+                GithubCommit.authored_at,
+                GithubCommit.significance_score,
+                GithubCommit.significance_classification,
+                json_array_field(GithubCommit.files, "filename"),
+            )
+            .where(GithubCommit.repository_id == repo_id, GithubCommit.external_profile_id == external_profile_id)
+            .order_by(GithubCommit.authored_at, GithubCommit.sha)
+            .execution_options(yield_per=self.COMMIT_SUMMARY_BATCH_SIZE)
         )
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
+        result = await self.db.stream(stmt)
+        return [CommitSummary(*row) async for row in result]
 
+    @read_only
     async def get_db_repositories(
         self, external_profile_id: Annotated[int, "Foreign key to ExternalProfile"]
     ) -> list[GithubRepositoryModel]:
@@ -86,6 +116,17 @@ class GithubRepository:
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def get_repositories_by_github_ids(
+        self, external_profile_id: int, github_repo_ids: list[int]
+    ) -> list[GithubRepositoryModel]:
+        """Fetch a profile's repositories by their GitHub IDs."""
+        stmt = select(GithubRepositoryModel).where(
+            GithubRepositoryModel.github_repo_id.in_(github_repo_ids),
+            GithubRepositoryModel.external_profile_id == external_profile_id,
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
     async def get_repositories_by_ids(
         self, external_profile_id: int, repo_ids: list[int]
     ) -> list[GithubRepositoryModel]:
@@ -96,46 +137,120 @@ class GithubRepository:
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
-    async def lock_repos_for_timeline_generation(self, repo_ids: list[int]) -> list[int]:
+    async def acquire_generation_leases(
+        self,
+        repo_ids: list[int],
+        ttl: Annotated[timedelta, "How long the leases live without a heartbeat"],
+    ) -> dict[int, int]:
         """
-        Atomically locks repositories for timeline generation.
-        Returns the list of repo IDs that were successfully locked.
-        Ignores any repos that are already in the process of generating.
+        Atomically leases repositories for timeline generation.
+        Returns a map of repo ID to fencing token for the repos that were successfully leased.
+        Skips any repos whose lease is still held by another worker.
         """
         if not repo_ids:
-            return []
+            return {}
 
         now = datetime.now(timezone.utc)
-        stale_threshold = now - timedelta(minutes=30)
 
         stmt = (
             update(GithubRepositoryModel)
             .where(
                 GithubRepositoryModel.id.in_(repo_ids),
-                # Only lock them if they are NOT generating right now,
-                # OR if they have been stuck generating for over 30 minutes
-                (GithubRepositoryModel.generation_status != GenerationStatusEnum.GENERATING)
-                | (GithubRepositoryModel.last_generation_attempt_at < stale_threshold),
+                # Only lease them if nobody holds the lease, or the holder stopped renewing it
+                GithubRepositoryModel.generation_lease_expires_at.is_(None)
+                | (GithubRepositoryModel.generation_lease_expires_at < now),
             )
-            .values(generation_status=GenerationStatusEnum.GENERATING, last_generation_attempt_at=now)
-            .returning(GithubRepositoryModel.id)
+            .values(
+                generation_status=GenerationStatusEnum.GENERATING,
+                last_generation_attempt_at=now,
+                last_generation_error=None,
+                generation_lease_token=GithubRepositoryModel.generation_lease_token + 1,
+                generation_lease_expires_at=now + ttl,
+            )
+            .returning(GithubRepositoryModel.id, GithubRepositoryModel.generation_lease_token)
         )
 
         result = await self.db.execute(stmt)
-        await self.db.commit()
+        leased = dict(result.tuples().all())
+        await self._bump_repositories_version(repo_ids=list(leased))
+        return leased
+
+    async def renew_generation_leases(
+        self,
+        leases: Annotated[dict[int, int], "Repo ID to fencing token"],
+        ttl: Annotated[timedelta, "How long the leases live without a heartbeat"],
+    ) -> bool:
+        """
+        Heartbeat: extend every lease in the batch.
+        Returns False if any of them was reaped or taken over, after which the holder must stop writing.
+        """
+        if not leases:
+            return True
+
+        now = datetime.now(timezone.utc)
+        stmt = (
+            update(GithubRepositoryModel)
+            .where(
+                tuple_(GithubRepositoryModel.id, GithubRepositoryModel.generation_lease_token).in_(
+                    list(leases.items())
+                ),
+                GithubRepositoryModel.generation_lease_expires_at > now,
+            )
+            .values(generation_lease_expires_at=now + ttl)
+        )
+        result = await self.db.execute(stmt)
+        return result.rowcount == len(leases)
+
+    async def release_generation_leases(
+        self,
+        leases: Annotated[dict[int, int], "Repo ID to fencing token"],
+        status: GenerationStatusEnum,
+        error: str | None = None,
+    ) -> None:
+        """Record the generation outcome and drop the leases that are still held by this worker."""
+        if not leases:
+            return
 
-        return list(result.scalars().all())
+        stmt = (
+            update(GithubRepositoryModel)
+            .where(
+                tuple_(GithubRepositoryModel.id, GithubRepositoryModel.generation_lease_token).in_(
+                    list(leases.items())
+                ),
+                GithubRepositoryModel.generation_lease_expires_at.is_not(None),
+            )
+            .values(generation_status=status, last_generation_error=error, generation_lease_expires_at=None)
+        )
+        await self.db.execute(stmt)
+        await self._bump_repositories_version(repo_ids=list(leases))
+
+    async def reap_expired_generation_leases(self) -> list[int]:
+        """Fail timeline generations whose worker stopped renewing its lease. Returns the reaped repo IDs."""
+        stmt = (
+            update(GithubRepositoryModel)
+            .where(GithubRepositoryModel.generation_lease_expires_at < datetime.now(timezone.utc))
+            .values(
+                generation_status=GenerationStatusEnum.FAILED,
+                last_generation_error=Errors.GENERATION_LEASE_EXPIRED.value,
+                generation_lease_expires_at=None,
+            )
+            .returning(GithubRepositoryModel.id)
+        )
+        result = await self.db.execute(stmt)
+        reaped = list(result.scalars().all())
+        await self._bump_repositories_version(repo_ids=reaped)
+        return reaped
 
     async def bulk_upsert_repositories(
         self, repos_data: list[Repository], external_profile_id: Annotated[int, "Foreign key to ExternalProfile"]
-    ) -> list[GithubRepositoryModel]:
+    ) -> UpsertResult[GithubRepositoryModel]:
         """
-        Bulk insert or update repository data in a single call.
+        Bulk insert or update repository data through a staging table.
 
-        If a repo already exists, it will be updated; otherwise, a new record will be inserted.
+        If a repo already exists, it is updated only when something changed; otherwise, a new record is inserted.
         """
         if not repos_data:
-            return []
+            return UpsertResult()
 
         insert_values = [
             {
@@ -155,33 +270,26 @@ class GithubRepository:
             for repo in repos_data
         ]
 
-        stmt = insert(GithubRepositoryModel)
-
-        stmt = stmt.on_conflict_do_update(
-            index_elements=[GithubRepositoryModel.github_repo_id],
-            set_={
-                "name": stmt.excluded.name,
-                "description": stmt.excluded.description,
-                "language": stmt.excluded.language,
-                "stargazers_count": stmt.excluded.stargazers_count,
-                "forks_count": stmt.excluded.forks_count,
-                "repo_updated_at": stmt.excluded.repo_updated_at,
-            },
-        ).returning(GithubRepositoryModel)
-
-        result = await self.db.execute(stmt, insert_values)
-        await self.db.commit()
-        return result.scalars().all()
+        upserted = await staged_upsert(
+            db=self.db,
+            model=GithubRepositoryModel,
+            rows=insert_values,
+            conflict_columns=["github_repo_id"],
+            update_columns=["name", "description", "language", "stargazers_count", "forks_count", "repo_updated_at"],
+        )
+        if upserted.rows:
+            await self._bump_repositories_version(external_profile_id=external_profile_id)
+        return upserted
 
     async def bulk_upsert_issues(
         self,
         issue_data: list[Issue],
         external_profile_id: Annotated[int, "Foreign key to ExternalProfile"],
         repo_id_map: Annotated[dict[str, int], "Mapping of GitHub repo full_name → DB ID"],
-    ) -> list[GithubIssue]:
-        """Performs a bulk insert/update for a list of issues."""
+    ) -> UpsertResult[GithubIssue]:
+        """Performs a bulk insert/update for a list of issues, skipping unchanged ones."""
         if not issue_data:
-            return []
+            return UpsertResult()
 
         insert_values = []
         for issue in issue_data:
@@ -205,36 +313,35 @@ class GithubRepository:
                 )
 
         if not insert_values:
-            return []
-
-        stmt = insert(GithubIssue).values(insert_values)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=[GithubIssue.github_issue_id],
-            set_={
-                "state": stmt.excluded.state,
-                "title": stmt.excluded.title,
-                "body": stmt.excluded.body,
-                "issue_closed_at": stmt.excluded.issue_closed_at,
-            },
-        ).returning(GithubIssue)
-
-        result = await self.db.execute(stmt)
-        await self.db.commit()
-        return result.scalars().all()
+            return UpsertResult()
+
+        return await staged_upsert(
+            db=self.db,
+            model=GithubIssue,
+            rows=insert_values,
+            conflict_columns=["github_issue_id"],
+            update_columns=["state", "title", "body", "issue_closed_at"],
+        )
 
     async def bulk_upsert_commit_details(
         self,
         commit_data_list: list[Commit],
         external_profile_id: Annotated[int, "Foreign key to ExternalProfile"],
         repo_db_id: Annotated[int, "Foreign key to GithubRepository"],
-    ) -> list[GithubCommit]:
-        """Bulk insert or update commit details efficiently in one query."""
+    ) -> UpsertResult[GithubCommit]:
+        """
+        Bulk insert or update commit details, staged and merged in bounded chunks.
+
+        Only the compact per-file summary is stored on the commit; patch text goes to
+        `github_commit_patches` when GITHUB_STORE_COMMIT_PATCHES is enabled, and is dropped otherwise.
+        """
         if not commit_data_list:
-            return []
+            return UpsertResult()
 
         insert_values = []
+        patch_values = []
         for commit in commit_data_list:
-            files_json = [file.model_dump() for file in commit.files]
+            files_json = [file.model_dump(include=COMPACT_FILE_FIELDS) for file in commit.files]
             authored_date = commit.commit.author.date if commit.commit.author else datetime.now(timezone.utc)
 
             insert_values.append(
@@ -255,23 +362,52 @@ class GithubRepository:
                 }
             )
 
-        stmt = insert(GithubCommit)
-
-        stmt = stmt.on_conflict_do_update(
-            index_elements=[GithubCommit.sha],
-            set_={
-                "message": stmt.excluded.message,
-                "authored_at": stmt.excluded.authored_at,
-                "additions": stmt.excluded.additions,
-                "deletions": stmt.excluded.deletions,
-                "total": stmt.excluded.total,
-                "files": stmt.excluded.files,
-            },
-        ).returning(GithubCommit)
-
-        result = await self.db.execute(stmt, insert_values)
-        await self.db.commit()
-        return result.scalars().all()
+            patches = {file.filename: file.patch for file in commit.files if file.patch}
+            if patches and settings.GITHUB_STORE_COMMIT_PATCHES:
+                patch_values.append(
+                    {
+                        "external_profile_id": external_profile_id,
+                        "sha": commit.sha,
+                        "patches": compress_patches(patches),
+                    }
+                )
+
+        result = await staged_upsert(
+            db=self.db,
+            model=GithubCommit,
+            rows=insert_values,
+            # Every row carries the same profile id, so on Postgres the merge only touches its partition
+            conflict_columns=["external_profile_id", "sha"],
+            update_columns=["message", "authored_at", "additions", "deletions", "total", "files"],
+        )
+        if patch_values:
+            await staged_upsert(
+                db=self.db,
+                model=GithubCommitPatch,
+                rows=patch_values,
+                conflict_columns=["external_profile_id", "sha"],
+                update_columns=["patches"],
+            )
+        return result
+
+    async def get_commit_patches(self, external_profile_id: int, sha: str) -> dict[str, str]:
+        """Fetch the stored patch text of a commit, keyed by filename. Empty when none were stored."""
+        stmt = select(GithubCommitPatch.patches).where(
+            GithubCommitPatch.external_profile_id == external_profile_id, GithubCommitPatch.sha == sha
+        )
+        compressed = await self.db.scalar(stmt)
+        return decompress_patches(compressed) if compressed else {}
+
+    async def delete_commits_by_profile_id(self, external_profile_id: int) -> int:
+        """
+        Delete every commit of a profile. Returns how many were deleted.
+
+        The profile id is the partition key, so this only touches that profile's partition; deleting
+        the profile afterwards leaves its cascades from repositories with no commits left to look up.
+        """
+        stmt = delete(GithubCommit).where(GithubCommit.external_profile_id == external_profile_id)
+        result = await self.db.execute(stmt)
+        return result.rowcount
 
     async def update_repo_sync_time(self, repo_db_id: int) -> None:
         """Updates the 'last_commit_sync_at' for a repository."""
@@ -281,4 +417,32 @@ class GithubRepository:
             .values(last_commit_sync_at=datetime.now(timezone.utc))
         )
         await self.db.execute(stmt)
-        await self.db.commit()
+        await self._bump_repositories_version(repo_ids=[repo_db_id])
+
+    async def _bump_repositories_version(
+        self, external_profile_id: int | None = None, repo_ids: list[int] | None = None
+    ) -> None:
+        """
+        Mark the repository list of a profile, or of the profiles owning the repositories, as changed. Runs in
+        the caller's transaction, so cached lists are superseded exactly when the change commits.
+        """
+        if external_profile_id is not None:
+            owners = ExternalProfile.id == external_profile_id
+        elif repo_ids:
+            owners = ExternalProfile.id.in_(
+                select(GithubRepositoryModel.external_profile_id).where(GithubRepositoryModel.id.in_(repo_ids))
+            )
+        else:
+            return
+        stmt = (
+            update(ExternalProfile).where(owners).values(repositories_version=ExternalProfile.repositories_version + 1)
+        )
+        await self.db.execute(stmt)
+
+
+def compress_patches(patches: dict[str, str]) -> bytes:
+    return zlib.compress(json.dumps(patches, sort_keys=True).encode())
+
+
+def decompress_patches(compressed: bytes) -> dict[str, str]:
+    return json.loads(zlib.decompress(compressed))
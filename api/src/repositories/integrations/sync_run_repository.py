@@ -0,0 +1,60 @@
+from collections import Counter
+from datetime import datetime
+from typing import Annotated
+
+from sqlalchemy import Row, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.integrations import SyncRun, SyncRunStatusEnum
+
+
+class SyncRunRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def create_sync_run(self, sync_run: SyncRun) -> SyncRun:
+        """Persist a finished sync run."""
+        self.db.add(sync_run)
+        await self.db.flush()
+        return sync_run
+
+    async def get_usage_by_user(
+        self, since: Annotated[datetime, "Only runs started at or after this moment are aggregated"]
+    ) -> list[Row]:
+        """Aggregate run cost per user and run kind, most expensive (by wall time) first."""
+        total_duration = func.sum(SyncRun.duration_ms)
+        stmt = (
+            select(
+                SyncRun.user_id,
+                SyncRun.kind,
+                func.count(SyncRun.id).label("runs"),
+                func.sum(case((SyncRun.status == SyncRunStatusEnum.FAILED, 1), else_=0)).label("failed_runs"),
+                total_duration.label("duration_ms"),
+                func.max(SyncRun.duration_ms).label("max_duration_ms"),
+                func.sum(SyncRun.requests_total).label("requests_total"),
+                func.sum(SyncRun.not_modified_responses).label("not_modified_responses"),
+                func.sum(SyncRun.bytes_received).label("bytes_received"),
+                func.sum(SyncRun.rows_written).label("rows_written"),
+                func.sum(SyncRun.rows_unchanged).label("rows_unchanged"),
+                func.sum(SyncRun.rate_limited_responses).label("rate_limited_responses"),
+                func.sum(SyncRun.llm_calls).label("llm_calls"),
+                func.sum(SyncRun.llm_tokens).label("llm_tokens"),
+            )
+            .where(SyncRun.started_at >= since)
+            .group_by(SyncRun.user_id, SyncRun.kind)
+            .order_by(total_duration.desc())
+        )
+        result = await self.db.execute(stmt)
+        return list(result.all())
+
+    async def get_requests_by_endpoint(
+        self, since: Annotated[datetime, "Only runs started at or after this moment are aggregated"]
+    ) -> Counter[str]:
+        """Sum the per-endpoint request counts of every run in the window."""
+        stmt = select(SyncRun.requests_by_endpoint).where(SyncRun.started_at >= since)
+        result = await self.db.execute(stmt)
+
+        totals: Counter[str] = Counter()
+        for requests_by_endpoint in result.scalars():
+            totals.update(requests_by_endpoint or {})
+        return totals
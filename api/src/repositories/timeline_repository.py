@@ -1,12 +1,22 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import datetime
+
 from loguru import logger
-from sqlalchemy import delete, select, update
+from sqlalchemy import ColumnElement, Row, and_, delete, func, insert, or_, select, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from src.db.routing import read_only
+from src.models.integrations.github import GithubRepository
 from src.models.node_artifacts import NodeArtifact
+from src.models.timeline_changes import NodeChangeKind, TimelineChange
 from src.models.timeline_nodes import TimelineNode
 from src.models.timelines import Timeline
-from src.schemas.timelines import TimelineBase
+from src.models.users import User
+from src.schemas.media import StoredMedia
+from src.schemas.timelines import NodeArtifactInfo, TimelineBase, TimelineNodeBatchItem, TimelineWindow
 
 
 class TimelineRepository:
@@ -20,6 +30,7 @@ class TimelineRepository:
         result = await self.db.execute(statement)
         return result.scalar_one_or_none()
 
+    @read_only
     async def get_timeline_with_nodes(self, timeline_id: int, user_id: int) -> Timeline | None:
         """
         Get A SINGLE timeline with ALL its nodes loaded.
@@ -36,6 +47,175 @@ class TimelineRepository:
         result = await self.db.execute(statement)
         return result.scalars().first()
 
+    @read_only
+    async def get_timeline_tree_rows(
+        self, timeline_id: int, user_id: int, window: TimelineWindow | None = None
+    ) -> Sequence[Row]:
+        """
+        The timeline, its nodes ordered by date and their artifacts' metadata as flat rows, in one query and
+        without building ORM objects. Node columns are prefixed `node_` and artifact columns `artifact_`.
+        A timeline without nodes is one row of NULL node columns; another user's timeline is no rows at all.
+
+        With a window, only the nodes overlapping it are included, plus the parents of children that do.
+        """
+        node_columns = [column.label(f"node_{column.name}") for column in TimelineNode.__table__.columns]
+        in_window = _in_window(TimelineNode, timeline_id, window) if window else true()
+        statement = (
+            select(
+                *Timeline.__table__.columns,
+                *node_columns,
+                NodeArtifact.id.label("artifact_id"),
+                NodeArtifact.media_type.label("artifact_media_type"),
+                NodeArtifact.caption.label("artifact_caption"),
+            )
+            .select_from(Timeline)
+            # Filtered in the join, so the timeline's row is still there when no node is in the window
+            .outerjoin(TimelineNode, and_(TimelineNode.timeline_id == Timeline.id, in_window))
+            .outerjoin(NodeArtifact, NodeArtifact.node_id == TimelineNode.id)
+            .where(Timeline.id == timeline_id, Timeline.user_id == user_id)
+            .order_by(TimelineNode.start_date, TimelineNode.id, NodeArtifact.id)
+        )
+        result = await self.db.execute(statement)
+        return result.all()
+
+    @read_only
+    async def get_timeline_version(self, timeline_id: int, user_id: int) -> int | None:
+        """The timeline's current version, if it belongs to the user."""
+        statement = select(Timeline.version).where(Timeline.id == timeline_id, Timeline.user_id == user_id)
+        return await self.db.scalar(statement)
+
+    @read_only
+    async def get_top_level_spans(self, timeline_id: int) -> Sequence[Row]:
+        """(id, start_date, end_date, is_current) of the timeline's top-level nodes."""
+        statement = select(
+            TimelineNode.id, TimelineNode.start_date, TimelineNode.end_date, TimelineNode.is_current
+        ).where(TimelineNode.timeline_id == timeline_id, TimelineNode.parent_id.is_(None))
+        result = await self.db.execute(statement)
+        return result.all()
+
+    @read_only
+    async def get_node_version(self, node_id: int) -> int | None:
+        """The version of the timeline the node belongs to."""
+        statement = select(Timeline.version).join(TimelineNode, TimelineNode.timeline_id == Timeline.id)
+        return await self.db.scalar(statement.where(TimelineNode.id == node_id))
+
+    @read_only
+    async def get_timelines_version(self, user_id: int) -> int | None:
+        """The version of the user's list of timelines."""
+        return await self.db.scalar(select(User.timelines_version).where(User.id == user_id))
+
+    async def bump_timeline_version(self, timeline_id: int) -> int:
+        """
+        Mark the timeline's nodes as changed, in the same transaction as the change, and return the new version.
+        The timeline's entry in the owner's list is left as it was (updated_at included), so node writes don't
+        invalidate the list or contend on the owner's row.
+        """
+        stmt = (
+            update(Timeline)
+            .where(Timeline.id == timeline_id)
+            .values(version=Timeline.version + 1, updated_at=Timeline.updated_at)
+            .returning(Timeline.version)
+        )
+        return (await self.db.execute(stmt)).scalar_one()
+
+    async def bump_timelines_version(self, user_id: int) -> None:
+        """
+        Mark the user's list of timelines as changed, in the same transaction as the change. Only changes that
+        show in the list (creating or deleting a timeline) bump it.
+        """
+        stmt = update(User).where(User.id == user_id).values(timelines_version=User.timelines_version + 1)
+        await self.db.execute(stmt)
+
+    async def unlink_github_repositories(self, external_profile_id: int) -> dict[int, list[int]]:
+        """
+        Clear the GitHub repository of every node linked to one of the profile's repositories, ahead of their
+        deletion (which would otherwise do it through ondelete="SET NULL", unseen by versions and the change
+        log). Returns the IDs of the unlinked nodes by timeline.
+        """
+        linked = (
+            select(TimelineNode.id, TimelineNode.timeline_id)
+            .join(GithubRepository, TimelineNode.github_repo_id == GithubRepository.id)
+            .where(GithubRepository.external_profile_id == external_profile_id)
+        )
+        nodes_by_timeline: dict[int, list[int]] = defaultdict(list)
+        for node_id, timeline_id in (await self.db.execute(linked)).all():
+            nodes_by_timeline[timeline_id].append(node_id)
+        if nodes_by_timeline:
+            node_ids = [node_id for node_ids in nodes_by_timeline.values() for node_id in node_ids]
+            await self.db.execute(update(TimelineNode).where(TimelineNode.id.in_(node_ids)).values(github_repo_id=None))
+        return nodes_by_timeline
+
+    # Change Log Methods
+    async def record_node_changes(
+        self, timeline_id: int, version: int, node_ids: Sequence[int], kind: NodeChangeKind
+    ) -> None:
+        """Log changes to the nodes at the timeline version they produced."""
+        if not node_ids:
+            return
+        rows = [
+            {"timeline_id": timeline_id, "version": version, "node_id": node_id, "kind": kind} for node_id in node_ids
+        ]
+        await self.db.execute(insert(TimelineChange), rows)
+
+    @read_only
+    async def get_change_log_state(self, timeline_id: int, user_id: int) -> Row | None:
+        """(version, change_log_floor) of the timeline, if it belongs to the user."""
+        statement = select(Timeline.version, Timeline.change_log_floor).where(
+            Timeline.id == timeline_id, Timeline.user_id == user_id
+        )
+        return (await self.db.execute(statement)).one_or_none()
+
+    @read_only
+    async def get_node_changes(self, timeline_id: int, since: int, until: int) -> Sequence[Row]:
+        """(node_id, kind) of the changes after version `since` up to `until`, oldest first."""
+        statement = (
+            select(TimelineChange.node_id, TimelineChange.kind)
+            .where(
+                TimelineChange.timeline_id == timeline_id,
+                TimelineChange.version > since,
+                TimelineChange.version <= until,
+            )
+            .order_by(TimelineChange.version, TimelineChange.id)
+        )
+        return (await self.db.execute(statement)).all()
+
+    @read_only
+    async def get_timeline_nodes_by_ids(self, timeline_id: int, node_ids: Sequence[int]) -> Sequence[TimelineNode]:
+        """The timeline's nodes among the IDs, with their media, in date order."""
+        statement = (
+            select(TimelineNode)
+            .where(TimelineNode.timeline_id == timeline_id, TimelineNode.id.in_(node_ids))
+            .options(selectinload(TimelineNode.media))
+            .order_by(TimelineNode.start_date, TimelineNode.id)
+        )
+        return (await self.db.execute(statement)).scalars().all()
+
+    async def compact_change_log(self, before: datetime) -> int:
+        """
+        Drop the changes logged before a point in time, raising each timeline's floor to the newest version
+        dropped. Whole versions go at once, so the log never holds part of one. Returns the rows deleted.
+        """
+        logged_before = TimelineChange.created_at < before
+        newest_dropped = (
+            select(func.max(TimelineChange.version))
+            .where(TimelineChange.timeline_id == Timeline.id, logged_before)
+            .scalar_subquery()
+        )
+        # Compaction is invisible to the owner, so updated_at (and the order of their list) is kept as it was
+        raised = await self.db.execute(
+            update(Timeline)
+            .where(Timeline.id.in_(select(TimelineChange.timeline_id).where(logged_before)))
+            .values(change_log_floor=newest_dropped, updated_at=Timeline.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if not raised.rowcount:
+            return 0
+
+        floor = select(Timeline.change_log_floor).where(Timeline.id == TimelineChange.timeline_id).scalar_subquery()
+        result = await self.db.execute(delete(TimelineChange).where(TimelineChange.version <= floor))
+        return result.rowcount
+
+    @read_only
     async def get_timelines_by_user_id(self, user_id: int) -> list[Timeline]:
         """
         Get ALL timelines for a user.
@@ -47,18 +227,15 @@ class TimelineRepository:
     async def create_timeline(self, timeline: Timeline) -> Timeline:
         """Create a new timeline in the database."""
         self.db.add(timeline)
-        await self.db.commit()
-
-        stmt = select(Timeline).options(selectinload(Timeline.nodes)).where(Timeline.id == timeline.id)
-
-        result = await self.db.execute(stmt)
-        return result.scalars().first()
+        # A single INSERT ... RETURNING id; a new timeline has no nodes, so there is nothing to load back
+        await self.db.flush()
+        set_committed_value(timeline, "nodes", [])
+        return timeline
 
     async def delete_timeline(self, timeline_id: int) -> None:
         """Delete a timeline by its ID."""
         stmt = delete(Timeline).where(Timeline.id == timeline_id)
         await self.db.execute(stmt)
-        await self.db.commit()
 
     # Timeline Node Methods
     async def get_timeline_node_lite(self, node_id: int) -> TimelineNode | None:
@@ -82,31 +259,83 @@ class TimelineRepository:
         result = await self.db.execute(statement)
         return result.scalar_one_or_none()
 
-    async def create_timeline_node(
-        self,
-        timeline_node: TimelineNode,
-        media_bytes: bytes | None = None,
-        media_type: str | None = None,
-        media_filename: str | None = None,
-    ) -> TimelineNode:
-        """Create a new timeline node in the database."""
-        if media_bytes:
-            artifact = NodeArtifact(media_data=media_bytes, media_type=media_type, caption=media_filename)
-            timeline_node.media.append(artifact)
-
-        self.db.add(timeline_node)
-        await self.db.commit()
-        stmt = (
-            select(TimelineNode)
-            .options(
-                selectinload(TimelineNode.children),
-                selectinload(TimelineNode.media),
+    @read_only
+    async def get_node_artifact_info(self, node_id: int, artifact_id: int, user_id: int) -> NodeArtifactInfo | None:
+        """Artifact metadata and store key, if the node's timeline belongs to the user."""
+        statement = (
+            select(
+                NodeArtifact.id,
+                NodeArtifact.node_id,
+                NodeArtifact.media_type,
+                NodeArtifact.caption,
+                NodeArtifact.content_hash,
+                NodeArtifact.size_bytes.label("size"),
             )
-            .where(TimelineNode.id == timeline_node.id)
+            .join(TimelineNode, TimelineNode.id == NodeArtifact.node_id)
+            .join(Timeline, Timeline.id == TimelineNode.timeline_id)
+            .where(NodeArtifact.id == artifact_id, NodeArtifact.node_id == node_id, Timeline.user_id == user_id)
         )
+        result = await self.db.execute(statement)
+        row = result.one_or_none()
+        return NodeArtifactInfo.model_validate(row._mapping) if row else None
 
-        result = await self.db.execute(stmt)
-        return result.scalars().first()
+    async def create_timeline_node(self, timeline_node: TimelineNode, media: StoredMedia | None = None) -> TimelineNode:
+        """Create a new timeline node in the database, with an artifact for media already in the store."""
+        if media:
+            timeline_node.media.append(
+                NodeArtifact(
+                    content_hash=media.content_hash,
+                    size_bytes=media.size_bytes,
+                    media_type=media.media_type,
+                    caption=media.filename,
+                )
+            )
+
+        self.db.add(timeline_node)
+        await self.db.flush()
+
+        # A new node has no children, and its media is exactly what was attached above
+        set_committed_value(timeline_node, "children", [])
+        if not media:
+            set_committed_value(timeline_node, "media", [])
+        return timeline_node
+
+    async def create_timeline_nodes(
+        self, timeline_id: int, nodes: Sequence[TimelineNodeBatchItem]
+    ) -> list[TimelineNode]:
+        """
+        Create a batch of nodes with one multi-row INSERT per level: the top-level nodes, then the children,
+        whose `parent_index` points at a node earlier in the batch. Returns the new nodes in batch order.
+        """
+        created: list[TimelineNode] = []
+        positions: dict[int, int] = {}
+        for is_child in (False, True):
+            level = [i for i, node in enumerate(nodes) if (node.parent_index is not None) == is_child]
+            if not level:
+                continue
+            rows = []
+            for i in level:
+                row = nodes[i].model_dump(exclude={"parent_index"}) | {"timeline_id": timeline_id}
+                if is_child:
+                    row["parent_id"] = created[positions[nodes[i].parent_index]].id
+                rows.append(row)
+            statement = insert(TimelineNode).returning(TimelineNode, sort_by_parameter_order=True)
+            for i, node in zip(level, (await self.db.scalars(statement, rows)).all(), strict=True):
+                positions[i] = len(created)
+                created.append(node)
+
+        # Nothing else refers to the new nodes yet: their children are in the batch, and none has media
+        ordered = [created[positions[i]] for i in range(len(nodes))]
+        for i, node in enumerate(ordered):
+            children = [ordered[j] for j, child in enumerate(nodes) if child.parent_index == i]
+            set_committed_value(node, "children", children)
+            set_committed_value(node, "media", [])
+        return ordered
+
+    async def get_timeline_nodes_lite(self, node_ids: Sequence[int]) -> Sequence[TimelineNode]:
+        """Retrieve timeline nodes by their IDs, without relationships."""
+        statement = select(TimelineNode).where(TimelineNode.id.in_(node_ids))
+        return (await self.db.execute(statement)).scalars().all()
 
     async def update_timeline_node(self, node_id: int, timelineNode: TimelineBase) -> TimelineNode:
         """
@@ -135,27 +364,45 @@ class TimelineRepository:
             # Nothing to update
             return await self.get_timeline_node_lite(node_id=node_id)
 
-        stmt = (
-            update(TimelineNode)
-            .where(TimelineNode.id == node_id)
-            .values(**clean_values)
-            .execution_options(synchronize_session="fetch")
-        )
-
-        await self.db.execute(stmt)
-        await self.db.commit()
+        # RETURNING refreshes the node in the identity map, so its loaded media and children are kept as they are
+        stmt = update(TimelineNode).where(TimelineNode.id == node_id).values(**clean_values).returning(TimelineNode)
 
-        result = await self.db.execute(select(TimelineNode).where(TimelineNode.id == node_id))
-        return result.scalars().first()
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
 
-    async def delete_timeline_node(self, node_id: int) -> bool:
+    async def delete_timeline_node(self, node_id: int) -> list[int]:
         """
-        Delete a timeline node AND its children (Cascade Delete).
+        Delete a timeline node AND its children (Cascade Delete). Returns the IDs of the deleted nodes.
         """
-        delete_children_stmt = delete(TimelineNode).where(TimelineNode.parent_id == node_id)
-        await self.db.execute(delete_children_stmt)
+        delete_children_stmt = delete(TimelineNode).where(TimelineNode.parent_id == node_id).returning(TimelineNode.id)
+        children = (await self.db.execute(delete_children_stmt)).scalars().all()
+
+        delete_parent_stmt = delete(TimelineNode).where(TimelineNode.id == node_id).returning(TimelineNode.id)
+        parent = (await self.db.execute(delete_parent_stmt)).scalars().all()
+        return [*children, *parent]
+
+
+def _overlaps(node: type[TimelineNode], window: TimelineWindow) -> ColumnElement[bool]:
+    """
+    Whether a node's span overlaps the window. A node without an end date runs on if it is current and is
+    a single point in time otherwise.
+    """
+    return and_(
+        node.start_date <= window.end,
+        or_(
+            node.end_date >= window.start,
+            and_(node.end_date.is_(None), or_(node.is_current, node.start_date >= window.start)),
+        ),
+    )
+
+
+def _in_window(node: type[TimelineNode], timeline_id: int, window: TimelineWindow) -> ColumnElement[bool]:
+    if not window.include_children:
+        return and_(node.parent_id.is_(None), _overlaps(node, window))
 
-        delete_parent_stmt = delete(TimelineNode).where(TimelineNode.id == node_id)
-        result = await self.db.execute(delete_parent_stmt)
-        await self.db.commit()
-        return result.rowcount > 0
+    # A child in the window brings its parent along, so it always has a block to be drawn in
+    child = aliased(TimelineNode)
+    parents_of_children = select(child.parent_id).where(
+        child.timeline_id == timeline_id, child.parent_id.is_not(None), _overlaps(child, window)
+    )
+    return or_(_overlaps(node, window), node.id.in_(parents_of_children))
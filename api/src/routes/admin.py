@@ -0,0 +1,45 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.database import get_db, pool_stats
+from src.routes.auth import get_auth_service
+from src.schemas.db_pool import PoolStats
+from src.schemas.sync_runs import SyncRunSummary
+from src.services.auth_service import AuthService
+from src.services.factory import ServiceFactory
+from src.services.sync_run_service import SyncRunService
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+security = HTTPBearer()
+
+
+def get_sync_run_service(db: Annotated[AsyncSession, Depends(get_db)]) -> SyncRunService:
+    """Dependency to get SyncRunService."""
+    return ServiceFactory.create_sync_run_service(db)
+
+
+@router.get("/sync-runs/summary")
+async def get_sync_run_summary(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    sync_run_service: Annotated[SyncRunService, Depends(get_sync_run_service)],
+    hours: Annotated[int, Query(ge=1, le=24 * 90, description="Size of the aggregation window")] = 24,
+) -> SyncRunSummary:
+    """Aggregate API calls, bytes, time, rows and LLM usage of background runs, overall and per user."""
+    token_data = auth_service.verify_token(token=credentials.credentials)
+    auth_service.require_admin(token_data=token_data)
+    return await sync_run_service.get_summary(hours=hours)
+
+
+@router.get("/db-pools")
+async def get_db_pools(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+) -> list[PoolStats]:
+    """Connection pool gauges (checked out, overflow, checkout waits) of this API process."""
+    token_data = auth_service.verify_token(token=credentials.credentials)
+    auth_service.require_admin(token_data=token_data)
+    return pool_stats()
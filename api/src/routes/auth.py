@@ -1,16 +1,17 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Header, Response, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Header, Response, UploadFile, status
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import settings
 from src.db.database import get_db
+from src.schemas.media import MediaVariant, media_key
 from src.schemas.users import AvatarUpdateResponse, Token, User, UserCreate, UserLogin, UserUpdate
 from src.services.auth_service import AuthService
 from src.services.factory import ServiceFactory
+from src.workers.media import media_variants_worker
 
 router = APIRouter(tags=["Auth"], prefix="/auth")
 security = HTTPBearer()
@@ -85,15 +86,17 @@ async def logout(
 async def upload_avatar(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    background_tasks: BackgroundTasks,
     file: Annotated[UploadFile, File()],
 ) -> AvatarUpdateResponse:
     """
-    Uploads and stores an avatar image as binary data in the database.
+    Uploads an avatar image into the media store.
     Only allows image MIME types.
     """
     token_data = auth_service.verify_token(token=credentials.credentials)
     user_id = token_data.sub
-    await auth_service.update_avatar(user_id=user_id, file=file)
+    stored = await auth_service.update_avatar(user_id=user_id, file=file)
+    background_tasks.add_task(media_variants_worker, content_hash=stored.content_hash, media_type=stored.media_type)
 
     return AvatarUpdateResponse(
         message="Avatar updated successfully", has_avatar=True, avatar_url=f"/auth/users/avatar/{user_id}"
@@ -104,47 +107,29 @@ async def upload_avatar(
 async def get_avatar(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    variant: MediaVariant | None = None,
     if_none_match: Annotated[str | None, Header()] = None,
 ) -> Response:
     """
-    Serves avatar with ETag validation using DB timestamps.
+    Serves avatar, or a resized WebP `variant` of it, with an ETag derived from the image's content hash.
     Prevents binary transfer if the browser's cache is current.
     """
-    # 1. Get metadata only (Fast DB hit)
-
+    # 1. Locate the avatar (Redis, or a single DB query)
     token_data = auth_service.verify_token(token=credentials.credentials)
-    user_id = token_data.sub
-    metadata = await auth_service.get_avatar_info(user_id=user_id)
-    logger.error(f"Received If-None-Match: {if_none_match} from client")
-
-    if not metadata:
+    avatar = await auth_service.get_avatar_ref(user_id=token_data.sub)
+    if not avatar:
         return Response(status_code=status.HTTP_404_NOT_FOUND)
 
-    updated_at, media_type = metadata
-
-    # 2. Generate Weak ETag based on unix timestamp
-    etag = f'W/"{int(updated_at.timestamp())}"'
-
-    logger.error(f"Generated ETag: {etag} for user_id: {user_id} with updated_at: {updated_at}")
+    # 2. Strong ETag: profile edits no longer invalidate it, only a different image does
+    etag = f'"{media_key(avatar.avatar_hash, variant)}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000"}  # 1 year
 
     # 3. Check for Cache Hit (Return 304 - No Body)
     if if_none_match == etag:
-        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
-
-    # 4. Cache Miss - Get the heavy bytes
-    avatar_blob = await auth_service.get_avatar_bytes(user_id=user_id)
-    if not avatar_blob:
-        return Response(status_code=status.HTTP_404_NOT_FOUND)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    # 5. Return Full Image
-    return Response(
-        content=avatar_blob,
-        media_type=media_type,
-        headers={
-            "ETag": etag,
-            "Cache-Control": "public, max-age=31536000",  # 1 year
-        },
-    )
+    # 4. Cache Miss - Serve the image, from memory when it is hot
+    return await auth_service.serve_avatar(avatar=avatar, variant=variant, headers=headers)
 
 
 @router.delete("/me/avatar", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,10 +1,11 @@
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Response, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import Errors
+from src.core.response_cache import cached_json_response, etag_matches
 from src.db.database import get_db
 from src.exceptions.external import GitHubIntegrationError
 from src.routes.auth import get_auth_service
@@ -54,16 +55,20 @@ async def github_callback(
     return Response(status_code=status.HTTP_200_OK)
 
 
-@router.get("/repositories")
+@router.get("/repositories", response_model=list[RepositoryInDB])
 async def get_github_repositories(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
     github_service: Annotated[GithubService, Depends(get_github_service)],
-) -> list[RepositoryInDB]:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     """Get all GitHub repositories for the user"""
     token_data = auth_service.verify_token(token=credentials.credentials)
     user_id = token_data.sub
-    return await github_service.get_all_repositories(user_id=user_id)
+    tag = await github_service.get_repositories_tag(user_id=user_id)
+    if etag_matches(if_none_match, f'"{tag}"'):
+        return cached_json_response(tag, None)
+    return cached_json_response(tag, await github_service.get_all_repositories_cached(user_id=user_id, tag=tag))
 
 
 @router.get("/sync")
@@ -80,15 +85,17 @@ async def start_github_sync(
     github_profile = await github_service.get_external_profile(user_id=user_id)
     access_token = await github_service.get_valid_access_token(github_profile=github_profile)
 
-    lock_acquired = await github_service.attempt_sync_lock(profile_id=github_profile.id)
+    lease_token = await github_service.acquire_sync_lease(profile_id=github_profile.id)
 
-    if not lock_acquired:
+    if lease_token is None:
         raise GitHubIntegrationError(
             Errors.GITHUB_INTEGRATION_ERROR.value,
             details={"message": "Another sync is already in progress for this profile."},
         )
 
-    background_tasks.add_task(github_full_sync_worker, user_id=user_id, access_token=access_token)
+    background_tasks.add_task(
+        github_full_sync_worker, user_id=user_id, access_token=access_token, lease_token=lease_token
+    )
     return OperationStatusResponse(
         message="GitHub synchronization has been started.",
         status=OperationStatusEnum.accepted,
@@ -120,15 +127,15 @@ async def sync_github_timelines(
     Triggers the creation of timelines and nodes from all GitHub repositories of the user.
     """
     token_data = auth_service.verify_token(token=credentials.credentials)
-    locked_repo_ids = await github_service.repo.lock_repos_for_timeline_generation(repo_ids=repository_ids)
+    leases = await github_service.acquire_generation_leases(repository_ids=repository_ids)
 
-    if not locked_repo_ids:
+    if not leases:
         return OperationStatusResponse(
             message="All selected repositories are currently being processed.",
             status=OperationStatusEnum.queued,
         )
 
-    background_tasks.add_task(github_timeline_worker, token_data=token_data, repository_ids=locked_repo_ids)
+    background_tasks.add_task(github_timeline_worker, token_data=token_data, leases=leases)
     return OperationStatusResponse(
         message="Timeline generation for all repositories started in the background.",
         status=OperationStatusEnum.accepted,
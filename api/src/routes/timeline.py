@@ -1,46 +1,70 @@
+from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Header, Query, Response, UploadFile, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import Json
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.response_cache import cached_json_response, etag_matches
 from src.db.database import get_db
+from src.models.timeline_nodes import TimelineNode as TimelineNodeModel
 from src.models.timelines import Timeline
 from src.routes.auth import get_auth_service
+from src.schemas.media import MediaVariant
 from src.schemas.timelines import Timeline as TimelineSchema
 from src.schemas.timelines import (
+    TimelineChanges,
     TimelineCreate,
+    TimelineLayout,
     TimelineNode,
     TimelineNodeBase,
+    TimelineNodeBatch,
     TimelineNodeCreate,
     TimelineNodeWithChildren,
     TimelineSummary,
+    TimelineWindow,
 )
 from src.services.auth_service import AuthService
 from src.services.factory import ServiceFactory
 from src.services.timeline_service import TimelineService
+from src.workers.media import media_variants_worker
 
 router = APIRouter(tags=["Timeline"], prefix="/timelines")
 security = HTTPBearer()
 
+# Below this zoom level the client's axis shows whole years, where children are drawn inside their parent
+CHILDREN_MIN_ZOOM = 1
+
 
 def get_timeline_service(db: Annotated[AsyncSession, Depends(get_db)]) -> TimelineService:
     """Dependency to get TimelineService with all required sub-services."""
     return ServiceFactory.create_timeline_service(db)
 
 
+def render_artifact_variants(background_tasks: BackgroundTasks, node: TimelineNodeModel) -> None:
+    """Queue the resized variants of a node's media to be rendered once the response is sent."""
+    for artifact in node.media:
+        background_tasks.add_task(
+            media_variants_worker, content_hash=artifact.content_hash, media_type=artifact.media_type
+        )
+
+
 @router.get("/", status_code=status.HTTP_200_OK, response_model=list[TimelineSummary])
 async def get_timelines(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
-) -> list[TimelineSummary]:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     """
     Get ALL timelines for the authenticated user.
     """
     token_data = auth_service.verify_token(token=credentials.credentials)
-    return await timeline_service.get_user_timelines(user_id=token_data.sub)
+    tag = await timeline_service.get_timelines_tag(user_id=token_data.sub)
+    if etag_matches(if_none_match, f'"{tag}"'):
+        return cached_json_response(tag, None)
+    return cached_json_response(tag, await timeline_service.get_user_timelines_cached(user_id=token_data.sub, tag=tag))
 
 
 @router.get("/{timeline_id}", status_code=status.HTTP_200_OK, response_model=TimelineSchema)
@@ -49,10 +73,80 @@ async def get_timeline(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
-) -> Timeline:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     """Get timeline for the authenticated user."""
     token_data = auth_service.verify_token(token=credentials.credentials)
-    return await timeline_service.get_timeline_details(timeline_id=timeline_id, user_id=token_data.sub)
+    tag = await timeline_service.get_timeline_tag(timeline_id=timeline_id, user_id=token_data.sub)
+    if etag_matches(if_none_match, f'"{tag}"'):
+        return cached_json_response(tag, None)
+    # Already serialised to the response model's shape, so FastAPI does not validate it again
+    content = await timeline_service.get_timeline_details_cached(
+        timeline_id=timeline_id, user_id=token_data.sub, tag=tag
+    )
+    return cached_json_response(tag, content)
+
+
+@router.get("/{timeline_id}/nodes", status_code=status.HTTP_200_OK, response_model=list[TimelineNodeWithChildren])
+async def get_timeline_window(
+    timeline_id: int,
+    start: Annotated[datetime, Query(alias="from", description="Start of the visible date range")],
+    end: Annotated[datetime, Query(alias="to", description="End of the visible date range")],
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    zoom: Annotated[int | None, Query(ge=0, description="Zoom level of the client's axis")] = None,
+) -> Response:
+    """
+    Get the nodes of a timeline that overlap a date range: top-level nodes with their children in the range.
+    A child in the range brings its parent along; below zoom level 1 only top-level nodes are returned.
+    """
+    token_data = auth_service.verify_token(token=credentials.credentials)
+    window = TimelineWindow(start=start, end=end, include_children=zoom is None or zoom >= CHILDREN_MIN_ZOOM)
+    content = await timeline_service.get_timeline_window_json(
+        timeline_id=timeline_id, user_id=token_data.sub, window=window
+    )
+    return Response(content=content, media_type="application/json")
+
+
+@router.get("/{timeline_id}/layout", status_code=status.HTTP_200_OK, response_model=TimelineLayout)
+async def get_timeline_layout(
+    timeline_id: int,
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+) -> TimelineLayout:
+    """Lanes of the timeline's top-level nodes, for clients loading nodes window by window."""
+    token_data = auth_service.verify_token(token=credentials.credentials)
+    return await timeline_service.get_timeline_layout(timeline_id=timeline_id, user_id=token_data.sub)
+
+
+@router.get("/{timeline_id}/changes", status_code=status.HTTP_200_OK, response_model=TimelineChanges)
+async def get_timeline_changes(
+    timeline_id: int,
+    since: Annotated[int, Query(ge=0, description="Version of the timeline the client holds")],
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+) -> TimelineChanges:
+    """Node changes since a version of the timeline; `reset` means the client must reload it in full."""
+    token_data = auth_service.verify_token(token=credentials.credentials)
+    return await timeline_service.get_timeline_changes(timeline_id=timeline_id, user_id=token_data.sub, since=since)
+
+
+@router.post("/{timeline_id}/nodes:batch", status_code=status.HTTP_201_CREATED, response_model=list[TimelineNode])
+async def create_timeline_nodes(
+    timeline_id: int,
+    batch: TimelineNodeBatch,
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+) -> list[TimelineNode]:
+    """Create many nodes at once, all or none; a child may name its parent by position in the batch."""
+    token_data = auth_service.verify_token(token=credentials.credentials)
+    return await timeline_service.create_timeline_nodes(
+        user_id=token_data.sub, timeline_id=timeline_id, nodes=batch.nodes
+    )
 
 
 @router.delete("/{timeline_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -85,10 +179,43 @@ async def get_timeline_node(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
-) -> TimelineNodeWithChildren:
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
     """Get a timeline node by ID."""
     auth_service.verify_token(token=credentials.credentials)
-    return await timeline_service.get_timeline_node_by_id(node_id=node_id)
+    tag = await timeline_service.get_timeline_node_tag(node_id=node_id)
+    if etag_matches(if_none_match, f'"{tag}"'):
+        return cached_json_response(tag, None)
+    return cached_json_response(tag, await timeline_service.get_timeline_node_cached(node_id=node_id, tag=tag))
+
+
+@router.get("/node/{node_id}/media/{artifact_id}", status_code=status.HTTP_200_OK)
+async def get_node_artifact(
+    node_id: int,
+    artifact_id: int,
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    variant: MediaVariant | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    Serves the bytes of a node artifact; tree responses only carry its metadata.
+    `variant` picks a resized WebP copy of an image (thumb, medium, webp) instead of the original.
+    Supports conditional requests (ETag) and byte ranges, streaming from the media store.
+    """
+    token_data = auth_service.verify_token(token=credentials.credentials)
+    artifact = await timeline_service.get_node_artifact(
+        node_id=node_id, artifact_id=artifact_id, user_id=token_data.sub
+    )
+    etag = artifact.etag(variant)
+    headers = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "private, max-age=31536000"}
+
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Range and If-Range (checked against this ETag) are answered by the store's response
+    return await timeline_service.serve_node_artifact(artifact=artifact, headers=headers, variant=variant)
 
 
 @router.post("/node", status_code=status.HTTP_201_CREATED, response_model=TimelineNode)
@@ -97,11 +224,14 @@ async def create_timeline_node(
     timeline_node: Annotated[Json[TimelineNodeCreate], Form(...)],
     timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    background_tasks: BackgroundTasks,
     media: Annotated[UploadFile | None, File()] = None,
 ) -> TimelineNode:
     """Create a new timeline node."""
     token_data = auth_service.verify_token(token=credentials.credentials)
-    return await timeline_service.create_timeline_node(user_id=token_data.sub, timeline_node=timeline_node, media=media)
+    node = await timeline_service.create_timeline_node(user_id=token_data.sub, timeline_node=timeline_node, media=media)
+    render_artifact_variants(background_tasks, node)
+    return node
 
 
 @router.patch("/node/{node_id}", status_code=status.HTTP_200_OK, response_model=TimelineNode)
@@ -111,13 +241,17 @@ async def update_timeline_node(
     timeline_node: Annotated[Json[TimelineNodeBase], Form(...)],
     timeline_service: Annotated[TimelineService, Depends(get_timeline_service)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    background_tasks: BackgroundTasks,
     media: Annotated[UploadFile | None, File()] = None,
 ) -> TimelineNode:
     """Update a timeline node."""
     token_data = auth_service.verify_token(token=credentials.credentials)
-    return await timeline_service.update_timeline_node(
+    node = await timeline_service.update_timeline_node(
         user_id=token_data.sub, node_id=node_id, timeline_node=timeline_node, media=media
     )
+    if media:
+        render_artifact_variants(background_tasks, node)
+    return node
 
 
 @router.delete("/node/{node_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class PoolStats(BaseModel):
+    """Occupancy and checkout waits of one engine's connection pool in this process."""
+
+    name: str
+    size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int  # Connections open beyond `size`
+    checkouts: int  # Successful ones; the wait totals cover only these
+    wait_seconds_total: float
+    wait_seconds_max: float
+    timeouts: int
+    timeout_wait_seconds_total: float
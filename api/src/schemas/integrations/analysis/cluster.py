@@ -3,7 +3,7 @@ from datetime import datetime
 from pydantic import BaseModel
 
 from src.models.integrations.github.github_commits import SignificanceLevel
-from src.schemas.integrations.github import CommitInDB
+from src.schemas.integrations.github import CommitSummary
 
 
 class Cluster(BaseModel):
@@ -11,7 +11,7 @@ class Cluster(BaseModel):
     topic: str
     start_date: datetime
     end_date: datetime
-    items: list[CommitInDB]
+    items: list[CommitSummary]
     primary_file_types: list[str]
     suggested_type: SignificanceLevel
     impact_score: float
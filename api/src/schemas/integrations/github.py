@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from enum import Enum
+from typing import NamedTuple
 
 from pydantic import BaseModel, ConfigDict, model_validator
 from typing_extensions import Self
@@ -36,6 +37,12 @@ class GithubToken(BaseModel):
         return self
 
 
+class InstallationToken(BaseModel):
+    installation_id: int
+    token: str
+    expires_at: datetime
+
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
@@ -85,16 +92,21 @@ class CommitStat(BaseModel):
     total: int
 
 
+# The per-file fields stored with each commit; everything else is either unused or (the patch) too big.
+COMPACT_FILE_FIELDS = {"filename", "status", "additions", "deletions"}
+
+
 class CommitFile(BaseModel):
-    sha: str
     filename: str
     status: str
     additions: int
     deletions: int
-    changes: int
-    blob_url: str | None
-    raw_url: str | None
-    contents_url: str
+    changes: int = 0
+    # Not extracted by the streaming parser for oversized commits.
+    sha: str | None = None
+    blob_url: str | None = None
+    raw_url: str | None = None
+    contents_url: str | None = None
     patch: str | None = None
 
 
@@ -124,6 +136,17 @@ class CommitInDB(BaseModel):
         from_attributes = True
 
 
+class CommitSummary(NamedTuple):
+    """The commit fields clustering and AI analysis read, loaded as a plain row instead of an ORM entity."""
+
+    sha: str
+    message: str
+    authored_at: datetime
+    significance_score: float | None
+    significance_classification: SignificanceLevel | None
+    filenames: list[str]
+
+
 class RepositoryBase(BaseModel):
     id: int
     name: str
@@ -0,0 +1,25 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class MediaVariant(str, Enum):
+    """Re-encoded copies of an uploaded image, stored next to the original."""
+
+    THUMB = "thumb"
+    MEDIUM = "medium"
+    WEBP = "webp"
+
+
+def media_key(content_hash: str, variant: MediaVariant | None = None) -> str:
+    """Store key of an original, or of one of its variants."""
+    return f"{content_hash}-{variant.value}" if variant else content_hash
+
+
+class StoredMedia(BaseModel):
+    """An upload written to the media store, addressed by the SHA-256 of its bytes."""
+
+    content_hash: str
+    size_bytes: int
+    media_type: str
+    filename: str | None = None
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+from src.models.integrations import SyncRunKindEnum
+
+
+class SyncRunUsage(BaseModel):
+    """Aggregated cost of one user's runs of one kind."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int
+    kind: SyncRunKindEnum
+    runs: int
+    failed_runs: int
+    duration_ms: int
+    max_duration_ms: int
+    requests_total: int
+    not_modified_responses: int
+    bytes_received: int
+    rows_written: int
+    rows_unchanged: int
+    rate_limited_responses: int
+    llm_calls: int
+    llm_tokens: int
+
+
+class SyncRunSummary(BaseModel):
+    since: datetime
+    runs: int
+    failed_runs: int
+    duration_ms: int
+    requests_total: int
+    not_modified_ratio: float
+    bytes_received: int
+    rows_written: int
+    rows_unchanged: int
+    llm_calls: int
+    llm_tokens: int
+    requests_by_endpoint: dict[str, int]
+    users: list[SyncRunUsage]
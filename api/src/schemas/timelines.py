@@ -1,9 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
+from src.core.config import settings
 from src.schemas.base import TimestampSchema
+from src.schemas.media import MediaVariant, media_key
 
 
 class NodeType(str, Enum):
@@ -32,6 +34,15 @@ class NodeArtifactSchema(BaseModel):
         from_attributes = True
 
 
+class NodeArtifactInfo(NodeArtifactSchema):
+    content_hash: str
+    size: int
+
+    def etag(self, variant: MediaVariant | None = None) -> str:
+        # The store key derives from the hash of the original, so it changes exactly when the bytes do
+        return f'"{media_key(self.content_hash, variant)}"'
+
+
 class TimelineNodeBase(BaseModel):
     parent_id: int | None = None
     title: str
@@ -51,6 +62,17 @@ class TimelineNodeCreate(TimelineNodeBase):
     timeline_id: int
 
 
+class TimelineNodeBatchItem(TimelineNodeBase):
+    # Parent created earlier in the same batch, by its position there; instead of parent_id
+    parent_index: int | None = Field(default=None, ge=0)
+
+
+class TimelineNodeBatch(BaseModel):
+    """Nodes created together in one transaction, validated as a whole before any is written."""
+
+    nodes: list[TimelineNodeBatchItem] = Field(min_length=1, max_length=settings.TIMELINE_NODE_BATCH_MAX_NODES)
+
+
 class TimelineNode(TimelineNodeCreate, TimestampSchema):
     id: int
     media: list[NodeArtifactSchema] = []
@@ -66,6 +88,47 @@ class TimelineNodeWithChildren(TimelineNode):
         from_attributes = True
 
 
+class TimelineWindow(BaseModel):
+    """A date range of a timeline, as shown by the client's axis."""
+
+    start: datetime
+    end: datetime
+    # Zoomed all the way out, children collapse into their parent's block and are not needed
+    include_children: bool = True
+
+    @field_validator("start", "end")
+    @classmethod
+    def in_utc(cls, value: datetime) -> datetime:
+        """Node dates are stored in UTC; a bound without an offset is taken to be UTC as well."""
+        return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class NodePlacement(BaseModel):
+    node_id: int
+    lane: int
+    # Nodes in one group overlap each other, directly or through other nodes of the group
+    group: int
+
+
+class TimelineLayout(BaseModel):
+    """Lanes of a timeline's top-level nodes, as of one version of the timeline."""
+
+    version: int
+    lane_count: int
+    placements: list[NodePlacement] = []
+
+
+class TimelineChanges(BaseModel):
+    """What changed in a timeline's nodes since a version the client holds, as of `version`."""
+
+    version: int
+    # The change log no longer reaches back to the client's version: reload the whole timeline instead
+    reset: bool = False
+    # Current state of the nodes created or updated since, and the IDs of those deleted
+    upserted: list[TimelineNode] = []
+    deleted: list[int] = []
+
+
 class TimelineBase(BaseModel):
     title: str
     description: str | None = None
@@ -81,7 +144,9 @@ class TimelineCreate(TimelineBase):
 class Timeline(TimelineBase, TimestampSchema):
     id: int
     user_id: int
+    version: int = 1
     nodes: list[TimelineNodeWithChildren] = []
+    layout: TimelineLayout | None = None
 
     class Config:
         from_attributes = True
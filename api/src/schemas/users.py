@@ -47,6 +47,13 @@ class User(UserBase, TimestampSchema):
         return data
 
 
+class AvatarRef(BaseModel):
+    """Where a user's current avatar is in the media store."""
+
+    avatar_hash: str
+    media_type: str
+
+
 class UserInDB(User):
     hashed_password: str
 
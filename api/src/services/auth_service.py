@@ -1,14 +1,20 @@
 from datetime import datetime, timedelta
 
-from fastapi import UploadFile
+from fastapi import Response, UploadFile
 from jose import JWTError, jwt
+from loguru import logger
 from passlib.context import CryptContext
 from redis.exceptions import ConnectionError
 
 from src.core.config import Errors, settings
+from src.core.lru_cache import BytesLRUCache
 from src.core.redis_db import redis_client
+from src.core.redis_utils import redis_delete, redis_get, redis_set
+from src.db.routing import bind_user
+from src.db.unit_of_work import UnitOfWork
 from src.exceptions.auth import (
     AuthenticationError,
+    AuthorizationError,
     InvalidTokenError,
     TokenExpiredError,
     UserAlreadyExistsError,
@@ -18,14 +24,25 @@ from src.exceptions.external import ExternalServiceError
 from src.exceptions.validation import ValidationError
 from src.models.users import User
 from src.repositories.user_repository import UserRepository
-from src.schemas.users import TokenData, UserCreate, UserUpdate
+from src.schemas.media import MediaVariant, StoredMedia, media_key
+from src.schemas.users import AvatarRef, TokenData, UserCreate, UserUpdate
+from src.services.media.media_service import MediaService
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def avatar_ref_key(user_id: int) -> str:
+    return f"avatar:ref:{user_id}"
+
+
 class AuthService:
-    def __init__(self, user_repo: UserRepository) -> None:
+    def __init__(
+        self, user_repo: UserRepository, media_service: MediaService, avatar_cache: BytesLRUCache, uow: UnitOfWork
+    ) -> None:
         self.user_repo = user_repo
+        self.media_service = media_service
+        self.avatar_cache = avatar_cache
+        self.uow = uow
         self.secret_key = settings.SECRET_KEY
         self.algorithm = settings.ALGORITHM
         self.access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -59,13 +76,21 @@ class AuthService:
             email = payload.get("email")
             if user_id is None:
                 raise InvalidTokenError(Errors.TOKEN_MISSING_PAYLOAD.value, details={"token_payload": payload})
-            return TokenData(sub=user_id, email=email)
+            token_data = TokenData(sub=user_id, email=email)
+            bind_user(token_data.sub)
+            return token_data
         except jwt.ExpiredSignatureError as e:
             raise TokenExpiredError(Errors.TOKEN_EXPIRED.value) from e
         except JWTError as e:
             error_message = f"Invalid token: {e}"
             raise InvalidTokenError(error_message) from e
 
+    def require_admin(self, token_data: TokenData) -> None:
+        """Raise unless the token belongs to one of the operators listed in ADMIN_EMAILS."""
+        admin_emails = {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+        if not token_data.email or token_data.email.lower() not in admin_emails:
+            raise AuthorizationError(Errors.ADMIN_ONLY.value, details={"email": token_data.email})
+
     async def create_user(self, user_data: UserCreate) -> User:
         """Create a new user."""
         # Check if user already exists
@@ -83,11 +108,13 @@ class AuthService:
             updated_at=datetime.now(),
         )
 
-        return await self.user_repo.create_user(user=db_user)
+        async with self.uow:
+            return await self.user_repo.create_user(user=db_user)
 
     async def update_user(self, user_id: int, profile_data: UserUpdate) -> User:
         """Updates user text metadata."""
-        return await self.user_repo.update_user(user_id=user_id, profile_data=profile_data)
+        async with self.uow:
+            return await self.user_repo.update_user(user_id=user_id, profile_data=profile_data)
 
     async def authenticate_user(self, email: str, password: str) -> User:
         """Authenticate user and return access token."""
@@ -102,26 +129,65 @@ class AuthService:
 
         return user
 
-    async def get_avatar_info(self, user_id: int) -> tuple[datetime, str] | None:
-        """Fetches metadata for cache validation."""
-        return await self.user_repo.get_avatar_metadata(user_id)
-
-    async def get_avatar_bytes(self, user_id: int) -> bytes | None:
-        """Fetches the raw image bytes."""
-        return await self.user_repo.get_avatar_blob(user_id)
+    async def get_avatar_ref(self, user_id: int) -> AvatarRef | None:
+        """
+        Where the user's avatar is stored, for cache validation.
+        Served from Redis when possible, so conditional requests need no database query.
+        """
+        key = avatar_ref_key(user_id)
+        try:
+            cached = redis_get(key=key, model=AvatarRef)
+        except ExternalServiceError as e:
+            logger.warning(f"Avatar ref lookup skipped Redis: {e.details}")
+            cached = None
+        if isinstance(cached, AvatarRef):
+            return cached
+
+        avatar = await self.user_repo.get_avatar_ref(user_id)
+        if avatar:
+            self._cache_avatar_ref(user_id, avatar)
+        return avatar
+
+    async def serve_avatar(
+        self, avatar: AvatarRef, headers: dict[str, str], variant: MediaVariant | None = None
+    ) -> Response:
+        """
+        Response with the image, or one of its resized variants, from memory when it was served recently.
+        Otherwise the media store serves it (streamed from disk with Range support, or redirected to S3), and
+        images up to AVATAR_CACHE_MAX_OBJECT_BYTES that the store can read locally are kept for next time.
+        """
+        key = media_key(avatar.avatar_hash, variant)
+        cached = self.avatar_cache.get(key)
+        if cached is not None:
+            data, media_type = cached
+            return Response(content=data, media_type=media_type, headers=headers)
+
+        stored_key, media_type = await self.media_service.resolve(
+            avatar.avatar_hash, avatar.media_type, variant=variant
+        )
+        data = await self.media_service.store.read_small(stored_key, max_bytes=settings.AVATAR_CACHE_MAX_OBJECT_BYTES)
+        if data is not None:
+            # Keys are content hashes, so an entry never goes stale; it is only evicted
+            self.avatar_cache.put(key, data, media_type)
+        return await self.media_service.store.serve(stored_key, media_type, headers)
 
-    async def update_avatar(self, user_id: int, file: UploadFile) -> None:
+    async def update_avatar(self, user_id: int, file: UploadFile) -> StoredMedia:
         """
         Business logic for updating a user avatar.
-        Handles file type validation and reading file bytes.
+        Handles file type validation and streams the image into the media store.
         """
         try:
             if not file.content_type or not file.content_type.startswith("image/"):
                 msg = "Invalid file type. Please upload an image (JPG, PNG, WebP)."
                 raise ValidationError(msg, details={"field": "file", "file_type": f"received: {file.content_type}"})
 
-            blob = await file.read()
-            await self.user_repo.upload_avatar(user_id=user_id, blob=blob, mime_type=file.content_type)
+            stored = await self.media_service.ingest(file, max_bytes=settings.AVATAR_MAX_UPLOAD_BYTES)
+            async with self.uow:
+                await self.user_repo.upload_avatar(
+                    user_id=user_id, avatar_hash=stored.content_hash, mime_type=stored.media_type
+                )
+            self._cache_avatar_ref(user_id, AvatarRef(avatar_hash=stored.content_hash, media_type=stored.media_type))
+            return stored
         except Exception as e:
             raise e
         finally:
@@ -129,7 +195,18 @@ class AuthService:
 
     async def remove_avatar(self, user_id: int) -> None:
         """Business logic to clear avatar data."""
-        await self.user_repo.remove_avatar(user_id=user_id)
+        async with self.uow:
+            await self.user_repo.remove_avatar(user_id=user_id)
+        try:
+            redis_delete(key=avatar_ref_key(user_id))
+        except ExternalServiceError as e:
+            logger.warning(f"Removed avatar ref may be served until it expires: {e.details}")
+
+    def _cache_avatar_ref(self, user_id: int, avatar: AvatarRef) -> None:
+        try:
+            redis_set(key=avatar_ref_key(user_id), value=avatar, ex=settings.AVATAR_REF_TTL_SECONDS)
+        except ExternalServiceError as e:
+            logger.warning(f"Avatar ref not cached: {e.details}")
 
     async def get_user_by_email(self, email: str) -> User:
         """Get user by email."""
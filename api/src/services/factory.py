@@ -1,24 +1,78 @@
+from functools import cache
+from pathlib import Path
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.config import settings
+from src.core.lru_cache import BytesLRUCache, LRUCache
+from src.core.response_cache import ResponseCache
+from src.db.unit_of_work import UnitOfWork
 from src.repositories.integrations.external_profile_repository import ExternalProfileRepository
 from src.repositories.integrations.github_repository import GithubRepository
+from src.repositories.integrations.sync_run_repository import SyncRunRepository
 from src.repositories.timeline_repository import TimelineRepository
 from src.repositories.user_repository import UserRepository
+from src.schemas.timelines import TimelineLayout
 from src.services.auth_service import AuthService
 from src.services.integrations.ai.providers.gemini_provider import GeminiProvider
 from src.services.integrations.ai.providers.ollama_provider import OllamaProvider
 from src.services.integrations.ai.timeline_analysis_service import TimelineAnalysisService
 from src.services.integrations.analysis.activity_clustering_service import ActivityClusteringService
 from src.services.integrations.analysis.significance_analyzer_service import SignificanceAnalyzerService
+from src.services.integrations.github_app_service import GithubAppService
 from src.services.integrations.github_service import GithubService
+from src.services.media.base_store import MediaStore
+from src.services.media.local_store import LocalMediaStore
+from src.services.media.media_service import MediaService
+from src.services.media.s3_store import S3MediaStore
+from src.services.sync_run_service import SyncRunService
 from src.services.timeline_service import TimelineService
 
 
 class ServiceFactory:
+    @staticmethod
+    @cache
+    def create_media_store() -> MediaStore:
+        # One store per process: the S3 store holds a pooled HTTP client
+        if settings.MEDIA_STORE_BACKEND == "s3":
+            return S3MediaStore(
+                endpoint_url=settings.MEDIA_S3_ENDPOINT_URL,
+                bucket=settings.MEDIA_S3_BUCKET,
+                access_key_id=settings.MEDIA_S3_ACCESS_KEY_ID,
+                secret_access_key=settings.MEDIA_S3_SECRET_ACCESS_KEY,
+                region=settings.MEDIA_S3_REGION,
+                presign_seconds=settings.MEDIA_S3_PRESIGN_SECONDS,
+            )
+        return LocalMediaStore(root=Path(settings.MEDIA_ROOT))
+
+    @staticmethod
+    def create_media_service() -> MediaService:
+        return MediaService(ServiceFactory.create_media_store())
+
+    @staticmethod
+    @cache
+    def create_avatar_cache() -> BytesLRUCache:
+        return BytesLRUCache(max_bytes=settings.AVATAR_CACHE_MAX_BYTES)
+
     @staticmethod
     def create_auth_service(db: AsyncSession) -> AuthService:
-        return AuthService(UserRepository(db))
+        return AuthService(
+            UserRepository(db),
+            ServiceFactory.create_media_service(),
+            ServiceFactory.create_avatar_cache(),
+            UnitOfWork(db),
+        )
+
+    @staticmethod
+    @cache
+    def create_layout_cache() -> LRUCache[TimelineLayout]:
+        return LRUCache(max_entries=settings.TIMELINE_LAYOUT_CACHE_ENTRIES)
+
+    @staticmethod
+    @cache
+    def create_response_cache() -> ResponseCache:
+        # One per process, so concurrent misses in this process share a single build
+        return ResponseCache(ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS)
 
     @staticmethod
     def create_timeline_service(db: AsyncSession) -> TimelineService:
@@ -38,7 +92,15 @@ class ServiceFactory:
         ai_service = TimelineAnalysisService(provider=ai_provider)
 
         # 4. Return the fully composed Service
-        return TimelineService(timeline_repo=repo, clustering_service=clustering, ai_service=ai_service)
+        return TimelineService(
+            timeline_repo=repo,
+            clustering_service=clustering,
+            ai_service=ai_service,
+            media_service=ServiceFactory.create_media_service(),
+            layout_cache=ServiceFactory.create_layout_cache(),
+            response_cache=ServiceFactory.create_response_cache(),
+            uow=UnitOfWork(db),
+        )
 
     @staticmethod
     def create_github_service(db: AsyncSession) -> GithubService:
@@ -48,4 +110,15 @@ class ServiceFactory:
             external_profile_repo=ExternalProfileRepository(db),
             analyzer_service=SignificanceAnalyzerService(),
             timeline_service=timeline_service,
+            response_cache=ServiceFactory.create_response_cache(),
+            app_service=GithubAppService(
+                app_id=settings.GITHUB_APP_ID,
+                private_key=settings.GITHUB_APP_PRIVATE_KEY,
+                api_url=settings.GITHUB_APP_API_URL,
+            ),
+            uow=UnitOfWork(db),
         )
+
+    @staticmethod
+    def create_sync_run_service(db: AsyncSession) -> SyncRunService:
+        return SyncRunService(SyncRunRepository(db))
@@ -1,6 +1,7 @@
 from google import genai
 
 from src.schemas.integrations.ai.timeline_analysis import AnalysisResult
+from src.services import sync_telemetry
 from src.services.integrations.ai.base_provider import AIProvider
 
 
@@ -24,4 +25,6 @@ class GeminiProvider(AIProvider):
                 "response_schema": AnalysisResult,
             },
         )
+        usage = response.usage_metadata
+        sync_telemetry.record_llm_call(tokens=usage.total_token_count if usage else None)
         return response.parsed
@@ -3,6 +3,7 @@ from openai import AsyncOpenAI
 from src.core.config import settings
 from src.exceptions.ai import AIServiceError
 from src.schemas.integrations.ai.timeline_analysis import AnalysisResult
+from src.services import sync_telemetry
 from src.services.integrations.ai.base_provider import AIProvider
 
 
@@ -34,6 +35,7 @@ class OllamaProvider(AIProvider):
                 temperature=0.0,
             )
 
+            sync_telemetry.record_llm_call(tokens=response.usage.total_tokens if response.usage else None)
             return response.choices[0].message.parsed
 
         except Exception as e:
@@ -28,8 +28,7 @@ class TimelineAnalysisService:
 
         files = set()
         for item in cluster.items:
-            for f in item.files or []:
-                files.add(f.get("filename", ""))
+            files.update(item.filenames)
 
         return f"""
         TASK: Analyze the following developer activity and decide if it warrants a timeline entry.
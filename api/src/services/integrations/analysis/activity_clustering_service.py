@@ -4,7 +4,7 @@ from datetime import timedelta
 
 from src.schemas.integrations.analysis.cluster import Cluster
 from src.schemas.integrations.analysis.significance import SignificanceLevel
-from src.schemas.integrations.github import CommitInDB
+from src.schemas.integrations.github import CommitSummary
 
 
 class ActivityClusteringService:
@@ -12,22 +12,20 @@ class ActivityClusteringService:
         self.window_days = timedelta(days=window_days)
         self.shallow_threshold = shallow_threshold
 
-    def cluster_commits(self, commits: list[CommitInDB]) -> list[Cluster]:
+    def cluster_commits(self, commits: list[CommitSummary]) -> list[Cluster]:
         """
         Clusters commits using a sliding time window and directory heuristics.
-        Expects commits sorted by date (asc).
+        Expects commits sorted by date (asc), as the repository returns them.
         """
         if not commits:
             return []
 
-        sorted_commits = sorted(commits, key=lambda x: x.authored_at)
-
         clusters = []
-        current_batch = [sorted_commits[0]]
+        current_batch = [commits[0]]
 
-        for i in range(1, len(sorted_commits)):
-            prev_commit = sorted_commits[i - 1]
-            curr_commit = sorted_commits[i]
+        for i in range(1, len(commits)):
+            prev_commit = commits[i - 1]
+            curr_commit = commits[i]
 
             # Time-Based Clustering (7-day sliding window)
             if curr_commit.authored_at - prev_commit.authored_at <= self.window_days:
@@ -64,7 +62,7 @@ class ActivityClusteringService:
             return most_common
         return "general"
 
-    def _create_cluster_object(self, batch: list[CommitInDB]) -> Cluster:
+    def _create_cluster_object(self, batch: list[CommitSummary]) -> Cluster:
         """Helper to aggregate data from a batch of commits into a Cluster."""
         all_files = []
         all_exts = []
@@ -75,9 +73,9 @@ class ActivityClusteringService:
             total_impact += commit.significance_score if commit.significance_score is not None else 0
             all_types.append(commit.significance_classification)
 
-            for f in commit.files:
-                all_files.append(f["filename"])
-                _, ext = os.path.splitext(f["filename"])
+            for filename in commit.filenames:
+                all_files.append(filename)
+                _, ext = os.path.splitext(filename)
                 if ext:
                     all_exts.append(ext)
 
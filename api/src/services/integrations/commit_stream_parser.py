@@ -0,0 +1,98 @@
+from collections.abc import AsyncIterator
+from typing import Any
+
+import ijson
+from loguru import logger
+from pydantic import TypeAdapter
+
+from src.schemas.integrations.github import Commit
+
+# Scalar paths kept from a commit detail payload; everything else (notably `files[].patch`) is dropped
+# by the parser as soon as it is read.
+KEPT_FIELDS: dict[str, tuple[str, ...]] = {
+    "sha": ("sha",),
+    "url": ("url",),
+    "html_url": ("html_url",),
+    "author.login": ("author", "login"),
+    "author.id": ("author", "id"),
+    "author.repos_url": ("author", "repos_url"),
+    "author.events_url": ("author", "events_url"),
+    "author.type": ("author", "type"),
+    "commit.message": ("commit", "message"),
+    "commit.author.name": ("commit", "author", "name"),
+    "commit.author.email": ("commit", "author", "email"),
+    "commit.author.date": ("commit", "author", "date"),
+    "stats.additions": ("stats", "additions"),
+    "stats.deletions": ("stats", "deletions"),
+    "stats.total": ("stats", "total"),
+}
+KEPT_FILE_FIELDS = {"filename", "status", "additions", "deletions", "changes"}
+FILE_PREFIX = "files.item"
+SCALAR_EVENTS = {"string", "number", "boolean", "null"}
+COMMIT = TypeAdapter(Commit)
+
+
+async def parse_commit_detail(chunks: AsyncIterator[bytes], buffer_limit: int) -> Commit:
+    """
+    Parse a commit detail response, buffering it whole only while its decoded size stays within
+    `buffer_limit`. Past that it is handed to the incremental parser, buffered chunks first. The decoded
+    size is what counts: a gzipped body can be many times larger than its Content-Length.
+    """
+    buffered: list[bytes] = []
+    size = 0
+    async for chunk in chunks:
+        buffered.append(chunk)
+        size += len(chunk)
+        if size > buffer_limit:
+            logger.info("Stream-parsing commit detail past {} decoded bytes", buffer_limit)
+            return await parse_commit_detail_stream(_replay(buffered, chunks))
+    return COMMIT.validate_json(b"".join(buffered))
+
+
+async def _replay(buffered: list[bytes], rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    while buffered:
+        yield buffered.pop(0)
+    async for chunk in rest:
+        yield chunk
+
+
+async def parse_commit_detail_stream(chunks: AsyncIterator[bytes]) -> Commit:
+    """
+    Incrementally parse a GitHub commit detail response.
+
+    Only the fields the sync pipeline uses are materialised; per-file `patch` bodies and URLs are
+    discarded while parsing, so memory stays flat even for commits touching thousands of files.
+    """
+    data: dict[str, Any] = {"files": []}
+    current_file: dict[str, Any] | None = None
+
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events)
+
+    async for chunk in chunks:
+        parser.send(chunk)
+        for prefix, event, value in events:
+            if prefix == FILE_PREFIX:
+                if event == "start_map":
+                    current_file = {}
+                elif event == "end_map" and current_file is not None:
+                    data["files"].append(current_file)
+                    current_file = None
+            elif current_file is not None and event in SCALAR_EVENTS:
+                field = prefix[len(FILE_PREFIX) + 1 :]
+                if field in KEPT_FILE_FIELDS:
+                    current_file[field] = value
+            elif prefix in KEPT_FIELDS and event in SCALAR_EVENTS:
+                _set_path(data, KEPT_FIELDS[prefix], value)
+            elif prefix in ("author", "commit.author") and event == "null":
+                _set_path(data, tuple(prefix.split(".")), None)
+        del events[:]
+
+    parser.close()
+    return Commit.model_validate(data)
+
+
+def _set_path(target: dict[str, Any], path: tuple[str, ...], value: object) -> None:
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    target[path[-1]] = value
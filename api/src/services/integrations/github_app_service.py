@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Annotated
+
+import httpx
+from jose import jwt
+from loguru import logger
+
+from src.core.config import Errors, GithubRoutes
+from src.core.redis_utils import redis_get, redis_set
+from src.exceptions.external import GitHubIntegrationError
+from src.schemas.integrations.github import InstallationToken
+
+# GitHub rejects app JWTs valid for more than 10 minutes; backdate `iat` to absorb clock drift.
+APP_JWT_TTL_SECONDS = 540
+APP_JWT_CLOCK_SKEW_SECONDS = 60
+# Installation tokens live for one hour; refresh them a little early so a request never races expiry.
+INSTALLATION_TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+# Installations rarely move, but repos can be transferred, so owner lookups are cached for a bounded time.
+INSTALLATION_LOOKUP_TTL_SECONDS = 3600
+NO_INSTALLATION = 0
+
+
+class GithubAppService:
+    """
+    Optional GitHub App authentication.
+
+    Repo-scoped sync traffic can run on installation tokens, which carry their own per-installation
+    rate limit instead of sharing the user's OAuth budget. Identity (OAuth login, `/user`, `/issues`)
+    always stays on the user's OAuth token.
+    """
+
+    def __init__(
+        self,
+        app_id: str,
+        private_key: str,
+        api_url: str,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.app_id = app_id
+        self.private_key = private_key
+        self.api_url = api_url.rstrip("/")
+        self.transport = transport
+        self.GITHUB_ROUTES = GithubRoutes
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.app_id and self.private_key)
+
+    def create_app_jwt(self) -> str:
+        """Sign a short-lived RS256 JWT that authenticates as the GitHub App itself."""
+        now = int(time.time())
+        payload = {
+            "iat": now - APP_JWT_CLOCK_SKEW_SECONDS,
+            "exp": now + APP_JWT_TTL_SECONDS,
+            "iss": self.app_id,
+        }
+        return jwt.encode(payload, self.private_key, algorithm="RS256")
+
+    async def get_installation_id_for_repo(
+        self, repo_full_name: Annotated[str, "owner/name of the repository"]
+    ) -> int | None:
+        """Resolve the installation covering a repository's owner, or None when the app is not installed there."""
+        owner = repo_full_name.split("/")[0]
+        key = f"github:app:installation:{owner}"
+        cached = redis_get(key=key)
+        if cached is not None:
+            installation_id = int(cached)
+            return installation_id if installation_id != NO_INSTALLATION else None
+
+        url = f"{self.api_url}/{self.GITHUB_ROUTES.REPOSITORIES}/{repo_full_name}/{self.GITHUB_ROUTES.INSTALLATION}"
+        async with self._client() as client:
+            response = await client.get(url, headers=self._app_headers())
+
+        if response.status_code == httpx.codes.NOT_FOUND:
+            logger.info("GitHub App is not installed for owner '{}'; falling back to OAuth.", owner)
+            redis_set(key=key, value=NO_INSTALLATION, ex=INSTALLATION_LOOKUP_TTL_SECONDS)
+            return None
+
+        self._raise_for_status(response)
+        installation_id = response.json()["id"]
+        redis_set(key=key, value=installation_id, ex=INSTALLATION_LOOKUP_TTL_SECONDS)
+        return installation_id
+
+    async def get_installation_token(self, installation_id: int) -> InstallationToken:
+        """Return a cached installation token, minting a new one when it is missing or about to expire."""
+        key = f"github:app:token:{installation_id}"
+        cached = redis_get(key=key, model=InstallationToken)
+        if isinstance(cached, InstallationToken) and not self._is_expiring(cached):
+            return cached
+
+        url = (
+            f"{self.api_url}/{self.GITHUB_ROUTES.APP}/{self.GITHUB_ROUTES.INSTALLATIONS}/"
+            f"{installation_id}/{self.GITHUB_ROUTES.ACCESS_TOKENS}"
+        )
+        async with self._client() as client:
+            response = await client.post(url, headers=self._app_headers())
+        self._raise_for_status(response)
+
+        data = response.json()
+        token = InstallationToken(installation_id=installation_id, token=data["token"], expires_at=data["expires_at"])
+
+        ttl = int((token.expires_at - datetime.now(timezone.utc) - INSTALLATION_TOKEN_REFRESH_MARGIN).total_seconds())
+        if ttl > 0:
+            redis_set(key=key, value=token, ex=ttl)
+
+        return token
+
+    async def get_token_for_repo(self, repo_full_name: str) -> str | None:
+        """Installation token for a repository, or None when app mode is off or the repo is not covered."""
+        if not self.enabled:
+            return None
+
+        installation_id = await self.get_installation_id_for_repo(repo_full_name=repo_full_name)
+        if installation_id is None:
+            return None
+
+        token = await self.get_installation_token(installation_id=installation_id)
+        return token.token
+
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport, timeout=httpx.Timeout(10.0))
+
+    def _app_headers(self) -> dict[str, str]:
+        return {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {self.create_app_jwt()}",
+        }
+
+    def _is_expiring(self, token: InstallationToken) -> bool:
+        return token.expires_at - INSTALLATION_TOKEN_REFRESH_MARGIN <= datetime.now(timezone.utc)
+
+    def _raise_for_status(self, response: httpx.Response) -> None:
+        if response.is_error:
+            raise GitHubIntegrationError(
+                Errors.GITHUB_INTEGRATION_ERROR.value,
+                details={"error": "GitHub App authentication failed", "status_code": response.status_code},
+            )
@@ -8,14 +8,18 @@ from loguru import logger
 from pydantic import TypeAdapter
 
 from src.core.config import Errors, GithubRoutes, settings
-from src.exceptions.external import GitHubIntegrationError
+from src.core.response_cache import ResponseCache
+from src.db.unit_of_work import UnitOfWork
+from src.exceptions.external import ExternalServiceError, GitHubIntegrationError
 from src.models.integrations import ExternalProfile, PlatformEnum, SyncStatusEnum, SyncStepEnum
 from src.models.integrations.github import GithubRepository as GithubRepoModel
+from src.models.integrations.github.github_repositories import GenerationStatusEnum
 from src.repositories.integrations.external_profile_repository import ExternalProfileRepository
 from src.repositories.integrations.github_repository import GithubRepository
 from src.schemas.integrations.analysis.significance import FileChange
 from src.schemas.integrations.github import (
     Commit,
+    CommitSummary,
     GithubSyncStatusResponse,
     GithubToken,
     Issue,
@@ -27,9 +31,14 @@ from src.schemas.integrations.github import (
 )
 from src.schemas.timelines import TimelineCreate
 from src.schemas.users import TokenData
+from src.services import sync_telemetry
 from src.services.integrations.analysis.significance_analyzer_service import SignificanceAnalyzerService
+from src.services.integrations.commit_stream_parser import parse_commit_detail
+from src.services.integrations.github_app_service import GithubAppService
 from src.services.timeline_service import TimelineService
 
+REPOSITORIES = TypeAdapter(list[RepositoryInDB])
+
 
 class GithubService:
     def __init__(
@@ -38,14 +47,22 @@ class GithubService:
         external_profile_repo: ExternalProfileRepository,
         analyzer_service: SignificanceAnalyzerService,
         timeline_service: TimelineService,
+        response_cache: ResponseCache,
+        app_service: GithubAppService,
+        uow: UnitOfWork,
     ) -> None:
         self.repo = repo
         self.external_profile_repo = external_profile_repo
         self.analyzer_service = analyzer_service
         self.timeline_service = timeline_service
+        self.response_cache = response_cache
+        self.app_service = app_service
+        self.uow = uow
         self.GITHUB_API_URL = settings.GITHUB_BASE_API_URL
         self.GITHUB_ROUTES = GithubRoutes
         self.PER_PAGE = settings.GITHUB_PER_PAGE
+        self.STREAMING_THRESHOLD_BYTES = settings.GITHUB_COMMIT_STREAMING_THRESHOLD_BYTES
+        self.LEASE_TTL = timedelta(seconds=settings.SYNC_LEASE_TTL_SECONDS)
         self.semaphore = asyncio.Semaphore(10)
 
     async def get_auth_url(self, user_id: Annotated[str, "Associated user ID"]) -> str:
@@ -113,7 +130,8 @@ class GithubService:
             last_synced_at=None,
         )
 
-        return await self.external_profile_repo.create_external_profile(external_profile=external_profile)
+        async with self.uow:
+            return await self.external_profile_repo.create_external_profile(external_profile=external_profile)
 
     async def update_external_profile_token(
         self, external_profile: ExternalProfile, github_token: GithubToken
@@ -124,7 +142,8 @@ class GithubService:
         external_profile.access_token_expires_at = github_token.access_token_expires_at
         external_profile.refresh_token_expires_at = github_token.refresh_token_expires_at
 
-        return await self.external_profile_repo.update_external_profile(external_profile=external_profile)
+        async with self.uow:
+            return await self.external_profile_repo.update_external_profile(external_profile=external_profile)
 
     async def get_external_profile(self, user_id: int) -> ExternalProfile:
         """Fetch the GitHub ExternalProfile for a given user."""
@@ -190,20 +209,7 @@ class GithubService:
         if not external_profile:
             return GithubSyncStatusResponse(is_connected=False, sync_status=SyncStatusEnum.IDLE)
 
-        if external_profile.sync_status == SyncStatusEnum.SYNCING:
-            now = datetime.now(timezone.utc)
-            stale_threshold = now - timedelta(minutes=15)
-            if external_profile.last_sync_attempt_at and external_profile.last_sync_attempt_at < stale_threshold:
-                await self.external_profile_repo.set_sync_status(
-                    profile_id=external_profile.id, status=SyncStatusEnum.IDLE, error="Stale sync detected."
-                )
-                return GithubSyncStatusResponse(
-                    is_connected=True,
-                    sync_status=SyncStatusEnum.IDLE,
-                    last_synced_at=external_profile.last_synced_at,
-                    last_sync_error="Stale sync detected.",
-                )
-
+        # Read-only: syncs whose worker died are failed by the lease reaper, not here.
         return GithubSyncStatusResponse(
             is_connected=True,
             sync_status=external_profile.sync_status,
@@ -221,14 +227,76 @@ class GithubService:
 
         return await self.repo.get_db_repositories(external_profile_id=external_profile.id)
 
-    async def attempt_sync_lock(self, profile_id: int) -> bool:
-        """Try to acquire a lock for syncing. Returns True if lock acquired, False if already syncing."""
-        return await self.external_profile_repo.attempt_sync_lock(profile_id=profile_id, platform=PlatformEnum.GITHUB)
+    async def get_repositories_tag(self, user_id: int) -> str:
+        """Tag of the user's repository list, which changes with every write to the profile's repositories."""
+        tag = await self._repositories_tag(user_id=user_id)
+        if tag is None:
+            raise GitHubIntegrationError(
+                Errors.GITHUB_INTEGRATION_ERROR.value, details={"error": "GitHub external profile not found"}
+            )
+        return tag
+
+    async def _repositories_tag(self, user_id: int) -> str | None:
+        profile = await self.external_profile_repo.get_repositories_version(
+            user_id=user_id, platform=PlatformEnum.GITHUB
+        )
+        if profile is None:
+            return None
+        profile_id, version = profile
+        return f"repositories-{profile_id}-v{version}"
+
+    async def get_all_repositories_cached(self, user_id: int, tag: str) -> bytes:
+        async def build() -> bytes:
+            repositories = await self.get_all_repositories(user_id=user_id)
+            return REPOSITORIES.dump_json(REPOSITORIES.validate_python(repositories, from_attributes=True))
+
+        return await self.response_cache.get_or_build(tag, build, lambda: self._repositories_tag(user_id=user_id))
+
+    async def acquire_sync_lease(self, profile_id: int) -> int | None:
+        """Try to lease the profile for syncing. Returns the fencing token, or None if already syncing."""
+        async with self.uow:
+            return await self.external_profile_repo.acquire_sync_lease(
+                profile_id=profile_id, platform=PlatformEnum.GITHUB, ttl=self.LEASE_TTL
+            )
+
+    async def acquire_generation_leases(self, repository_ids: list[int]) -> dict[int, int]:
+        """Lease repositories for timeline generation. Returns repo ID to fencing token for the ones leased."""
+        async with self.uow:
+            return await self.repo.acquire_generation_leases(repo_ids=repository_ids, ttl=self.LEASE_TTL)
+
+    async def run_scheduled_sync(self, profile_id: int, lease_token: int) -> bool:
+        """
+        Incremental sync triggered by the auto-sync scheduler rather than by the user.
+        The caller has already taken the sync lease. Returns False when the profile is gone.
+        """
+        profile = await self.external_profile_repo.get_external_profile_by_id(profile_id=profile_id)
+        if not profile:
+            logger.warning("Scheduled sync skipped: external profile {} no longer exists", profile_id)
+            return False
+
+        try:
+            access_token = await self.get_valid_access_token(github_profile=profile)
+        except Exception as e:
+            async with self.uow:
+                await self.external_profile_repo.release_sync_lease(
+                    profile_id=profile.id, lease_token=lease_token, status=SyncStatusEnum.FAILED, error=str(e)
+                )
+            raise
+
+        # Repos already carry `last_commit_sync_at`, so commits are only fetched since the previous run.
+        await self.run_full_sync(access_token=access_token, github_profile=profile, lease_token=lease_token)
+        return True
 
-    async def run_full_sync(self, access_token: str, github_profile: ExternalProfile) -> None:
+    async def run_full_sync(
+        self,
+        access_token: str,
+        github_profile: ExternalProfile,
+        lease_token: Annotated[int, "Fencing token of the sync lease held by the calling worker"],
+    ) -> None:
         """This is the main function called by the background task."""
         last_step = github_profile.sync_step
         profile_id = github_profile.id
+        released = False
         try:
             logger.info("Starting full sync for GitHub profile ID: {}", profile_id)
             timeout = httpx.Timeout(10.0, connect=5.0, read=30.0, write=10.0)
@@ -237,13 +305,19 @@ class GithubService:
                 "Authorization": f"{settings.TOKEN_TYPE} {access_token}",
             }
 
-            async with httpx.AsyncClient(headers=headers, timeout=timeout) as client:
+            transport = sync_telemetry.recording_transport()
+            async with httpx.AsyncClient(headers=headers, timeout=timeout, transport=transport) as client:
                 if last_step == SyncStepEnum.NONE:
                     logger.info("Syncing repositories for GitHub profile ID: {}", profile_id)
-                    db_repos = await self.sync_repositories(
-                        client=client, username=github_profile.external_username, external_profile_id=profile_id
-                    )
-                    await self.external_profile_repo.set_sync_step(profile_id=profile_id, step=SyncStepEnum.REPOS)
+                    # A step's rows and the step marker commit together, so a resumed sync never skips lost rows
+                    async with self.uow:
+                        with sync_telemetry.step("repos"):
+                            db_repos = await self.sync_repositories(
+                                client=client, username=github_profile.external_username, external_profile_id=profile_id
+                            )
+                        await self.external_profile_repo.set_sync_step(
+                            profile_id=profile_id, step=SyncStepEnum.REPOS, lease_token=lease_token
+                        )
                     last_step = SyncStepEnum.REPOS
                 else:
                     logger.info(
@@ -257,8 +331,14 @@ class GithubService:
 
                 if last_step == SyncStepEnum.REPOS:
                     logger.info("Syncing issues for GitHub profile ID: {}", profile_id)
-                    await self.sync_issues(client=client, external_profile_id=profile_id, repo_id_map=repos_id_map)
-                    await self.external_profile_repo.set_sync_step(profile_id=profile_id, step=SyncStepEnum.ISSUES)
+                    async with self.uow:
+                        with sync_telemetry.step("issues"):
+                            await self.sync_issues(
+                                client=client, external_profile_id=profile_id, repo_id_map=repos_id_map
+                            )
+                        await self.external_profile_repo.set_sync_step(
+                            profile_id=profile_id, step=SyncStepEnum.ISSUES, lease_token=lease_token
+                        )
                     last_step = SyncStepEnum.ISSUES
                 else:
                     logger.info(
@@ -267,13 +347,18 @@ class GithubService:
 
                 if last_step == SyncStepEnum.ISSUES:
                     logger.info("Syncing commits for GitHub profile ID: {}", profile_id)
-                    await self.sync_solo_commits(
-                        client=client,
-                        username=github_profile.external_username,
-                        external_profile_id=profile_id,
-                        db_repos=db_repos,
-                    )
-                    await self.external_profile_repo.set_sync_step(profile_id=profile_id, step=SyncStepEnum.COMMITS)
+                    # Commits are committed per repository (see sync_solo_commits), so each one resumes on its own
+                    with sync_telemetry.step("commits"):
+                        await self.sync_solo_commits(
+                            client=client,
+                            username=github_profile.external_username,
+                            external_profile_id=profile_id,
+                            db_repos=db_repos,
+                        )
+                    async with self.uow:
+                        await self.external_profile_repo.set_sync_step(
+                            profile_id=profile_id, step=SyncStepEnum.COMMITS, lease_token=lease_token
+                        )
                     last_step = SyncStepEnum.COMMITS
                 else:
                     logger.info(
@@ -282,22 +367,34 @@ class GithubService:
                         last_step,
                     )
 
-                await self.external_profile_repo.set_sync_status(profile_id=profile_id, status=SyncStatusEnum.COMPLETED)
+                async with self.uow:
+                    await self.external_profile_repo.mark_synced(profile_id=profile_id)
 
-                # Reset the step to NONE so the *next* sync runs everything
-                await self.external_profile_repo.set_sync_step(profile_id=profile_id, step=SyncStepEnum.NONE)
+                    # Reset the step to NONE so the *next* sync runs everything
+                    await self.external_profile_repo.set_sync_step(
+                        profile_id=profile_id, step=SyncStepEnum.NONE, lease_token=lease_token
+                    )
+                    await self.external_profile_repo.release_sync_lease(
+                        profile_id=profile_id, lease_token=lease_token, status=SyncStatusEnum.COMPLETED
+                    )
+                released = True
                 logger.info("Completed full sync for GitHub profile ID: {}", profile_id)
 
         except Exception as e:
-            await self.external_profile_repo.set_sync_status(
-                profile_id=profile_id, status=SyncStatusEnum.FAILED, error=str(e)
-            )
+            async with self.uow:
+                await self.external_profile_repo.release_sync_lease(
+                    profile_id=profile_id, lease_token=lease_token, status=SyncStatusEnum.FAILED, error=str(e)
+                )
+            released = True
             raise GitHubIntegrationError(Errors.GITHUB_INTEGRATION_ERROR.value, details={"error": str(e)}) from e
 
         finally:
-            profile = await self.get_external_profile(user_id=github_profile.user_id)
-            if profile.sync_status == SyncStatusEnum.SYNCING:
-                await self.external_profile_repo.set_sync_status(profile_id=profile_id, status=SyncStatusEnum.IDLE)
+            # Only reached unreleased when cancelled; a no-op if the lease was reaped or taken over meanwhile.
+            if not released:
+                async with self.uow:
+                    await self.external_profile_repo.release_sync_lease(
+                        profile_id=profile_id, lease_token=lease_token, status=SyncStatusEnum.IDLE
+                    )
 
     async def sync_repositories(
         self, client: httpx.AsyncClient, username: str, external_profile_id: int
@@ -308,7 +405,14 @@ class GithubService:
             logger.info("No repositories found for user: {}", username)
             return []
 
-        return await self.repo.bulk_upsert_repositories(repos_data=repos_data, external_profile_id=external_profile_id)
+        upserted = await self.repo.bulk_upsert_repositories(
+            repos_data=repos_data, external_profile_id=external_profile_id
+        )
+        sync_telemetry.record_upsert("github_repositories", upserted)
+        # The upsert only returns new or changed repos; commit sync needs every repo still on GitHub.
+        return await self.repo.get_repositories_by_github_ids(
+            external_profile_id=external_profile_id, github_repo_ids=[repo.id for repo in repos_data]
+        )
 
     async def sync_issues(
         self, client: httpx.AsyncClient, external_profile_id: int, repo_id_map: dict[str, int]
@@ -320,42 +424,90 @@ class GithubService:
             logger.info("No issues found for external profile ID: {}", external_profile_id)
             return
 
-        await self.repo.bulk_upsert_issues(
+        upserted = await self.repo.bulk_upsert_issues(
             issue_data=issues, external_profile_id=external_profile_id, repo_id_map=repo_id_map
         )
+        sync_telemetry.record_upsert("github_issues", upserted)
 
     async def sync_solo_commits(
         self, client: httpx.AsyncClient, username: str, external_profile_id: int, db_repos: list[GithubRepoModel]
     ) -> None:
         """Fetches and saves commit details for non-forked repos."""
+        installation_clients: dict[str, httpx.AsyncClient] = {}
 
-        for repo in db_repos:
-            if repo.is_fork:
-                logger.info("Skipping forked repository: {}", repo.full_name)
-                continue
-            sync_start_date = repo.last_commit_sync_at
-
-            lightweight_commits = await self.fetch_author_commits_for_repo(
-                client=client, repo_full_name=repo.full_name, author=username, since_date=sync_start_date
-            )
+        try:
+            for repo in db_repos:
+                if repo.is_fork:
+                    logger.info("Skipping forked repository: {}", repo.full_name)
+                    continue
+                sync_start_date = repo.last_commit_sync_at
+                repo_client = await self.get_repo_client(
+                    client=client, repo_full_name=repo.full_name, installation_clients=installation_clients
+                )
 
-            if not lightweight_commits:
-                logger.info(
-                    "No new commits found for repository '{}' since {}.",
-                    repo.full_name,
-                    sync_start_date,
+                lightweight_commits = await self.fetch_author_commits_for_repo(
+                    client=repo_client, repo_full_name=repo.full_name, author=username, since_date=sync_start_date
                 )
-                continue
 
-            detailed_commits = await self.fetch_details_for_commits(client=client, repo_commits=lightweight_commits)
+                if not lightweight_commits:
+                    logger.info(
+                        "No new commits found for repository '{}' since {}.",
+                        repo.full_name,
+                        sync_start_date,
+                    )
+                    continue
 
-            if detailed_commits:
-                await self.repo.bulk_upsert_commit_details(
-                    commit_data_list=detailed_commits, external_profile_id=external_profile_id, repo_db_id=repo.id
+                detailed_commits = await self.fetch_details_for_commits(
+                    client=repo_client, repo_commits=lightweight_commits
                 )
-                await self.repo.update_repo_sync_time(repo_db_id=repo.id)
-            else:
-                logger.info("Could not fetch detailed commits fetched for repository: {}", repo.full_name)
+
+                if detailed_commits:
+                    # The sync time only moves forward together with the commits it covers
+                    async with self.uow:
+                        upserted = await self.repo.bulk_upsert_commit_details(
+                            commit_data_list=detailed_commits,
+                            external_profile_id=external_profile_id,
+                            repo_db_id=repo.id,
+                        )
+                        await self.repo.update_repo_sync_time(repo_db_id=repo.id)
+                    sync_telemetry.record_upsert("github_commits", upserted)
+                else:
+                    logger.info("Could not fetch detailed commits fetched for repository: {}", repo.full_name)
+        finally:
+            for installation_client in installation_clients.values():
+                await installation_client.aclose()
+
+    async def get_repo_client(
+        self,
+        client: Annotated[httpx.AsyncClient, "Client authenticated with the user's OAuth token"],
+        repo_full_name: str,
+        installation_clients: Annotated[dict[str, httpx.AsyncClient], "Clients opened so far, keyed by token"],
+    ) -> httpx.AsyncClient:
+        """
+        Pick the client for repo-scoped calls.
+        In GitHub App mode repos covered by an installation use its token; everything else stays on OAuth.
+        """
+        if not self.app_service.enabled:
+            return client
+
+        try:
+            installation_token = await self.app_service.get_token_for_repo(repo_full_name=repo_full_name)
+        # A failing token cache (Redis) is no reason to abort the sync either: OAuth still works
+        except (GitHubIntegrationError, ExternalServiceError) as e:
+            logger.warning("Falling back to OAuth for '{}': {}", repo_full_name, e.details)
+            return client
+
+        if not installation_token:
+            return client
+
+        if installation_token not in installation_clients:
+            headers = httpx.Headers(client.headers)
+            headers["Authorization"] = f"{settings.TOKEN_TYPE} {installation_token}"
+            installation_clients[installation_token] = httpx.AsyncClient(
+                headers=headers, timeout=client.timeout, transport=sync_telemetry.recording_transport()
+            )
+
+        return installation_clients[installation_token]
 
     async def fetch_user_issues(self, client: httpx.AsyncClient) -> list[Issue]:
         """Fetch all issues assigned to the authenticated user."""
@@ -498,11 +650,13 @@ class GithubService:
     ) -> Commit:
         """Helper to get a single commit's details and inject the repo_id."""
         url = commit.url
-        response = await client.get(url)
-        response.raise_for_status()
-
-        adapter = TypeAdapter(Commit)
-        commit_detail = adapter.validate_python(response.json())
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            # Vendor dumps and generated-code commits can carry thousands of patches; past the threshold they
+            # are parsed incrementally, keeping only per-file counts instead of buffering the whole body.
+            commit_detail = await parse_commit_detail(
+                response.aiter_bytes(), buffer_limit=self.STREAMING_THRESHOLD_BYTES
+            )
 
         file_changes = [
             FileChange(filename=f.filename, additions=f.additions, deletions=f.deletions)
@@ -525,8 +679,8 @@ class GithubService:
                 return None
             return await self.fetch_commit_detail(client=client, commit=commit)
 
-    async def get_commits_by_repo_id(self, repo_id: int, user_id: int) -> list[Commit]:
-        """Fetch commits from the database for a given repository ID."""
+    async def get_commits_by_repo_id(self, repo_id: int, user_id: int) -> list[CommitSummary]:
+        """Fetch a repository's commits from the database, oldest first, as lightweight summaries."""
         external_profile = await self.external_profile_repo.get_external_profile_by_user_id(
             user_id=user_id, platform=PlatformEnum.GITHUB
         )
@@ -534,7 +688,7 @@ class GithubService:
             raise GitHubIntegrationError(
                 Errors.GITHUB_INTEGRATION_ERROR.value, details={"error": "GitHub external profile not found"}
             )
-        return await self.repo.get_commits_by_repo_id(repo_id=repo_id, external_profile_id=external_profile.id)
+        return await self.repo.get_commit_summaries_by_repo_id(repo_id=repo_id, external_profile_id=external_profile.id)
 
     async def generate_timelines_from_github(self, token_data: TokenData) -> None:
         """Generate timelines for a GitHub user."""
@@ -565,32 +719,51 @@ class GithubService:
                     commits=commits, timeline_id=timeline.id, repo_id=repo.id
                 )
 
-    async def generate_github_timelines(self, token_data: TokenData, repository_ids: list[int]) -> None:
+    async def generate_github_timelines(
+        self, token_data: TokenData, leases: Annotated[dict[int, int], "Repo ID to generation lease fencing token"]
+    ) -> None:
         """
-        Iterates through all synced repositories and generates individual timelines.
+        Iterates through the leased repositories and generates individual timelines.
+        Every lease is released on the way out, with the outcome recorded per repository.
         """
-        external_profile = await self.external_profile_repo.get_external_profile_by_user_id(
-            user_id=token_data.sub, platform=PlatformEnum.GITHUB
-        )
-        if not external_profile:
-            raise GitHubIntegrationError(
-                Errors.GITHUB_INTEGRATION_ERROR.value, details={"error": "GitHub external profile not found"}
+        completed: dict[int, int] = {}
+        try:
+            external_profile = await self.external_profile_repo.get_external_profile_by_user_id(
+                user_id=token_data.sub, platform=PlatformEnum.GITHUB
             )
+            if not external_profile:
+                raise GitHubIntegrationError(
+                    Errors.GITHUB_INTEGRATION_ERROR.value, details={"error": "GitHub external profile not found"}
+                )
 
-        repos = await self.repo.get_repositories_by_ids(
-            external_profile_id=external_profile.id, repo_ids=repository_ids
-        )
-        print(f"Generating timelines for repositories with IDs: {repository_ids}")
-        if not repos:
-            logger.warning("No repositories found for external profile ID: {}", external_profile.id)
-            return
-
-        for repo in repos:
-            await self.generate_timeline_for_repo(repo=repo, token_data=token_data)
-
-        logger.info(
-            "Completed timeline generation for all repositories of external profile ID: {}", external_profile.id
-        )
+            repos = await self.repo.get_repositories_by_ids(
+                external_profile_id=external_profile.id, repo_ids=list(leases)
+            )
+            logger.info("Generating timelines for repositories with IDs: {}", list(leases))
+            if not repos:
+                logger.warning("No repositories found for external profile ID: {}", external_profile.id)
+                return
+
+            for repo in repos:
+                try:
+                    await self.generate_timeline_for_repo(repo=repo, token_data=token_data)
+                except Exception as e:
+                    async with self.uow:
+                        await self.repo.release_generation_leases(
+                            leases={repo.id: leases[repo.id]}, status=GenerationStatusEnum.FAILED, error=str(e)
+                        )
+                    raise
+                completed[repo.id] = leases[repo.id]
+
+            logger.info(
+                "Completed timeline generation for all repositories of external profile ID: {}", external_profile.id
+            )
+        finally:
+            # Repos never reached (or not owned by this profile) go back to IDLE; failed ones are already released.
+            untouched = {repo_id: token for repo_id, token in leases.items() if repo_id not in completed}
+            async with self.uow:
+                await self.repo.release_generation_leases(leases=completed, status=GenerationStatusEnum.COMPLETED)
+                await self.repo.release_generation_leases(leases=untouched, status=GenerationStatusEnum.IDLE)
 
     async def generate_timeline_for_repo(self, repo: Repository, token_data: TokenData) -> None:
         """
@@ -614,6 +787,7 @@ class GithubService:
         )
 
         timeline = await self.timeline_service.create_timeline(timeline=timeline_create, token_data=token_data)
+        sync_telemetry.record_rows("timelines", 1)
 
         try:
             await self.timeline_service.generate_nodes_for_commits(
@@ -661,10 +835,13 @@ class GithubService:
         except Exception as e:
             logger.warning(f"Could not revoke GitHub token for user {user_id}: {str(e)}")
 
-        # Because of ondelete="CASCADE" in your models, this automatically deletes:
+        # Nodes are unlinked from the repositories and commits deleted from the profile's own partition first;
+        # ondelete="CASCADE" then takes care of:
         # - github_repositories
-        # - github_commits
         # - github_issues
-        await self.external_profile_repo.delete_external_profile(profile_id=external_profile.id)
+        async with self.uow:
+            await self.timeline_service.unlink_github_profile(external_profile_id=external_profile.id)
+            await self.repo.delete_commits_by_profile_id(external_profile_id=external_profile.id)
+            await self.external_profile_repo.delete_external_profile(profile_id=external_profile.id)
 
         logger.info(f"Successfully disconnected GitHub and cleared data for user {user_id}")
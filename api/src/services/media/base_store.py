@@ -0,0 +1,67 @@
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from pathlib import Path
+
+import anyio
+from fastapi import Response
+
+
+class MediaStore(ABC):
+    """
+    Content-addressed blob storage for uploaded media.
+
+    Files are written once under a key (the SHA-256 of their bytes for originals) and never modified, so a
+    key that exists already holds the right bytes and identical uploads are stored only once. Uploads are
+    first staged to a local file, then handed to `save`.
+    """
+
+    def __init__(self, staging_dir: Path) -> None:
+        self.staging_dir = staging_dir
+
+    def new_staging_file(self) -> Path:
+        """Create an empty file to stage an upload in; `save` consumes it."""
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=self.staging_dir, prefix="upload-")
+        os.close(fd)
+        return Path(name)
+
+    async def save_bytes(self, data: bytes, key: str | None = None) -> str:
+        """Store in-memory bytes under the key (their content hash by default), which is returned."""
+        key = key or hashlib.sha256(data).hexdigest()
+        if await self.exists(key):
+            return key
+
+        staged = self.new_staging_file()
+        try:
+            await anyio.Path(staged).write_bytes(data)
+            await self.save(key, staged)
+        finally:
+            staged.unlink(missing_ok=True)
+        return key
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Whether a file is stored under the key."""
+
+    @abstractmethod
+    async def save(self, key: str, staged: Path) -> None:
+        """Store a staged file under the key. The staged file may be moved away."""
+
+    @abstractmethod
+    async def read(self, key: str) -> bytes:
+        """Read a whole stored file. Raises MediaNotFoundError when it is missing."""
+
+    @abstractmethod
+    async def read_small(self, key: str, max_bytes: int) -> bytes | None:
+        """Read a stored file of at most `max_bytes`, for in-memory caching; None when it is larger."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a stored file, if present."""
+
+    @abstractmethod
+    async def serve(self, key: str, media_type: str, headers: Mapping[str, str]) -> Response:
+        """A response delivering the stored file without loading it into memory."""
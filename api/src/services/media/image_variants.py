@@ -0,0 +1,50 @@
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.schemas.media import MediaVariant
+
+VARIANT_MEDIA_TYPE = "image/webp"
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    max_side: int | None  # Longest edge in pixels; None keeps the original size
+    quality: int
+
+
+VARIANT_SPECS: dict[MediaVariant, VariantSpec] = {
+    MediaVariant.THUMB: VariantSpec(max_side=320, quality=70),
+    MediaVariant.MEDIUM: VariantSpec(max_side=1280, quality=80),
+    MediaVariant.WEBP: VariantSpec(max_side=None, quality=85),
+}
+
+
+def render_variants(data: bytes, variants: list[MediaVariant]) -> dict[MediaVariant, bytes]:
+    """
+    Decode an image once and encode each requested variant as WebP.
+
+    CPU-bound, so it runs in a worker process; returns nothing when the bytes are not an image Pillow can read.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return {}
+
+    # Phone photos are stored sideways with an orientation tag that WebP output would drop
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+    rendered = {}
+    for variant in variants:
+        spec = VARIANT_SPECS[variant]
+        resized = image.copy()
+        if spec.max_side:
+            resized.thumbnail((spec.max_side, spec.max_side), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        resized.save(out, format="WEBP", quality=spec.quality, method=4)
+        rendered[variant] = out.getvalue()
+    return rendered
@@ -0,0 +1,58 @@
+import os
+from collections.abc import Mapping
+from pathlib import Path
+
+import anyio
+from fastapi import Response
+from fastapi.responses import FileResponse
+
+from src.core.config import Errors
+from src.exceptions.media import MediaNotFoundError
+from src.services.media.base_store import MediaStore
+
+
+class LocalMediaStore(MediaStore):
+    """Media files in a local directory, fanned out by the first two characters of their key."""
+
+    def __init__(self, root: Path) -> None:
+        # Staged next to the files, so saving is an atomic rename on the same filesystem
+        super().__init__(staging_dir=root / ".staging")
+        self.root = root
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    async def exists(self, key: str) -> bool:
+        return await anyio.Path(self.path(key)).is_file()
+
+    async def save(self, key: str, staged: Path) -> None:
+        target = self.path(key)
+        await anyio.Path(target.parent).mkdir(parents=True, exist_ok=True)
+        await anyio.to_thread.run_sync(os.replace, staged, target)
+
+    async def read(self, key: str) -> bytes:
+        try:
+            return await anyio.Path(self.path(key)).read_bytes()
+        except FileNotFoundError as e:
+            raise MediaNotFoundError(Errors.MEDIA_NOT_FOUND.value, details={"key": key}) from e
+
+    async def read_small(self, key: str, max_bytes: int) -> bytes | None:
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, self.path(key))
+        except FileNotFoundError as e:
+            raise MediaNotFoundError(Errors.MEDIA_NOT_FOUND.value, details={"key": key}) from e
+        if stat_result.st_size > max_bytes:
+            return None
+        return await self.read(key)
+
+    async def delete(self, key: str) -> None:
+        await anyio.Path(self.path(key)).unlink(missing_ok=True)
+
+    async def serve(self, key: str, media_type: str, headers: Mapping[str, str]) -> Response:
+        # Streamed from disk in chunks, with Range and If-Range handled by FileResponse itself
+        path = self.path(key)
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, path)
+        except FileNotFoundError as e:
+            raise MediaNotFoundError(Errors.MEDIA_NOT_FOUND.value, details={"key": key}) from e
+        return FileResponse(path, media_type=media_type, headers=dict(headers), stat_result=stat_result)
@@ -0,0 +1,100 @@
+import hashlib
+from collections.abc import Mapping
+
+import anyio
+import anyio.to_process
+from anyio.lowlevel import RunVar
+from fastapi import Response, UploadFile
+
+from src.core.config import Errors, settings
+from src.exceptions.media import MediaTooLargeError
+from src.schemas.media import MediaVariant, StoredMedia, media_key
+from src.services.media.base_store import MediaStore
+from src.services.media.image_variants import VARIANT_MEDIA_TYPE, render_variants
+
+# One per event loop (like anyio's own default limiter), shared by every MediaService running on it
+_variant_workers: RunVar[anyio.CapacityLimiter] = RunVar("media_variant_workers")
+
+
+def variant_workers() -> anyio.CapacityLimiter:
+    try:
+        return _variant_workers.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(settings.MEDIA_VARIANT_WORKERS)
+        _variant_workers.set(limiter)
+        return limiter
+
+
+class MediaService:
+    def __init__(self, store: MediaStore, chunk_size: int = settings.MEDIA_UPLOAD_CHUNK_BYTES) -> None:
+        self.store = store
+        self.chunk_size = chunk_size
+
+    async def ingest(self, upload: UploadFile, max_bytes: int) -> StoredMedia:
+        """
+        Copy an upload into the store in chunks, hashing as it goes, so memory stays flat whatever the file
+        size. Raises MediaTooLargeError as soon as more than `max_bytes` have been read.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        staged = self.store.new_staging_file()
+        try:
+            async with await anyio.open_file(staged, "wb") as file:
+                while chunk := await upload.read(self.chunk_size):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise MediaTooLargeError(Errors.MEDIA_TOO_LARGE.value, details={"max_bytes": max_bytes})
+                    digest.update(chunk)
+                    await file.write(chunk)
+
+            content_hash = digest.hexdigest()
+            if not await self.store.exists(content_hash):
+                await self.store.save(content_hash, staged)
+        finally:
+            await anyio.Path(staged).unlink(missing_ok=True)
+
+        return StoredMedia(
+            content_hash=content_hash,
+            size_bytes=size,
+            media_type=upload.content_type or "application/octet-stream",
+            filename=upload.filename,
+        )
+
+    async def read(self, content_hash: str) -> bytes:
+        return await self.store.read(content_hash)
+
+    async def serve(
+        self, content_hash: str, media_type: str, headers: Mapping[str, str], variant: MediaVariant | None = None
+    ) -> Response:
+        """Response with the original or one of its variants, picked as in `resolve`."""
+        key, media_type = await self.resolve(content_hash, media_type, variant=variant)
+        return await self.store.serve(key, media_type, headers)
+
+    async def resolve(self, content_hash: str, media_type: str, variant: MediaVariant | None = None) -> tuple[str, str]:
+        """
+        Store key and media type of the original or one of its variants. A variant that was never rendered
+        (media uploaded before variants existed, or a lost background task) is rendered now; media that is
+        not an image always resolves to the original.
+        """
+        if variant and await self.generate_variants(content_hash, media_type, [variant]):
+            return media_key(content_hash, variant), VARIANT_MEDIA_TYPE
+        return content_hash, media_type
+
+    async def generate_variants(
+        self, content_hash: str, media_type: str, variants: list[MediaVariant] | None = None
+    ) -> list[MediaVariant]:
+        """Render the variants (all by default) missing from the store and return those that exist."""
+        if not media_type.startswith("image/"):
+            return []
+
+        variants = variants or list(MediaVariant)
+        missing = [variant for variant in variants if not await self.store.exists(media_key(content_hash, variant))]
+        if not missing:
+            return variants
+
+        # Decoding and encoding are CPU-bound, so they run in worker processes instead of the event loop
+        data = await self.store.read(content_hash)
+        rendered = await anyio.to_process.run_sync(render_variants, data, missing, limiter=variant_workers())
+        for variant, variant_data in rendered.items():
+            await self.store.save_bytes(variant_data, key=media_key(content_hash, variant))
+        return [variant for variant in variants if variant not in missing or variant in rendered]
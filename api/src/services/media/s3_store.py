@@ -0,0 +1,243 @@
+import hashlib
+import hmac
+import tempfile
+from collections.abc import AsyncIterator, Mapping
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import anyio
+import httpx
+from fastapi import Response, status
+from fastapi.responses import RedirectResponse
+
+from src.core.config import Errors
+from src.exceptions.media import MediaNotFoundError
+from src.services.media.base_store import MediaStore
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+EMPTY_PAYLOAD_SHA256 = hashlib.sha256(b"").hexdigest()
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class S3MediaStore(MediaStore):
+    """
+    Media files in an S3-compatible bucket (AWS S3, MinIO, R2, ...), spoken to over plain HTTP with
+    Signature V4 and path-style URLs. Reads are served by redirecting to a short-lived presigned URL, so the
+    bytes never pass through the API.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key_id: str,
+        secret_access_key: str,
+        region: str,
+        presign_seconds: int,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        super().__init__(staging_dir=Path(tempfile.gettempdir()) / "media-staging")
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.region = region
+        self.presign_seconds = presign_seconds
+        self.client = client or httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=60.0, write=60.0))
+
+    def object_url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{key[:2]}/{key}"
+
+    async def exists(self, key: str) -> bool:
+        response = await self._request("HEAD", key)
+        if response.status_code == status.HTTP_404_NOT_FOUND:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def save(self, key: str, staged: Path) -> None:
+        size = (await anyio.Path(staged).stat()).st_size
+        response = await self._request(
+            "PUT",
+            key,
+            content=_file_chunks(staged),
+            headers={"Content-Length": str(size)},
+            payload_sha256=await _file_sha256(staged),
+        )
+        response.raise_for_status()
+
+    async def read(self, key: str) -> bytes:
+        response = await self._request("GET", key)
+        if response.status_code == status.HTTP_404_NOT_FOUND:
+            raise MediaNotFoundError(Errors.MEDIA_NOT_FOUND.value, details={"key": key})
+        response.raise_for_status()
+        return response.content
+
+    async def read_small(self, key: str, max_bytes: int) -> bytes | None:
+        # Reads are redirected to the bucket, so nothing is fetched through the API to be cached
+        return None
+
+    async def delete(self, key: str) -> None:
+        response = await self._request("DELETE", key)
+        if response.status_code != status.HTTP_404_NOT_FOUND:
+            response.raise_for_status()
+
+    async def serve(self, key: str, media_type: str, headers: Mapping[str, str]) -> Response:
+        url = self.presigned_url(key, media_type=media_type)
+        # The redirect must not outlive its signature; the object itself carries the caching headers
+        return RedirectResponse(
+            url,
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers={**headers, "Cache-Control": "private, no-store"},
+        )
+
+    def presigned_url(self, key: str, media_type: str | None = None, now: datetime | None = None) -> str:
+        """A GET URL for the object that anyone can use until it expires."""
+        url = self.object_url(key)
+        query = {"response-content-type": media_type} if media_type else {}
+        return presign_url(
+            "GET",
+            url,
+            query=query,
+            access_key_id=self.access_key_id,
+            secret_access_key=self.secret_access_key,
+            region=self.region,
+            expires=self.presign_seconds,
+            now=now or datetime.now(timezone.utc),
+        )
+
+    async def _request(
+        self,
+        method: str,
+        key: str,
+        content: AsyncIterator[bytes] | None = None,
+        headers: Mapping[str, str] | None = None,
+        payload_sha256: str = EMPTY_PAYLOAD_SHA256,
+    ) -> httpx.Response:
+        url = self.object_url(key)
+        signed = sign_headers(
+            method,
+            url,
+            headers={"Host": urlsplit(url).netloc, **(headers or {})},
+            payload_sha256=payload_sha256,
+            access_key_id=self.access_key_id,
+            secret_access_key=self.secret_access_key,
+            region=self.region,
+            now=datetime.now(timezone.utc),
+        )
+        return await self.client.request(method, url, content=content, headers=signed)
+
+
+async def _file_chunks(path: Path) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(path, "rb") as file:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            yield chunk
+
+
+async def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    async for chunk in _file_chunks(path):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+# --- Signature V4 (https://docs.aws.amazon.com/AmazonS3/latest/API/sig-v4-authenticating-requests.html) ---
+
+
+def sign_headers(
+    method: str,
+    url: str,
+    headers: Mapping[str, str],
+    payload_sha256: str,
+    access_key_id: str,
+    secret_access_key: str,
+    region: str,
+    now: datetime,
+) -> dict[str, str]:
+    """Return the headers plus the `x-amz-*` and `Authorization` headers that sign the request."""
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    headers = {**headers, "x-amz-content-sha256": payload_sha256, "x-amz-date": amz_date}
+    canonical_headers = {name.lower(): " ".join(str(value).split()) for name, value in headers.items()}
+    signed_headers = ";".join(sorted(canonical_headers))
+
+    parts = urlsplit(url)
+    canonical_request = "\n".join(
+        [
+            method,
+            quote(parts.path or "/", safe="/~"),
+            _canonical_query(dict(_parse_query(parts.query))),
+            "".join(f"{name}:{canonical_headers[name]}\n" for name in sorted(canonical_headers)),
+            signed_headers,
+            payload_sha256,
+        ]
+    )
+    scope = _scope(now, region)
+    signature = _signature(canonical_request, amz_date, scope, secret_access_key)
+    return {
+        **headers,
+        "Authorization": (
+            f"{ALGORITHM} Credential={access_key_id}/{scope}, SignedHeaders={signed_headers}, Signature={signature}"
+        ),
+    }
+
+
+def presign_url(
+    method: str,
+    url: str,
+    query: Mapping[str, str],
+    access_key_id: str,
+    secret_access_key: str,
+    region: str,
+    expires: int,
+    now: datetime,
+) -> str:
+    """Return the URL with the query string that signs it for `expires` seconds."""
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    scope = _scope(now, region)
+    parts = urlsplit(url)
+    params = {
+        **query,
+        "X-Amz-Algorithm": ALGORITHM,
+        "X-Amz-Credential": f"{access_key_id}/{scope}",
+        "X-Amz-Date": amz_date,
+        "X-Amz-Expires": str(expires),
+        "X-Amz-SignedHeaders": "host",
+    }
+    canonical_query = _canonical_query(params)
+    canonical_request = "\n".join(
+        [
+            method,
+            quote(parts.path or "/", safe="/~"),
+            canonical_query,
+            f"host:{parts.netloc}\n",
+            "host",
+            UNSIGNED_PAYLOAD,
+        ]
+    )
+    signature = _signature(canonical_request, amz_date, scope, secret_access_key)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}?{canonical_query}&X-Amz-Signature={signature}"
+
+
+def _scope(now: datetime, region: str) -> str:
+    return f"{now:%Y%m%d}/{region}/s3/aws4_request"
+
+
+def _parse_query(query: str) -> list[tuple[str, str]]:
+    pairs = [pair.partition("=") for pair in query.split("&") if pair]
+    return [(name, value) for name, _, value in pairs]
+
+
+def _canonical_query(params: Mapping[str, str]) -> str:
+    encoded = sorted((quote(name, safe="-_.~"), quote(value, safe="-_.~")) for name, value in params.items())
+    return "&".join(f"{name}={value}" for name, value in encoded)
+
+
+def _signature(canonical_request: str, amz_date: str, scope: str, secret_access_key: str) -> str:
+    string_to_sign = "\n".join([ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()])
+    # The signing key is derived through each part of the scope: date, region, service, "aws4_request"
+    key = f"AWS4{secret_access_key}".encode()
+    for part in scope.split("/"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
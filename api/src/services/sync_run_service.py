@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+
+from src.repositories.integrations.sync_run_repository import SyncRunRepository
+from src.schemas.sync_runs import SyncRunSummary, SyncRunUsage
+
+
+class SyncRunService:
+    def __init__(self, sync_run_repo: SyncRunRepository) -> None:
+        self.sync_run_repo = sync_run_repo
+
+    async def get_summary(self, hours: int) -> SyncRunSummary:
+        """Aggregate sync and timeline generation cost over the last `hours`, overall and per user."""
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        rows = await self.sync_run_repo.get_usage_by_user(since=since)
+        requests_by_endpoint = await self.sync_run_repo.get_requests_by_endpoint(since=since)
+
+        users = [SyncRunUsage.model_validate(row) for row in rows]
+        requests_total = sum(u.requests_total for u in users)
+        not_modified = sum(u.not_modified_responses for u in users)
+
+        return SyncRunSummary(
+            since=since,
+            runs=sum(u.runs for u in users),
+            failed_runs=sum(u.failed_runs for u in users),
+            duration_ms=sum(u.duration_ms for u in users),
+            requests_total=requests_total,
+            not_modified_ratio=not_modified / requests_total if requests_total else 0.0,
+            bytes_received=sum(u.bytes_received for u in users),
+            rows_written=sum(u.rows_written for u in users),
+            rows_unchanged=sum(u.rows_unchanged for u in users),
+            llm_calls=sum(u.llm_calls for u in users),
+            llm_tokens=sum(u.llm_tokens for u in users),
+            requests_by_endpoint=dict(requests_by_endpoint.most_common()),
+            users=users,
+        )
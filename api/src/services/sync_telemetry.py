@@ -0,0 +1,182 @@
+"""
+Per-run telemetry for background syncs and timeline generation.
+
+A `SyncRunRecorder` is bound to the running worker through a context variable, so the HTTP transport,
+repositories' callers and AI providers can report into it without threading it through every call.
+Outside of a recorded run every helper here is a no-op.
+"""
+
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+import httpx
+
+from src.db.bulk import UpsertResult
+from src.models.integrations import SyncRun, SyncRunKindEnum, SyncRunStatusEnum, SyncRunTriggerEnum
+
+RATE_LIMIT_STATUSES = {httpx.codes.FORBIDDEN, httpx.codes.TOO_MANY_REQUESTS}
+
+_current_run: ContextVar["SyncRunRecorder | None"] = ContextVar("current_sync_run", default=None)
+
+
+class SyncRunRecorder:
+    def __init__(self, user_id: int, kind: SyncRunKindEnum, trigger: SyncRunTriggerEnum) -> None:
+        self.user_id = user_id
+        self.kind = kind
+        self.trigger = trigger
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self.step_durations_ms: dict[str, int] = {}
+        self.requests_by_endpoint: Counter[str] = Counter()
+        self.not_modified_responses = 0
+        self.bytes_received = 0
+        self.rows_written_by_table: Counter[str] = Counter()
+        self.rows_inserted = 0
+        self.rows_unchanged_by_table: Counter[str] = Counter()
+        self.rate_limited_responses = 0
+        self.min_rate_limit_remaining: int | None = None
+        self.llm_calls = 0
+        self.llm_tokens = 0
+
+    @contextmanager
+    def activate(self) -> Iterator["SyncRunRecorder"]:
+        """Make this the current run for the enclosed code, including tasks it spawns."""
+        token = _current_run.set(self)
+        try:
+            yield self
+        finally:
+            _current_run.reset(token)
+
+    def record_response(self, request: httpx.Request, response: httpx.Response) -> None:
+        self.requests_by_endpoint[endpoint_name(request)] += 1
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            self.not_modified_responses += 1
+
+        remaining = response.headers.get("x-ratelimit-remaining")
+        if remaining is not None and remaining.isdigit():
+            remaining_count = int(remaining)
+            if self.min_rate_limit_remaining is None or remaining_count < self.min_rate_limit_remaining:
+                self.min_rate_limit_remaining = remaining_count
+
+        if response.status_code in RATE_LIMIT_STATUSES and (remaining == "0" or "retry-after" in response.headers):
+            self.rate_limited_responses += 1
+
+    def to_model(self, error: BaseException | None = None) -> SyncRun:
+        """Freeze the counters into a `SyncRun` row."""
+        return SyncRun(
+            user_id=self.user_id,
+            kind=self.kind,
+            trigger=self.trigger,
+            status=SyncRunStatusEnum.FAILED if error else SyncRunStatusEnum.COMPLETED,
+            error=str(error) if error else None,
+            started_at=self.started_at,
+            finished_at=datetime.now(timezone.utc),
+            duration_ms=int((time.perf_counter() - self._started) * 1000),
+            step_durations_ms=self.step_durations_ms,
+            requests_total=sum(self.requests_by_endpoint.values()),
+            requests_by_endpoint=dict(self.requests_by_endpoint),
+            not_modified_responses=self.not_modified_responses,
+            bytes_received=self.bytes_received,
+            rows_written=sum(self.rows_written_by_table.values()),
+            rows_written_by_table=dict(self.rows_written_by_table),
+            rows_inserted=self.rows_inserted,
+            rows_unchanged=sum(self.rows_unchanged_by_table.values()),
+            rows_unchanged_by_table=dict(self.rows_unchanged_by_table),
+            rate_limited_responses=self.rate_limited_responses,
+            min_rate_limit_remaining=self.min_rate_limit_remaining,
+            llm_calls=self.llm_calls,
+            llm_tokens=self.llm_tokens,
+        )
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, recorder: SyncRunRecorder) -> None:
+        self.stream = stream
+        self.recorder = recorder
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self.recorder.bytes_received += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self.stream.aclose()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Counts requests per endpoint and bytes on the wire (before decompression) into a recorder."""
+
+    def __init__(self, recorder: SyncRunRecorder, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self.recorder = recorder
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        self.recorder.record_response(request=request, response=response)
+        response.stream = _CountingStream(stream=response.stream, recorder=self.recorder)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def current_run() -> SyncRunRecorder | None:
+    return _current_run.get()
+
+
+def recording_transport() -> httpx.AsyncBaseTransport | None:
+    """Transport for a new HTTP client: recording inside a run, httpx's default otherwise."""
+    recorder = current_run()
+    return RecordingTransport(recorder=recorder) if recorder else None
+
+
+@contextmanager
+def step(name: str) -> Iterator[None]:
+    """Time a named step of the current run."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder = current_run()
+        if recorder:
+            recorder.step_durations_ms[name] = int((time.perf_counter() - started) * 1000)
+
+
+def record_rows(table: str, count: int) -> None:
+    recorder = current_run()
+    if recorder:
+        recorder.rows_written_by_table[table] += count
+
+
+def record_upsert(table: str, result: UpsertResult) -> None:
+    """Count an upsert's inserted and updated rows as written, and the rows it left untouched."""
+    recorder = current_run()
+    if recorder:
+        recorder.rows_written_by_table[table] += result.inserted + result.updated
+        recorder.rows_inserted += result.inserted
+        recorder.rows_unchanged_by_table[table] += result.unchanged
+
+
+def record_llm_call(tokens: int | None) -> None:
+    recorder = current_run()
+    if recorder:
+        recorder.llm_calls += 1
+        recorder.llm_tokens += tokens or 0
+
+
+def endpoint_name(request: httpx.Request) -> str:
+    """Collapse a GitHub URL into its route template, e.g. `GET /repos/:owner/:repo/commits/:sha`."""
+    parts = request.url.path.strip("/").split("/")
+    if parts[0] == "repos" and len(parts) >= 3:
+        parts[1:3] = [":owner", ":repo"]
+        if len(parts) >= 5 and parts[3] == "commits":
+            parts[4] = ":sha"
+    elif parts[0] == "users" and len(parts) >= 2:
+        parts[1] = ":user"
+    elif parts[0] == "app" and len(parts) >= 3 and parts[1] == "installations":
+        parts[2] = ":installation_id"
+    return f"{request.method} /{'/'.join(parts)}"
@@ -0,0 +1,83 @@
+import json
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from operator import attrgetter
+
+from sqlalchemy import Row
+
+from src.schemas.timelines import NodeArtifactSchema, TimelineLayout, TimelineNodeWithChildren
+from src.schemas.timelines import Timeline as TimelineSchema
+from src.services.timeline_layout import NodeSpan, node_span
+
+# Field lists come from the response schemas, so the document keeps their shape and key order
+TIMELINE_FIELDS = tuple(name for name in TimelineSchema.model_fields if name not in ("nodes", "layout"))
+NODE_FIELDS = tuple(name for name in TimelineNodeWithChildren.model_fields if name not in ("media", "children"))
+ARTIFACT_FIELDS = tuple(NodeArtifactSchema.model_fields)
+
+_timeline_values = attrgetter(*TIMELINE_FIELDS)
+_node_values = attrgetter(*(f"node_{name}" for name in NODE_FIELDS))
+# An artifact's node_id is its node's id, which the rows label "node_id" as well
+_artifact_values = attrgetter(*(name if name == "node_id" else f"artifact_{name}" for name in ARTIFACT_FIELDS))
+
+
+def encode_timeline_tree(rows: Sequence[Row], layout: TimelineLayout | None = None) -> bytes:
+    """
+    Serialise the rows of `TimelineRepository.get_timeline_tree_rows` to the JSON of the `Timeline` schema.
+
+    Builds the same tree as `TimelineService.get_timeline_details`: top-level nodes in date order, each with
+    its direct children in date order. Deeper descendants, whose parent is itself a child, are left out.
+    """
+    document = dict(zip(TIMELINE_FIELDS, _timeline_values(rows[0]), strict=True))
+    document["nodes"] = _node_tree(rows)
+    document["layout"] = layout.model_dump() if layout else None
+    return _dumps(document)
+
+
+def top_level_spans(rows: Sequence[Row]) -> list[NodeSpan]:
+    """The spans of the top-level nodes in the same rows, once per node."""
+    spans = {
+        row.node_id: node_span(row.node_id, row.node_start_date, row.node_end_date, row.node_is_current)
+        for row in rows
+        if row.node_id is not None and row.node_parent_id is None
+    }
+    return list(spans.values())
+
+
+def encode_node_tree(rows: Sequence[Row]) -> bytes:
+    """The same rows serialised to just the list of top-level nodes, as `list[TimelineNodeWithChildren]`."""
+    return _dumps(_node_tree(rows))
+
+
+def _node_tree(rows: Sequence[Row]) -> list[dict]:
+    nodes: dict[int, dict] = {}
+    for row in rows:
+        if row.node_id is None:
+            continue
+        node = nodes.get(row.node_id)
+        if node is None:
+            node = dict(zip(NODE_FIELDS, _node_values(row), strict=True))
+            node["media"] = []
+            node["children"] = []
+            nodes[row.node_id] = node
+        if row.artifact_id is not None:
+            node["media"].append(dict(zip(ARTIFACT_FIELDS, _artifact_values(row), strict=True)))
+
+    top_level = [node for node in nodes.values() if node["parent_id"] is None]
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"]) if node["parent_id"] is not None else None
+        if parent is not None and parent["parent_id"] is None:
+            parent["children"].append(node)
+
+    return top_level
+
+
+def _dumps(document: object) -> bytes:
+    return json.dumps(document, default=_encode_value, separators=(",", ":")).encode()
+
+
+def _encode_value(value: object) -> object:
+    if isinstance(value, datetime):
+        # Same format as pydantic: ISO 8601, with UTC spelled "Z"
+        text = value.isoformat()
+        return text[:-6] + "Z" if value.utcoffset() == timedelta(0) else text
+    raise TypeError(type(value).__name__)
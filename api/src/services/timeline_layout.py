@@ -0,0 +1,50 @@
+import heapq
+from collections.abc import Iterable
+from datetime import datetime
+
+from src.schemas.timelines import NodePlacement, TimelineLayout
+
+# (node id, start date, end date or None while it runs on)
+NodeSpan = tuple[int, datetime, datetime | None]
+
+
+def node_span(node_id: int, start: datetime, end: datetime | None, is_current: bool | None) -> NodeSpan:
+    """A node without an end date runs on if it is current and is a single point in time otherwise."""
+    return node_id, start, end if end is not None or is_current else start
+
+
+def layout_lanes(spans: Iterable[NodeSpan], version: int) -> TimelineLayout:
+    """
+    Assign overlapping nodes to lanes and group the ones that overlap each other, in O(n log n).
+
+    Nodes are placed in date order, each into the lowest lane that is free by its start date, which is the
+    layout the editor draws: a lane frees once its last node has ended strictly before the next one starts.
+    Free lanes are kept in one heap and busy lanes in another, ordered by the end of their last node.
+    A node without an end date keeps its lane for good.
+
+    An overlap group is a run of nodes connected through overlaps; a new group starts at the first node
+    that starts after every earlier one has ended.
+    """
+    placements: list[NodePlacement] = []
+    busy: list[tuple[datetime, int]] = []
+    free: list[int] = []
+    lane_count = 0
+    group, group_end = -1, None
+
+    for node_id, start, end in sorted(spans, key=lambda span: (span[1], span[0])):
+        end = end if end is not None else datetime.max.replace(tzinfo=start.tzinfo)
+        while busy and busy[0][0] < start:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if free:
+            lane = heapq.heappop(free)
+        else:
+            lane, lane_count = lane_count, lane_count + 1
+        heapq.heappush(busy, (end, lane))
+
+        if group_end is None or start > group_end:
+            group, group_end = group + 1, end
+        else:
+            group_end = max(group_end, end)
+        placements.append(NodePlacement(node_id=node_id, lane=lane, group=group))
+
+    return TimelineLayout(version=version, lane_count=lane_count, placements=placements)
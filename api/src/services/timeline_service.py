@@ -1,20 +1,50 @@
-from fastapi import UploadFile
+from fastapi import Response, UploadFile
 from loguru import logger
+from pydantic import TypeAdapter
 
-from src.core.config import Errors
+from src.core.config import Errors, settings
+from src.core.lru_cache import LRUCache
+from src.core.response_cache import ResponseCache
+from src.db.unit_of_work import UnitOfWork
 from src.exceptions.ai import AIServiceError
-from src.exceptions.timeline import InvalidTimelineNodeError, TimelineNodeNotFoundError, TimelineNotFoundError
+from src.exceptions.timeline import (
+    InvalidTimelineNodeError,
+    InvalidTimelineWindowError,
+    NodeArtifactNotFoundError,
+    TimelineNodeNotFoundError,
+    TimelineNotFoundError,
+)
 from src.models.node_artifacts import NodeArtifact
+from src.models.timeline_changes import NodeChangeKind
 from src.models.timeline_nodes import TimelineNode
 from src.models.timelines import Timeline
 from src.repositories.timeline_repository import TimelineRepository
 from src.schemas.integrations.ai.timeline_analysis import AnalysisAction, AnalysisResult
-from src.schemas.integrations.github import Commit
+from src.schemas.integrations.github import CommitSummary
+from src.schemas.media import MediaVariant
+from src.schemas.timelines import (
+    NodeArtifactInfo,
+    TimelineChanges,
+    TimelineCreate,
+    TimelineLayout,
+    TimelineNodeBase,
+    TimelineNodeBatchItem,
+    TimelineNodeCreate,
+    TimelineNodeWithChildren,
+    TimelineSummary,
+    TimelineWindow,
+)
 from src.schemas.timelines import Timeline as TimelineSchema
-from src.schemas.timelines import TimelineCreate, TimelineNodeBase, TimelineNodeCreate, TimelineNodeWithChildren
+from src.schemas.timelines import TimelineNode as TimelineNodeSchema
+from src.services import sync_telemetry
 from src.services.auth_service import TokenData
 from src.services.integrations.ai.timeline_analysis_service import TimelineAnalysisService
 from src.services.integrations.analysis.activity_clustering_service import ActivityClusteringService
+from src.services.media.media_service import MediaService
+from src.services.timeline_json import encode_node_tree, encode_timeline_tree, top_level_spans
+from src.services.timeline_layout import NodeSpan, layout_lanes, node_span
+
+SUMMARIES = TypeAdapter(list[TimelineSummary])
 
 
 class TimelineService:
@@ -23,10 +53,18 @@ class TimelineService:
         timeline_repo: TimelineRepository,
         clustering_service: ActivityClusteringService,
         ai_service: TimelineAnalysisService,
+        media_service: MediaService,
+        layout_cache: LRUCache[TimelineLayout],
+        response_cache: ResponseCache,
+        uow: UnitOfWork,
     ) -> None:
         self.timeline_repo = timeline_repo
         self.clustering_service = clustering_service
         self.ai_service = ai_service
+        self.media_service = media_service
+        self.layout_cache = layout_cache
+        self.response_cache = response_cache
+        self.uow = uow
 
     # Timeline Methods
     async def get_user_timelines(self, user_id: int) -> list[Timeline]:
@@ -80,6 +118,132 @@ class TimelineService:
 
         return timeline
 
+    async def get_timeline_details_json(self, timeline_id: int, user_id: int) -> bytes:
+        """
+        Same document as `get_timeline_details`, serialised straight from one query's rows: no ORM objects,
+        no Python re-sort and no schema validation on the way out.
+        """
+        rows = await self.timeline_repo.get_timeline_tree_rows(timeline_id=timeline_id, user_id=user_id)
+        if not rows:
+            raise TimelineNotFoundError(Errors.TIMELINE_NOT_FOUND.value)
+        layout = self._cached_layout(timeline_id, rows[0].version) or self._store_layout(
+            timeline_id, rows[0].version, top_level_spans(rows)
+        )
+        return encode_timeline_tree(rows, layout=layout)
+
+    async def get_timeline_layout(self, timeline_id: int, user_id: int) -> TimelineLayout:
+        """
+        Lane layout of the timeline's top-level nodes, computed once per version of the timeline. A cached
+        layout costs one primary-key read of the version.
+        """
+        version = await self.timeline_repo.get_timeline_version(timeline_id=timeline_id, user_id=user_id)
+        if version is None:
+            raise TimelineNotFoundError(Errors.TIMELINE_NOT_FOUND.value, details={"timeline_id": timeline_id})
+        if layout := self._cached_layout(timeline_id, version):
+            return layout
+        spans = await self.timeline_repo.get_top_level_spans(timeline_id=timeline_id)
+        return self._store_layout(timeline_id, version, [node_span(*span) for span in spans])
+
+    def _cached_layout(self, timeline_id: int, version: int) -> TimelineLayout | None:
+        return self.layout_cache.get(f"{timeline_id}:{version}")
+
+    def _store_layout(self, timeline_id: int, version: int, spans: list[NodeSpan]) -> TimelineLayout:
+        # A new version gets a new key, so nothing is invalidated; superseded layouts age out of the LRU
+        layout = layout_lanes(spans, version=version)
+        self.layout_cache.put(f"{timeline_id}:{version}", layout)
+        return layout
+
+    async def get_timeline_window_json(self, timeline_id: int, user_id: int, window: TimelineWindow) -> bytes:
+        """
+        The node tree of `get_timeline_details_json`, cut down to the nodes overlapping a date window, so a
+        long timeline can be loaded piece by piece as the user pans (Editor View).
+        """
+        if window.end < window.start:
+            raise InvalidTimelineWindowError(
+                Errors.INVALID_TIMELINE_WINDOW.value,
+                details={"from": window.start.isoformat(), "to": window.end.isoformat()},
+            )
+        rows = await self.timeline_repo.get_timeline_tree_rows(timeline_id=timeline_id, user_id=user_id, window=window)
+        if not rows:
+            raise TimelineNotFoundError(Errors.TIMELINE_NOT_FOUND.value)
+        return encode_node_tree(rows)
+
+    async def get_timeline_changes(self, timeline_id: int, user_id: int, since: int) -> TimelineChanges:
+        """
+        Changes to the timeline's nodes after version `since`, for a client that holds that version to catch
+        up without reloading the tree. Several changes to one node collapse into its current state, or its
+        deletion. When the log no longer reaches back that far, the client is told to reload instead.
+        """
+        state = await self.timeline_repo.get_change_log_state(timeline_id=timeline_id, user_id=user_id)
+        if state is None:
+            raise TimelineNotFoundError(Errors.TIMELINE_NOT_FOUND.value, details={"timeline_id": timeline_id})
+        # A version ahead of the timeline's was never served from this database
+        if since < state.change_log_floor or since > state.version:
+            return TimelineChanges(version=state.version, reset=True)
+        if since == state.version:
+            return TimelineChanges(version=state.version)
+
+        latest: dict[int, NodeChangeKind] = {}
+        for change in await self.timeline_repo.get_node_changes(timeline_id, since=since, until=state.version):
+            latest[change.node_id] = change.kind
+        deleted = [node_id for node_id, kind in latest.items() if kind == NodeChangeKind.DELETED]
+        changed = [node_id for node_id, kind in latest.items() if kind != NodeChangeKind.DELETED]
+        nodes = await self.timeline_repo.get_timeline_nodes_by_ids(timeline_id, changed) if changed else []
+        return TimelineChanges(
+            version=state.version,
+            upserted=[TimelineNodeSchema.model_validate(node) for node in nodes],
+            deleted=deleted,
+        )
+
+    # Cached responses: each is tagged with the version of the data it is built from, which makes its ETag
+    async def get_timelines_tag(self, user_id: int) -> str:
+        """Tag of the user's list of timelines."""
+        version = await self.timeline_repo.get_timelines_version(user_id=user_id)
+        return f"timelines-{user_id}-v{version}"
+
+    async def get_user_timelines_cached(self, user_id: int, tag: str) -> bytes:
+        async def build() -> bytes:
+            timelines = await self.get_user_timelines(user_id=user_id)
+            return SUMMARIES.dump_json(SUMMARIES.validate_python(timelines, from_attributes=True))
+
+        return await self.response_cache.get_or_build(tag, build, lambda: self.get_timelines_tag(user_id=user_id))
+
+    async def get_timeline_tag(self, timeline_id: int, user_id: int) -> str:
+        """Tag of the timeline document. Also checks that the timeline belongs to the user."""
+        tag = await self._timeline_tag(timeline_id=timeline_id, user_id=user_id)
+        if tag is None:
+            raise TimelineNotFoundError(Errors.TIMELINE_NOT_FOUND.value, details={"timeline_id": timeline_id})
+        return tag
+
+    async def _timeline_tag(self, timeline_id: int, user_id: int) -> str | None:
+        version = await self.timeline_repo.get_timeline_version(timeline_id=timeline_id, user_id=user_id)
+        return None if version is None else f"timeline-{timeline_id}-v{version}"
+
+    async def get_timeline_details_cached(self, timeline_id: int, user_id: int, tag: str) -> bytes:
+        return await self.response_cache.get_or_build(
+            tag,
+            lambda: self.get_timeline_details_json(timeline_id=timeline_id, user_id=user_id),
+            lambda: self._timeline_tag(timeline_id=timeline_id, user_id=user_id),
+        )
+
+    async def get_timeline_node_tag(self, node_id: int) -> str:
+        """Tag of a node with its children, which changes with the version of their timeline."""
+        tag = await self._timeline_node_tag(node_id=node_id)
+        if tag is None:
+            raise TimelineNodeNotFoundError(Errors.TIMELINE_NODE_NOT_FOUND.value, details={"node_id": node_id})
+        return tag
+
+    async def _timeline_node_tag(self, node_id: int) -> str | None:
+        version = await self.timeline_repo.get_node_version(node_id=node_id)
+        return None if version is None else f"node-{node_id}-v{version}"
+
+    async def get_timeline_node_cached(self, node_id: int, tag: str) -> bytes:
+        async def build() -> bytes:
+            node = await self.get_timeline_node_by_id(node_id=node_id)
+            return TimelineNodeWithChildren.model_validate(node).model_dump_json().encode()
+
+        return await self.response_cache.get_or_build(tag, build, lambda: self._timeline_node_tag(node_id=node_id))
+
     async def create_timeline(self, timeline: TimelineCreate, token_data: TokenData) -> Timeline:
         """Create a new timeline."""
         timeline_db = Timeline(
@@ -90,7 +254,9 @@ class TimelineService:
             default_zoom_level=timeline.default_zoom_level,
             user_id=token_data.sub,
         )
-        return await self.timeline_repo.create_timeline(timeline=timeline_db)
+        async with self.uow:
+            await self.timeline_repo.bump_timelines_version(user_id=token_data.sub)
+            return await self.timeline_repo.create_timeline(timeline=timeline_db)
 
     async def delete_timeline(self, timeline_id: int, user_id: int) -> None:
         """Delete a timeline."""
@@ -98,7 +264,9 @@ class TimelineService:
         if not timeline:
             raise TimelineNotFoundError(Errors.TIMELINE_NOT_FOUND.value, details={"timeline_id": timeline_id})
 
-        await self.timeline_repo.delete_timeline(timeline_id=timeline_id)
+        async with self.uow:
+            await self.timeline_repo.bump_timelines_version(user_id=user_id)
+            await self.timeline_repo.delete_timeline(timeline_id=timeline_id)
 
     # Timeline Node Methods
     async def get_timeline_node_by_id(self, node_id: int) -> TimelineNodeWithChildren:
@@ -108,6 +276,23 @@ class TimelineService:
             raise TimelineNodeNotFoundError(Errors.TIMELINE_NODE_NOT_FOUND.value, details={"node_id": node_id})
         return node
 
+    async def get_node_artifact(self, node_id: int, artifact_id: int, user_id: int) -> NodeArtifactInfo:
+        """Get the metadata of an artifact on one of the user's nodes."""
+        artifact = await self.timeline_repo.get_node_artifact_info(
+            node_id=node_id, artifact_id=artifact_id, user_id=user_id
+        )
+        if not artifact:
+            raise NodeArtifactNotFoundError(
+                Errors.NODE_ARTIFACT_NOT_FOUND.value, details={"node_id": node_id, "artifact_id": artifact_id}
+            )
+        return artifact
+
+    async def serve_node_artifact(
+        self, artifact: NodeArtifactInfo, headers: dict[str, str], variant: MediaVariant | None = None
+    ) -> Response:
+        """Response streaming an artifact's bytes, or those of one of its variants, from the media store."""
+        return await self.media_service.serve(artifact.content_hash, artifact.media_type, headers, variant=variant)
+
     async def create_timeline_node(
         self, user_id: int, timeline_node: TimelineNodeCreate, media: UploadFile | None
     ) -> TimelineNode:
@@ -141,21 +326,76 @@ class TimelineService:
             parent_id=timeline_node.parent_id,
         )
 
-        media_bytes = None
-        media_type = None
-        media_filename = None
+        # Streamed into the store before the transaction opens, so no connection is held during the upload
+        stored = await self.media_service.ingest(media, max_bytes=settings.MEDIA_MAX_UPLOAD_BYTES) if media else None
 
-        if media:
-            media_bytes = await media.read()
-            media_type = media.content_type
-            media_filename = media.filename
-
-        return await self.timeline_repo.create_timeline_node(
-            timeline_node=timeline_node_db,
-            media_bytes=media_bytes,
-            media_type=media_type,
-            media_filename=media_filename,
-        )
+        async with self.uow:
+            version = await self.timeline_repo.bump_timeline_version(timeline_id=timeline_node.timeline_id)
+            created = await self.timeline_repo.create_timeline_node(timeline_node=timeline_node_db, media=stored)
+            await self.timeline_repo.record_node_changes(
+                timeline_id=created.timeline_id, version=version, node_ids=[created.id], kind=NodeChangeKind.CREATED
+            )
+            return created
+
+    async def create_timeline_nodes(
+        self, user_id: int, timeline_id: int, nodes: list[TimelineNodeBatchItem]
+    ) -> list[TimelineNode]:
+        """
+        Create a batch of nodes in one transaction. The whole batch is validated first, with one read of the
+        timeline and one of the existing parents it names; a child may instead point at a parent earlier in
+        the batch with `parent_index`. One version bump and one change-log write cover the batch.
+        """
+        timeline = await self.timeline_repo.get_timeline_by_id(timeline_id=timeline_id, user_id=user_id)
+        if not timeline:
+            raise TimelineNotFoundError(Errors.TIMELINE_NOT_FOUND.value, details={"timeline_id": timeline_id})
+
+        parent_ids = list({node.parent_id for node in nodes if node.parent_id is not None})
+        parents: dict[int, TimelineNode] = {}
+        if parent_ids:
+            parents = {node.id: node for node in await self.timeline_repo.get_timeline_nodes_lite(parent_ids)}
+        for i, node in enumerate(nodes):
+            self._validate_dates(node)
+            if node.parent_id is not None and node.parent_index is not None:
+                raise InvalidTimelineNodeError(
+                    Errors.INVALID_TIMELINE_NODE_HIERARCHY.value,
+                    details={"index": i, "reason": "Give either parent_id or parent_index, not both"},
+                )
+            if node.parent_id is not None:
+                parent = parents.get(node.parent_id)
+                if not parent:
+                    raise TimelineNodeNotFoundError(
+                        Errors.TIMELINE_NODE_NOT_FOUND.value, details={"index": i, "parent_id": node.parent_id}
+                    )
+                self._check_parent_hierarchy(
+                    parent, child_node=node, timeline_id=timeline_id, reference={"index": i, "parent_id": parent.id}
+                )
+            elif node.parent_index is not None:
+                reference = {"index": i, "parent_index": node.parent_index}
+                if node.parent_index >= i:
+                    raise InvalidTimelineNodeError(
+                        Errors.INVALID_TIMELINE_NODE_HIERARCHY.value,
+                        details={**reference, "reason": "parent_index must point at an earlier node of the batch"},
+                    )
+                batch_parent = nodes[node.parent_index]
+                if batch_parent.parent_index is not None:
+                    raise InvalidTimelineNodeError(
+                        Errors.INVALID_TIMELINE_NODE_HIERARCHY.value,
+                        details={**reference, "reason": "Selected parent is already a child node. Max depth is 2."},
+                    )
+                # Checked as the row it will become
+                parent = TimelineNode(timeline_id=timeline_id, **batch_parent.model_dump(exclude={"parent_index"}))
+                self._check_parent_hierarchy(parent, child_node=node, timeline_id=timeline_id, reference=reference)
+
+        async with self.uow:
+            version = await self.timeline_repo.bump_timeline_version(timeline_id=timeline_id)
+            created = await self.timeline_repo.create_timeline_nodes(timeline_id=timeline_id, nodes=nodes)
+            await self.timeline_repo.record_node_changes(
+                timeline_id=timeline_id,
+                version=version,
+                node_ids=[node.id for node in created],
+                kind=NodeChangeKind.CREATED,
+            )
+            return created
 
     async def update_timeline_node(
         self, user_id: int, node_id: int, timeline_node: TimelineNodeBase, media: UploadFile | None = None
@@ -198,13 +438,24 @@ class TimelineService:
         if media:
             existing_node.media.clear()
 
-            media_bytes = await media.read()
-            artifact = NodeArtifact(media_data=media_bytes, media_type=media.content_type, caption=media.filename)
+            stored = await self.media_service.ingest(media, max_bytes=settings.MEDIA_MAX_UPLOAD_BYTES)
+            artifact = NodeArtifact(
+                content_hash=stored.content_hash,
+                size_bytes=stored.size_bytes,
+                media_type=stored.media_type,
+                caption=stored.filename,
+            )
             existing_node.media.append(artifact)
         elif existing_node.media:
             existing_node.media.clear()
 
-        return await self.timeline_repo.update_timeline_node(node_id=node_id, timelineNode=existing_node)
+        # The media swap above and the column update commit together
+        async with self.uow:
+            version = await self.timeline_repo.bump_timeline_version(timeline_id=existing_node.timeline_id)
+            await self.timeline_repo.record_node_changes(
+                timeline_id=existing_node.timeline_id, version=version, node_ids=[node_id], kind=NodeChangeKind.UPDATED
+            )
+            return await self.timeline_repo.update_timeline_node(node_id=node_id, timelineNode=existing_node)
 
     async def delete_timeline_node(self, node_id: int, user_id: int) -> None:
         """Delete a timeline node"""
@@ -215,16 +466,37 @@ class TimelineService:
         if not timeline:
             raise TimelineNodeNotFoundError(Errors.TIMELINE_NODE_NOT_FOUND.value, details={"node_id": node_id})
 
-        await self.timeline_repo.delete_timeline_node(node_id=node_id)
+        async with self.uow:
+            version = await self.timeline_repo.bump_timeline_version(timeline_id=existing_node.timeline_id)
+            deleted = await self.timeline_repo.delete_timeline_node(node_id=node_id)
+            await self.timeline_repo.record_node_changes(
+                timeline_id=existing_node.timeline_id, version=version, node_ids=deleted, kind=NodeChangeKind.DELETED
+            )
+
+    async def unlink_github_profile(self, external_profile_id: int) -> None:
+        """
+        Detach the nodes linked to the profile's repositories before those are deleted, as a change to each
+        timeline involved, so its cached documents and delta-syncing clients see the links go.
+        """
+        async with self.uow:
+            unlinked = await self.timeline_repo.unlink_github_repositories(external_profile_id=external_profile_id)
+            for timeline_id, node_ids in unlinked.items():
+                version = await self.timeline_repo.bump_timeline_version(timeline_id=timeline_id)
+                await self.timeline_repo.record_node_changes(
+                    timeline_id=timeline_id, version=version, node_ids=node_ids, kind=NodeChangeKind.UPDATED
+                )
 
     async def generate_nodes_for_commits(
-        self, commits: list[Commit], timeline_id: int, repo_id: int, user_id: int
+        self, commits: list[CommitSummary], timeline_id: int, repo_id: int, user_id: int
     ) -> None:
         """
-        Processes clusters through AI and persists the results as nodes in a specific timeline.
+        Processes clusters through AI and persists the results as nodes in a specific timeline. The nodes are
+        collected in memory, merged children extending their parent there, and written as one batch.
         """
 
-        last_parent: TimelineNode | None = None
+        batch: list[TimelineNodeBatchItem] = []
+        # Position in the batch of the node that merged clusters attach to
+        last_parent: int | None = None
 
         clusters = self.clustering_service.cluster_commits(commits=commits)
         for cluster in clusters:
@@ -238,7 +510,7 @@ class TimelineService:
                     continue
 
                 if ai_result.node_content:
-                    node_data = TimelineNodeCreate(**ai_result.node_content.model_dump(), timeline_id=timeline_id)
+                    node_data = TimelineNodeBatchItem(**ai_result.node_content.model_dump())
                     node_data.start_date = node_data.start_date.replace(hour=0, minute=0, second=0, microsecond=0)
 
                     if node_data.end_date is not None:
@@ -251,28 +523,20 @@ class TimelineService:
                     if node_data.end_date is not None:
                         node_data.is_current = False
 
-                    if ai_result.action == AnalysisAction.MERGE_TO_PARENT and last_parent:
-                        node_data.parent_id = last_parent.id
-
-                        needs_update = False
-                        if node_data.start_date < last_parent.start_date:
-                            last_parent.start_date = node_data.start_date
-                            needs_update = True
-                        if node_data.end_date and (
-                            not last_parent.end_date or node_data.end_date > last_parent.end_date
-                        ):
-                            last_parent.end_date = node_data.end_date
-                            needs_update = True
+                    # The parent is extended in memory, before anything is written
+                    if ai_result.action == AnalysisAction.MERGE_TO_PARENT and last_parent is not None:
+                        parent = batch[last_parent]
+                        node_data.parent_id = None
+                        node_data.parent_index = last_parent
 
-                        if needs_update:
-                            await self.update_timeline_node(
-                                user_id=user_id, node_id=last_parent.id, timeline_node=last_parent
-                            )
-
-                    created_node = await self.create_timeline_node(user_id=user_id, timeline_node=node_data, media=None)
+                        if node_data.start_date < parent.start_date:
+                            parent.start_date = node_data.start_date
+                        if node_data.end_date and (not parent.end_date or node_data.end_date > parent.end_date):
+                            parent.end_date = node_data.end_date
 
+                    batch.append(node_data)
                     if last_parent is None or ai_result.action == AnalysisAction.CREATE_NODE:
-                        last_parent = created_node
+                        last_parent = len(batch) - 1
 
             except Exception as e:
                 logger.error(f"Failed to process cluster {cluster.id} for timeline {timeline_id}: {str(e)}")
@@ -285,6 +549,10 @@ class TimelineService:
                         "original_error": str(e),
                     },
                 ) from e
+
+        if batch:
+            await self.create_timeline_nodes(user_id=user_id, timeline_id=timeline_id, nodes=batch)
+            sync_telemetry.record_rows("timeline_nodes", len(batch))
         logger.success(f"Timeline generation complete for repository ID: {repo_id}")
 
     # Helper Validation Methods
@@ -321,11 +589,23 @@ class TimelineService:
         if not parent_node:
             raise TimelineNodeNotFoundError(Errors.TIMELINE_NODE_NOT_FOUND.value, details={"parent_id": parent_id})
 
+        self._check_parent_hierarchy(
+            parent_node, child_node=child_node, timeline_id=timeline_id, reference={"parent_id": parent_id}
+        )
+
+    def _check_parent_hierarchy(
+        self,
+        parent_node: TimelineNode,
+        child_node: TimelineNodeCreate | TimelineNodeBase,
+        timeline_id: int,
+        reference: dict[str, int],
+    ) -> None:
+        """The checks of `_validate_parent_hierarchy` on a parent already at hand; `reference` names it in errors."""
         if parent_node.timeline_id != timeline_id:
             raise InvalidTimelineNodeError(
                 Errors.INVALID_TIMELINE_NODE_HIERARCHY.value,
                 details={
-                    "parent_id": parent_id,
+                    **reference,
                     "timeline_id": timeline_id,
                     "reason": "Parent must belong to the same timeline",
                 },
@@ -334,7 +614,7 @@ class TimelineService:
         if parent_node.parent_id is not None:
             raise InvalidTimelineNodeError(
                 Errors.INVALID_TIMELINE_NODE_HIERARCHY.value,
-                details={"parent_id": parent_id, "reason": "Selected parent is already a child node. Max depth is 2."},
+                details={**reference, "reason": "Selected parent is already a child node. Max depth is 2."},
             )
 
         if not parent_node.start_date:
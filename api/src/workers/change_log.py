@@ -0,0 +1,41 @@
+"""
+Timeline change log compaction.
+
+Run it periodically (e.g. daily from cron):
+
+    python -m src.workers.change_log
+
+Drops node changes older than TIMELINE_CHANGE_LOG_RETENTION_DAYS. Clients that last synced before the
+remaining log are told to reload their timeline in full. Safe to rerun at any time.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.logging_config import setup_logging
+from src.db.database import WorkerSessionLocal
+from src.db.unit_of_work import UnitOfWork
+from src.repositories.timeline_repository import TimelineRepository
+
+
+async def compact_change_log(
+    retention: timedelta | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = WorkerSessionLocal,
+) -> int:
+    """Delete the changes logged before the retention window. Returns how many were deleted."""
+    retention = retention if retention is not None else timedelta(days=settings.TIMELINE_CHANGE_LOG_RETENTION_DAYS)
+    async with session_factory() as db, UnitOfWork(db):
+        deleted = await TimelineRepository(db).compact_change_log(before=datetime.now(timezone.utc) - retention)
+
+    if deleted:
+        logger.info("Change log: compacted {} node changes", deleted)
+    return deleted
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(compact_change_log())
@@ -1,16 +1,47 @@
+from datetime import timedelta
+
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.database import SessionLocal
+from src.core.config import settings
+from src.db.database import WorkerSessionLocal
+from src.models.integrations import SyncRunKindEnum, SyncRunTriggerEnum
+from src.repositories.integrations.external_profile_repository import ExternalProfileRepository
+from src.repositories.integrations.github_repository import GithubRepository
 from src.schemas.users import TokenData
 from src.services.factory import ServiceFactory
+from src.workers.lease import LeaseHeartbeat
+from src.workers.telemetry import recorded_run
+
+
+def sync_lease_heartbeat(profile_id: int, lease_token: int) -> LeaseHeartbeat:
+    """Heartbeat that keeps a profile's sync lease alive."""
+    ttl = timedelta(seconds=settings.SYNC_LEASE_TTL_SECONDS)
+
+    async def renew(db: AsyncSession) -> bool:
+        return await ExternalProfileRepository(db).renew_sync_lease(
+            profile_id=profile_id, lease_token=lease_token, ttl=ttl
+        )
+
+    return LeaseHeartbeat(renew=renew, interval=settings.SYNC_LEASE_HEARTBEAT_SECONDS)
+
 
+def generation_lease_heartbeat(leases: dict[int, int]) -> LeaseHeartbeat:
+    """Heartbeat that keeps a batch of timeline generation leases alive."""
+    ttl = timedelta(seconds=settings.SYNC_LEASE_TTL_SECONDS)
 
-async def github_full_sync_worker(user_id: int, access_token: str) -> None:
+    async def renew(db: AsyncSession) -> bool:
+        return await GithubRepository(db).renew_generation_leases(leases=leases, ttl=ttl)
+
+    return LeaseHeartbeat(renew=renew, interval=settings.SYNC_LEASE_HEARTBEAT_SECONDS)
+
+
+async def github_full_sync_worker(user_id: int, access_token: str, lease_token: int) -> None:
     """
     Handles the background sync process.
     Manages its own DB session to avoid GC errors.
     """
-    async with SessionLocal() as db:
+    async with WorkerSessionLocal() as db:
         try:
             service = ServiceFactory.create_github_service(db)
 
@@ -20,19 +51,55 @@ async def github_full_sync_worker(user_id: int, access_token: str) -> None:
                 logger.error(f"Sync failed: Profile not found for user {user_id}")
                 return
 
-            await service.run_full_sync(access_token=access_token, github_profile=profile)
+            async with recorded_run(user_id=user_id, kind=SyncRunKindEnum.SYNC, trigger=SyncRunTriggerEnum.MANUAL):
+                await sync_lease_heartbeat(profile_id=profile.id, lease_token=lease_token).run(
+                    service.run_full_sync(access_token=access_token, github_profile=profile, lease_token=lease_token)
+                )
 
         except Exception as e:
             logger.exception(f"Background Sync Worker failed for user {user_id}: {e}")
 
 
-async def github_timeline_worker(token_data: TokenData, repository_ids: list[int]) -> None:
+async def github_timeline_worker(token_data: TokenData, leases: dict[int, int]) -> None:
     """
     Handles background timeline generation.
     """
-    async with SessionLocal() as db:
+    async with WorkerSessionLocal() as db:
         try:
             service = ServiceFactory.create_github_service(db)
-            await service.generate_github_timelines(token_data=token_data, repository_ids=repository_ids)
+            async with recorded_run(
+                user_id=token_data.sub, kind=SyncRunKindEnum.TIMELINE_GENERATION, trigger=SyncRunTriggerEnum.MANUAL
+            ):
+                await generation_lease_heartbeat(leases=leases).run(
+                    service.generate_github_timelines(token_data=token_data, leases=leases)
+                )
         except Exception as e:
             logger.exception(f"Background Timeline Worker failed for user {token_data.sub}: {e}")
+
+
+async def github_scheduled_sync_worker(profile_id: int) -> None:
+    """
+    Runs one scheduler-initiated incremental sync.
+    Uses its own DB session so concurrent scheduled syncs never share one.
+    """
+    async with WorkerSessionLocal() as db:
+        try:
+            service = ServiceFactory.create_github_service(db)
+            profile = await service.external_profile_repo.get_external_profile_by_id(profile_id=profile_id)
+            if not profile:
+                logger.warning("Scheduled sync skipped: external profile {} no longer exists", profile_id)
+                return
+
+            lease_token = await service.acquire_sync_lease(profile_id=profile_id)
+            if lease_token is None:
+                logger.info("Scheduled sync skipped: profile {} is already syncing", profile_id)
+                return
+
+            async with recorded_run(
+                user_id=profile.user_id, kind=SyncRunKindEnum.SYNC, trigger=SyncRunTriggerEnum.SCHEDULED
+            ):
+                await sync_lease_heartbeat(profile_id=profile_id, lease_token=lease_token).run(
+                    service.run_scheduled_sync(profile_id=profile_id, lease_token=lease_token)
+                )
+        except Exception as e:
+            logger.exception(f"Scheduled Sync Worker failed for profile {profile_id}: {e}")
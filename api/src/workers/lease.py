@@ -0,0 +1,63 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import Errors
+from src.db.database import WorkerSessionLocal
+from src.db.unit_of_work import UnitOfWork
+from src.exceptions.lease import LeaseLostError
+
+T = TypeVar("T")
+
+
+class LeaseHeartbeat:
+    """
+    Keeps a DB lease alive while a piece of background work runs.
+
+    `renew` is called every `interval` seconds with a fresh session, since the worker's own session is
+    busy with the work itself. When a renewal reports the lease is gone (reaped or taken over), the work
+    is cancelled and LeaseLostError is raised, so a worker presumed dead never keeps writing.
+    """
+
+    def __init__(
+        self,
+        renew: Callable[[AsyncSession], Awaitable[bool]],
+        interval: float,
+        session_factory: async_sessionmaker[AsyncSession] = WorkerSessionLocal,
+    ) -> None:
+        self.renew = renew
+        self.interval = interval
+        self.session_factory = session_factory
+
+    async def run(self, work: Awaitable[T]) -> T:
+        """Await `work` while renewing the lease in the background."""
+        work_task = asyncio.ensure_future(work)
+        beat_task = asyncio.create_task(self._beat())
+        try:
+            await asyncio.wait({work_task, beat_task}, return_when=asyncio.FIRST_COMPLETED)
+            if work_task.done():
+                return work_task.result()
+
+            # The heartbeat only returns once the lease is gone; let the work unwind its own cleanup.
+            work_task.cancel()
+            await asyncio.gather(work_task, return_exceptions=True)
+            raise LeaseLostError(Errors.LEASE_LOST.value)
+        finally:
+            for task in (work_task, beat_task):
+                if not task.done():
+                    task.cancel()
+
+    async def _beat(self) -> None:
+        """Renew until a renewal fails. Transient errors are retried; the lease itself bounds how long."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with self.session_factory() as db, UnitOfWork(db):
+                    if not await self.renew(db):
+                        logger.warning("Lease lost; cancelling the work it guarded.")
+                        return
+            except Exception as e:
+                logger.warning(f"Lease heartbeat failed, retrying: {e}")
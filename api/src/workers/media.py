@@ -0,0 +1,11 @@
+from loguru import logger
+
+from src.services.factory import ServiceFactory
+
+
+async def media_variants_worker(content_hash: str, media_type: str) -> None:
+    """Renders the variants of a fresh upload after its response has been sent."""
+    try:
+        await ServiceFactory.create_media_service().generate_variants(content_hash, media_type)
+    except Exception as e:
+        logger.exception(f"Rendering media variants failed for {content_hash}: {e}")
@@ -0,0 +1,39 @@
+"""
+Commit partition maintenance.
+
+Run it once after deploying and then periodically (e.g. daily from cron):
+
+    python -m src.workers.partitions
+
+Keeps GITHUB_COMMIT_PARTITIONS_AHEAD empty `github_commits` partitions ahead of the newest external profile,
+so new users' commits land in their own partition instead of the default one. Safe to rerun at any time.
+"""
+
+import asyncio
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.config import settings
+from src.core.logging_config import setup_logging
+from src.db.database import worker_engine
+from src.db.partitions import ensure_commit_partitions
+
+
+async def maintain_commit_partitions(db_engine: AsyncEngine = worker_engine) -> list[str]:
+    """Create the missing commit partitions. Returns their names."""
+    async with db_engine.begin() as conn:
+        created = await ensure_commit_partitions(
+            conn,
+            size=settings.GITHUB_COMMIT_PARTITION_PROFILES,
+            ahead=settings.GITHUB_COMMIT_PARTITIONS_AHEAD,
+        )
+
+    if created:
+        logger.info("Partitions: created {}", created)
+    return created
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(maintain_commit_partitions())
@@ -0,0 +1,63 @@
+"""
+Lease reaper.
+
+Run it as its own process:
+
+    python -m src.workers.reaper
+
+Background syncs and timeline generations hold DB leases that their worker renews by heartbeat. When a
+worker crashes its lease simply stops being renewed; this loop marks that work as failed within one TTL
+plus one tick, so users can retry right away and status reads never have to repair state themselves.
+"""
+
+import asyncio
+from datetime import timedelta
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.logging_config import setup_logging
+from src.db.database import WorkerSessionLocal
+from src.db.unit_of_work import UnitOfWork
+from src.repositories.integrations.external_profile_repository import ExternalProfileRepository
+from src.repositories.integrations.github_repository import GithubRepository
+
+
+class LeaseReaper:
+    def __init__(
+        self,
+        interval: timedelta,
+        session_factory: async_sessionmaker[AsyncSession] = WorkerSessionLocal,
+    ) -> None:
+        self.interval = interval
+        self.session_factory = session_factory
+
+    @classmethod
+    def from_settings(cls) -> "LeaseReaper":
+        return cls(interval=timedelta(seconds=settings.SYNC_LEASE_REAPER_INTERVAL_SECONDS))
+
+    async def reap_once(self) -> int:
+        """Fail every sync and timeline generation whose lease has lapsed. Returns how many were reaped."""
+        async with self.session_factory() as db, UnitOfWork(db):
+            profile_ids = await ExternalProfileRepository(db).reap_expired_sync_leases()
+            repo_ids = await GithubRepository(db).reap_expired_generation_leases()
+
+        if profile_ids:
+            logger.warning("Reaper: failed syncs with expired leases for profiles {}", profile_ids)
+        if repo_ids:
+            logger.warning("Reaper: failed timeline generations with expired leases for repos {}", repo_ids)
+        return len(profile_ids) + len(repo_ids)
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.reap_once()
+            except Exception as e:
+                logger.exception(f"Lease reaper tick failed: {e}")
+            await asyncio.sleep(self.interval.total_seconds())
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(LeaseReaper.from_settings().run_forever())
@@ -0,0 +1,117 @@
+"""
+Periodic GitHub auto-sync scheduler.
+
+Run it as its own process:
+
+    python -m src.workers.scheduler
+
+Every window it picks the profiles whose `last_synced_at` is older than the configured interval and
+spreads their syncs evenly across the window (plus random jitter), so GitHub and the database see a
+steady trickle of incremental syncs instead of spikes.
+"""
+
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.logging_config import setup_logging
+from src.db.database import WorkerSessionLocal
+from src.models.integrations import PlatformEnum
+from src.repositories.integrations.external_profile_repository import ExternalProfileRepository
+from src.workers.github import github_scheduled_sync_worker
+
+
+class GithubSyncScheduler:
+    def __init__(
+        self,
+        interval: timedelta,
+        window: timedelta,
+        jitter_seconds: float,
+        batch_size: int,
+        concurrency: int,
+        session_factory: async_sessionmaker[AsyncSession] = WorkerSessionLocal,
+        sync_worker: Callable[[int], Awaitable[None]] = github_scheduled_sync_worker,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.interval = interval
+        self.window = window
+        self.jitter_seconds = jitter_seconds
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.sync_worker = sync_worker
+        self.rng = rng or random.Random()  # noqa: S311
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    @classmethod
+    def from_settings(cls) -> "GithubSyncScheduler":
+        return cls(
+            interval=timedelta(minutes=settings.GITHUB_AUTO_SYNC_INTERVAL_MINUTES),
+            window=timedelta(minutes=settings.GITHUB_AUTO_SYNC_WINDOW_MINUTES),
+            jitter_seconds=settings.GITHUB_AUTO_SYNC_JITTER_SECONDS,
+            batch_size=settings.GITHUB_AUTO_SYNC_BATCH_SIZE,
+            concurrency=settings.GITHUB_AUTO_SYNC_CONCURRENCY,
+        )
+
+    def plan(self, profile_ids: list[int]) -> list[tuple[float, int]]:
+        """
+        Assign each profile a start offset (seconds) inside the window.
+        Profiles get evenly sized slots; jitter moves each start within its own slot so
+        neighbouring syncs never collapse onto the same instant.
+        """
+        if not profile_ids:
+            return []
+
+        slot = self.window.total_seconds() / len(profile_ids)
+        max_jitter = min(self.jitter_seconds, slot)
+
+        return [
+            (index * slot + self.rng.uniform(0, max_jitter), profile_id) for index, profile_id in enumerate(profile_ids)
+        ]
+
+    async def select_due_profiles(self) -> list[int]:
+        """Fetch the IDs of GitHub profiles whose last sync is older than the interval."""
+        synced_before = datetime.now(timezone.utc).replace(tzinfo=None) - self.interval
+        async with self.session_factory() as db:
+            repo = ExternalProfileRepository(db)
+            return await repo.get_profiles_due_for_sync(
+                platform=PlatformEnum.GITHUB, synced_before=synced_before, limit=self.batch_size
+            )
+
+    async def run_once(self) -> int:
+        """Schedule one window worth of syncs and wait for them to finish. Returns the number scheduled."""
+        profile_ids = await self.select_due_profiles()
+        if not profile_ids:
+            logger.info("Auto-sync: no GitHub profiles are due.")
+            return 0
+
+        logger.info("Auto-sync: staggering {} profiles across {}", len(profile_ids), self.window)
+        await asyncio.gather(*(self._run_at(offset, profile_id) for offset, profile_id in self.plan(profile_ids)))
+        return len(profile_ids)
+
+    async def run_forever(self) -> None:
+        """Tick once per window; a tick that overruns simply starts the next one immediately."""
+        while True:
+            started = asyncio.get_running_loop().time()
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.exception(f"Auto-sync tick failed: {e}")
+
+            elapsed = asyncio.get_running_loop().time() - started
+            await asyncio.sleep(max(self.window.total_seconds() - elapsed, 0))
+
+    async def _run_at(self, offset: float, profile_id: int) -> None:
+        await asyncio.sleep(offset)
+        async with self.semaphore:
+            # The worker takes the sync lease itself, so a sync already in flight is never doubled up.
+            await self.sync_worker(profile_id)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    asyncio.run(GithubSyncScheduler.from_settings().run_forever())
@@ -0,0 +1,38 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.db.database import WorkerSessionLocal
+from src.db.unit_of_work import UnitOfWork
+from src.models.integrations import SyncRunKindEnum, SyncRunTriggerEnum
+from src.repositories.integrations.sync_run_repository import SyncRunRepository
+from src.services.sync_telemetry import SyncRunRecorder
+
+
+@asynccontextmanager
+async def recorded_run(
+    user_id: int,
+    kind: SyncRunKindEnum,
+    trigger: SyncRunTriggerEnum,
+    session_factory: async_sessionmaker[AsyncSession] = WorkerSessionLocal,
+) -> AsyncIterator[SyncRunRecorder]:
+    """
+    Record the enclosed work as one `sync_runs` row, whether it succeeds or fails.
+    The row is written from its own session, since the worker's session may be unusable after a failure.
+    """
+    recorder = SyncRunRecorder(user_id=user_id, kind=kind, trigger=trigger)
+    error: BaseException | None = None
+    with recorder.activate():
+        try:
+            yield recorder
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            try:
+                async with session_factory() as db, UnitOfWork(db):
+                    await SyncRunRepository(db).create_sync_run(recorder.to_model(error=error))
+            except Exception as e:
+                logger.warning(f"Could not record sync run for user {user_id}: {e}")
@@ -1,13 +1,18 @@
 import os
+import shutil
+import tempfile
 from collections.abc import AsyncGenerator, Generator
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from alembic import command
 from alembic.config import Config
+from src.core.config import settings
 from src.db.database import get_db
 from src.main import app
 from tests.test_helpers import AuthHelper
@@ -16,7 +21,9 @@ from tests.test_helpers import AuthHelper
 # across connections within the same test session.
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
-engine = create_async_engine(TEST_DATABASE_URL)
+# Every test runs in its own event loop: a pooled aiosqlite connection would outlive the loop it was opened
+# in, and its worker thread would keep the process from exiting. Without a pool each session closes its own.
+engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
 TestingSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -33,6 +40,9 @@ async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
 
 app.dependency_overrides[get_db] = override_get_db
 
+# Uploaded media goes to a throwaway directory instead of ./media
+settings.MEDIA_ROOT = tempfile.mkdtemp(prefix="test-media-")
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database() -> Generator[None, None, None]:
@@ -73,6 +83,37 @@ def setup_test_database() -> Generator[None, None, None]:
     del os.environ["TESTING"]
     if os.path.exists("./test.db"):
         os.remove("./test.db")
+    shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+
+@pytest.fixture
+def db_engine() -> AsyncEngine:
+    """The engine behind the test database, which the app's sessions use as well."""
+    return engine
+
+
+@pytest.fixture
+def session_factory() -> sessionmaker:
+    """Opens sessions on the test database, for tests that need a fresh one."""
+    return TestingSessionLocal
+
+
+@pytest_asyncio.fixture
+async def db() -> AsyncGenerator[AsyncSession, None]:
+    """A session on the test database for one test."""
+    async with TestingSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def cached_responses(monkeypatch: pytest.MonkeyPatch) -> dict[str, str]:
+    """In-memory stand-in for the Redis helpers serialised responses are cached with, one per test."""
+    responses: dict[str, str] = {}
+    monkeypatch.setattr("src.core.response_cache.redis_get", lambda key, model=None: responses.get(key))
+    monkeypatch.setattr(
+        "src.core.response_cache.redis_set", lambda key, value, ex=None: responses.__setitem__(key, value)
+    )
+    return responses
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.integrations import SyncRun, SyncRunKindEnum, SyncRunStatusEnum, SyncRunTriggerEnum
+from src.models.users import User
+from src.repositories.integrations.sync_run_repository import SyncRunRepository
+from tests.test_helpers import AuthHelper
+
+
+def make_run(user_id: int, status: SyncRunStatusEnum, requests: dict[str, int], started_at: datetime) -> SyncRun:
+    return SyncRun(
+        user_id=user_id,
+        kind=SyncRunKindEnum.SYNC,
+        trigger=SyncRunTriggerEnum.SCHEDULED,
+        status=status,
+        started_at=started_at,
+        finished_at=started_at + timedelta(seconds=30),
+        duration_ms=30_000,
+        step_durations_ms={"repos": 1000, "issues": 2000, "commits": 27_000},
+        requests_total=sum(requests.values()),
+        requests_by_endpoint=requests,
+        not_modified_responses=0,
+        bytes_received=250_000,
+        rows_written=120,
+        rows_written_by_table={"github_commits": 120},
+        rate_limited_responses=0,
+        llm_calls=0,
+        llm_tokens=0,
+    )
+
+
+@patch("src.services.auth_service.redis_client")
+def test_sync_run_summary_requires_admin(mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper) -> None:
+    mock_redis.exists.return_value = 0
+
+    response = client.get("/admin/sync-runs/summary", headers=auth_helper.get_auth_headers("momo"))
+
+    assert response.status_code == 403
+
+
+@patch("src.services.auth_service.redis_client")
+def test_sync_run_summary_for_admin(
+    mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper, monkeypatch: MonkeyPatch
+) -> None:
+    mock_redis.exists.return_value = 0
+    monkeypatch.setattr("src.services.auth_service.settings.ADMIN_EMAILS", "ops@example.com, Appa@example.com")
+
+    response = client.get("/admin/sync-runs/summary?hours=6", headers=auth_helper.get_auth_headers("appa"))
+    data = response.json()
+
+    assert response.status_code == 200
+    assert {"runs", "requests_total", "not_modified_ratio", "requests_by_endpoint", "users"} <= data.keys()
+
+
+@patch("src.services.auth_service.redis_client")
+def test_db_pools_for_admin(
+    mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper, monkeypatch: MonkeyPatch
+) -> None:
+    mock_redis.exists.return_value = 0
+    monkeypatch.setattr("src.services.auth_service.settings.ADMIN_EMAILS", "appa@example.com")
+
+    forbidden = client.get("/admin/db-pools", headers=auth_helper.get_auth_headers("momo"))
+    response = client.get("/admin/db-pools", headers=auth_helper.get_auth_headers("appa"))
+
+    assert forbidden.status_code == 403
+    assert response.status_code == 200
+    assert [pool["name"] for pool in response.json()] == ["api", "worker"]
+    assert {"checked_out", "overflow", "wait_seconds_total", "timeouts"} <= response.json()[0].keys()
+
+
+@pytest.mark.asyncio
+async def test_sync_run_repository_aggregates_window(db: AsyncSession) -> None:
+    """Runs inside the window are summed per user; older runs are left out."""
+    now = datetime.now(timezone.utc)
+    user = User(email=f"telemetry-{now.timestamp()}@example.com", name="Telemetry", hashed_password="x")
+    db.add(user)
+    await db.commit()
+
+    repo = SyncRunRepository(db)
+    commits_endpoint = "GET /repos/:owner/:repo/commits/:sha"
+    await repo.create_sync_run(make_run(user.id, SyncRunStatusEnum.COMPLETED, {commits_endpoint: 40}, now))
+    await repo.create_sync_run(
+        make_run(user.id, SyncRunStatusEnum.FAILED, {commits_endpoint: 10, "GET /issues": 2}, now)
+    )
+    await repo.create_sync_run(
+        make_run(user.id, SyncRunStatusEnum.COMPLETED, {commits_endpoint: 999}, now - timedelta(days=3))
+    )
+
+    since = now - timedelta(hours=1)
+    usage = [row for row in await repo.get_usage_by_user(since=since) if row.user_id == user.id]
+    endpoints = await repo.get_requests_by_endpoint(since=since)
+
+    assert len(usage) == 1
+    assert usage[0].runs == 2
+    assert usage[0].failed_runs == 1
+    assert usage[0].requests_total == 52
+    assert usage[0].bytes_received == 500_000
+    assert endpoints[commits_endpoint] >= 50
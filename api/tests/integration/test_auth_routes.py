@@ -1,7 +1,21 @@
+import hashlib
 import io
 from unittest.mock import MagicMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@pytest.fixture
+def avatar_refs(monkeypatch: pytest.MonkeyPatch) -> dict[str, object]:
+    """In-memory stand-in for the Redis helpers avatar refs are cached with."""
+    refs: dict[str, object] = {}
+    monkeypatch.setattr("src.services.auth_service.redis_get", lambda key, model=None: refs.get(key))
+    monkeypatch.setattr("src.services.auth_service.redis_set", lambda key, value, ex=None: refs.__setitem__(key, value))
+    monkeypatch.setattr("src.services.auth_service.redis_delete", lambda key: refs.pop(key, None))
+    return refs
 
 
 def test_signup_success(client: TestClient) -> None:
@@ -188,7 +202,9 @@ def test_update_user_profile_success(mock_redis: MagicMock, client: TestClient)
 
 
 @patch("src.services.auth_service.redis_client")
-def test_avatar_lifecycle(mock_redis: MagicMock, client: TestClient) -> None:
+def test_avatar_lifecycle(
+    mock_redis: MagicMock, client: TestClient, avatar_refs: dict[str, object], db_engine: AsyncEngine
+) -> None:
     """Test full lifecycle: upload, fetch (with ETag), and remove avatar."""
     # --- Setup ---
     signup_payload = {"email": "avatar@example.com", "password": "Password@123", "name": "Avatar User"}
@@ -218,16 +234,28 @@ def test_avatar_lifecycle(mock_redis: MagicMock, client: TestClient) -> None:
     assert get_response.status_code == 200
     assert get_response.content == avatar_content
     assert get_response.headers["Content-Type"] == "image/jpeg"
-    assert etag is not None
+    assert etag == f'"{hashlib.sha256(avatar_content).hexdigest()}"'
 
     # 3. Get Avatar (Cache Hit / ETag Validation)
     # --- Execute ---
+    client.patch("/auth/me", json={"headline": "Edited"}, headers=headers)
     cache_headers = {**headers, "If-None-Match": etag}
-    cached_response = client.get("/auth/me/avatar", headers=cache_headers)
+    statements: list[str] = []
+
+    def record(conn: object, cursor: object, statement: str, *args: object) -> None:
+        statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        cached_response = client.get("/auth/me/avatar", headers=cache_headers)
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", record)
 
     # --- Assert ---
+    # A profile edit does not change the ETag, and validating it needs no database query
     assert cached_response.status_code == 304
     assert cached_response.content == b""  # Body must be empty for 304
+    assert statements == []
 
     # 4. Remove Avatar
     # --- Execute ---
@@ -242,7 +270,7 @@ def test_avatar_lifecycle(mock_redis: MagicMock, client: TestClient) -> None:
 
 
 @patch("src.services.auth_service.redis_client")
-def test_get_avatar_not_found(mock_redis: MagicMock, client: TestClient) -> None:
+def test_get_avatar_not_found(mock_redis: MagicMock, client: TestClient, avatar_refs: dict[str, object]) -> None:
     """Test fetching avatar for a user that hasn't uploaded one."""
     # --- Setup ---
     signup_payload = {"email": "noavatar@example.com", "password": "Password@123", "name": "No Avatar"}
@@ -0,0 +1,239 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.integrations import ExternalProfile, PlatformEnum
+from src.models.integrations.github import GithubCommit
+from src.models.integrations.github.github_repositories import GenerationStatusEnum
+from src.models.timeline_nodes import NodeType, TimelineNode
+from src.models.timelines import Timeline
+from src.models.users import User
+from src.repositories.integrations.github_repository import GithubRepository
+from src.schemas.integrations.github import Commit, Repository
+from src.services.factory import ServiceFactory
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+async def create_profile(db: AsyncSession) -> int:
+    user = User(email=f"bulk-{datetime.now().timestamp()}@example.com", name="Bulk Tester", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    profile = ExternalProfile(external_id=user.id, user_id=user.id, platform=PlatformEnum.GITHUB)
+    db.add(profile)
+    await db.commit()
+    return profile.id
+
+
+@pytest_asyncio.fixture
+async def profile_id(db: AsyncSession) -> int:
+    return await create_profile(db)
+
+
+def make_repository(github_repo_id: int, stars: int = 0) -> Repository:
+    return Repository(
+        id=github_repo_id,
+        name=f"repo-{github_repo_id}",
+        full_name=f"octocat/repo-{github_repo_id}",
+        description=None,
+        html_url=f"https://github.com/octocat/repo-{github_repo_id}",
+        language="Python",
+        stargazers_count=stars,
+        forks_count=0,
+        fork=False,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def make_commit(sha: str, message: str = "Initial commit") -> Commit:
+    return Commit.model_validate(
+        {
+            "sha": sha,
+            "url": f"https://api.github.com/repos/octocat/repo/commits/{sha}",
+            "html_url": f"https://github.com/octocat/repo/commit/{sha}",
+            "commit": {"message": message, "author": {"name": "Octocat", "email": "o@example.com", "date": NOW}},
+            "stats": {"additions": 1, "deletions": 0, "total": 1},
+            "files": [{"filename": "README.md", "status": "added", "additions": 1, "deletions": 0}],
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_repositories_only_writes_changed_rows(db: AsyncSession, profile_id: int) -> None:
+    repo = GithubRepository(db)
+    base_id = profile_id * 1000
+
+    inserted = await repo.bulk_upsert_repositories(
+        repos_data=[make_repository(base_id + 1), make_repository(base_id + 2)], external_profile_id=profile_id
+    )
+    updated = await repo.bulk_upsert_repositories(
+        repos_data=[make_repository(base_id + 1, stars=42), make_repository(base_id + 2)],
+        external_profile_id=profile_id,
+    )
+
+    assert (inserted.inserted, inserted.updated, inserted.unchanged) == (2, 0, 0)
+    assert sorted(r.github_repo_id for r in inserted.rows) == [base_id + 1, base_id + 2]
+    assert (updated.inserted, updated.updated, updated.unchanged) == (0, 1, 1)
+    assert [(r.github_repo_id, r.stargazers_count) for r in updated.rows] == [(base_id + 1, 42)]
+    assert updated.rows[0].id == next(r.id for r in inserted.rows if r.github_repo_id == base_id + 1)
+
+
+@pytest.mark.asyncio
+async def test_repository_writes_bump_the_profile_version(db: AsyncSession, profile_id: int) -> None:
+    repo = GithubRepository(db)
+
+    async def version() -> int:
+        return await db.scalar(select(ExternalProfile.repositories_version).where(ExternalProfile.id == profile_id))
+
+    [created] = (await repo.bulk_upsert_repositories([make_repository(profile_id * 1000)], profile_id)).rows
+    after_insert = await version()
+    await repo.bulk_upsert_repositories([make_repository(profile_id * 1000)], profile_id)
+    after_unchanged_upsert = await version()
+    leases = await repo.acquire_generation_leases(repo_ids=[created.id], ttl=timedelta(minutes=1))
+    await repo.release_generation_leases(leases=leases, status=GenerationStatusEnum.COMPLETED)
+    await repo.update_repo_sync_time(repo_db_id=created.id)
+
+    assert (after_insert, after_unchanged_upsert, await version()) == (2, 2, 5)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_commit_details_merges_in_chunks(
+    db: AsyncSession, profile_id: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("src.db.bulk.settings.INGEST_MERGE_CHUNK_SIZE", 7)
+    repo = GithubRepository(db)
+    upserted_repos = await repo.bulk_upsert_repositories(
+        repos_data=[make_repository(profile_id * 1000 + 500)], external_profile_id=profile_id
+    )
+    [db_repo] = upserted_repos.rows
+    commits = [make_commit(sha=f"{profile_id:08d}{i:032d}") for i in range(50)]
+
+    first = await repo.bulk_upsert_commit_details(
+        commit_data_list=commits, external_profile_id=profile_id, repo_db_id=db_repo.id
+    )
+    # A re-sync can list the same commit twice in one batch; the last copy wins.
+    resync = [*commits[:3], make_commit(sha=commits[0].sha, message="Amended")]
+    second = await repo.bulk_upsert_commit_details(
+        commit_data_list=resync, external_profile_id=profile_id, repo_db_id=db_repo.id
+    )
+    amended = [(c.sha, c.message) for c in second.rows]
+    quiet = await repo.bulk_upsert_commit_details(
+        commit_data_list=commits, external_profile_id=profile_id, repo_db_id=db_repo.id
+    )
+
+    stored = await db.scalar(
+        select(func.count()).select_from(GithubCommit).where(GithubCommit.repository_id == db_repo.id)
+    )
+    assert stored == 50
+    assert (len(first.rows), first.inserted) == (50, 50)
+    assert first.rows[0].files[0]["filename"] == "README.md"
+    assert amended == [(commits[0].sha, "Amended")]
+    assert (second.inserted, second.updated, second.unchanged) == (0, 1, 2)
+    # Only the amended commit differs from the original copy; everything else is skipped.
+    assert (quiet.inserted, quiet.updated, quiet.unchanged) == (0, 1, 49)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_commit_details_keeps_patches_out_of_commit_rows(
+    db: AsyncSession, profile_id: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("src.repositories.integrations.github_repository.settings.GITHUB_STORE_COMMIT_PATCHES", True)
+    repo = GithubRepository(db)
+    upserted_repos = await repo.bulk_upsert_repositories(
+        repos_data=[make_repository(profile_id * 1000 + 900)], external_profile_id=profile_id
+    )
+    [db_repo] = upserted_repos.rows
+    commit = make_commit(sha=f"{profile_id:08d}{'f' * 32}")
+    commit.files[0].patch = "@@ -0,0 +1 @@\n+# Hello"
+    commit.files[0].blob_url = "https://github.com/octocat/repo/blob/main/README.md"
+
+    result = await repo.bulk_upsert_commit_details(
+        commit_data_list=[commit], external_profile_id=profile_id, repo_db_id=db_repo.id
+    )
+
+    assert result.rows[0].files == [{"filename": "README.md", "status": "added", "additions": 1, "deletions": 0}]
+    assert await repo.get_commit_patches(external_profile_id=profile_id, sha=commit.sha) == {
+        "README.md": "@@ -0,0 +1 @@\n+# Hello"
+    }
+    assert await repo.get_commit_patches(external_profile_id=profile_id, sha="missing") == {}
+    assert await repo.get_commit_patches(external_profile_id=profile_id + 1, sha=commit.sha) == {}
+
+
+@pytest.mark.asyncio
+async def test_commits_are_keyed_by_profile_and_deleted_per_profile(db: AsyncSession, profile_id: int) -> None:
+    """Two users syncing the same repository each keep their own copy of a commit."""
+    other_profile_id = await create_profile(db)
+    repo = GithubRepository(db)
+    sha = f"{profile_id:08d}{'c' * 32}"
+    for owner_id in (profile_id, other_profile_id):
+        upserted_repos = await repo.bulk_upsert_repositories(
+            repos_data=[make_repository(owner_id * 1000 + 800)], external_profile_id=owner_id
+        )
+        await repo.bulk_upsert_commit_details(
+            commit_data_list=[make_commit(sha=sha)], external_profile_id=owner_id, repo_db_id=upserted_repos.rows[0].id
+        )
+
+    deleted = await repo.delete_commits_by_profile_id(external_profile_id=profile_id)
+
+    owners = await db.scalars(select(GithubCommit.external_profile_id).where(GithubCommit.sha == sha))
+    assert deleted == 1
+    assert list(owners) == [other_profile_id]
+
+
+@pytest.mark.asyncio
+async def test_get_commit_summaries_by_repo_id_projects_filenames_in_date_order(
+    db: AsyncSession, profile_id: int
+) -> None:
+    repo = GithubRepository(db)
+    upserted_repos = await repo.bulk_upsert_repositories(
+        repos_data=[make_repository(profile_id * 1000 + 700)], external_profile_id=profile_id
+    )
+    [db_repo] = upserted_repos.rows
+    newer = make_commit(sha=f"{profile_id:08d}{'b' * 32}", message="Newer")
+    newer.commit.author.date = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    older = make_commit(sha=f"{profile_id:08d}{'a' * 32}", message="Older")
+    older.files.append(older.files[0].model_copy(update={"filename": "src/app.py"}))
+    await repo.bulk_upsert_commit_details(
+        commit_data_list=[newer, older], external_profile_id=profile_id, repo_db_id=db_repo.id
+    )
+
+    summaries = await repo.get_commit_summaries_by_repo_id(repo_id=db_repo.id, external_profile_id=profile_id)
+
+    assert [(s.message, s.filenames) for s in summaries] == [
+        ("Older", ["README.md", "src/app.py"]),
+        ("Newer", ["README.md"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_disconnecting_unlinks_timeline_nodes_as_a_timeline_change(db: AsyncSession, profile_id: int) -> None:
+    inserted = await GithubRepository(db).bulk_upsert_repositories(
+        repos_data=[make_repository(profile_id * 1000 + 9)], external_profile_id=profile_id
+    )
+    profile = await db.get(ExternalProfile, profile_id)
+    timeline = Timeline(user_id=profile.user_id, title="Linked")
+    db.add(timeline)
+    await db.flush()
+    node = TimelineNode(
+        timeline_id=timeline.id,
+        title="Repo",
+        type=NodeType.PROJECT,
+        start_date=NOW,
+        is_current=True,
+        github_repo_id=inserted.rows[0].id,
+    )
+    db.add(node)
+    await db.commit()
+
+    await ServiceFactory.create_github_service(db).disconnect_github(user_id=profile.user_id)
+
+    # The new timeline version invalidates its cached documents, and the change log carries the unlinked node
+    changes = await ServiceFactory.create_timeline_service(db).get_timeline_changes(
+        timeline_id=timeline.id, user_id=profile.user_id, since=1
+    )
+    assert changes.version == 2
+    assert [(changed.id, changed.github_repo_id) for changed in changes.upserted] == [(node.id, None)]
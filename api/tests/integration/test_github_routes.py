@@ -148,6 +148,7 @@ def test_start_github_sync_success(
     mock_worker.assert_called_once()
     _, kwargs = mock_worker.call_args
     assert kwargs["access_token"] == "gho_12345_test_token"
+    assert isinstance(kwargs["lease_token"], int)
 
 
 def test_start_github_sync_failure(
@@ -360,12 +361,12 @@ def test_generate_github_timelines_success(
             new_callable=AsyncMock,
         ) as mock_generate,
         patch(
-            "src.repositories.integrations.github_repository.GithubRepository.lock_repos_for_timeline_generation",
+            "src.repositories.integrations.github_repository.GithubRepository.acquire_generation_leases",
             new_callable=AsyncMock,
         ) as mock_lock,
     ):
-        # Lock returns repo ids (means available for processing)
-        mock_lock.return_value = [1, 2, 3]
+        # Leases were granted for every repo (means available for processing)
+        mock_lock.return_value = {1: 1, 2: 1, 3: 1}
 
         response = client.post(
             "/integrations/github/timelines",
@@ -379,7 +380,7 @@ def test_generate_github_timelines_success(
         assert data["status"] == "accepted"
         assert "started" in data["message"]
 
-        mock_lock.assert_awaited_once_with(repo_ids=[1, 2, 3])
+        mock_lock.assert_awaited_once_with(repo_ids=[1, 2, 3], ttl=ANY)
         mock_generate.assert_called_once()
 
 
@@ -392,11 +393,11 @@ def test_generate_github_timelines_all_locked(
     appa_headers = auth_helper.get_auth_headers("appa")
 
     with patch(
-        "src.repositories.integrations.github_repository.GithubRepository.lock_repos_for_timeline_generation",
+        "src.repositories.integrations.github_repository.GithubRepository.acquire_generation_leases",
         new_callable=AsyncMock,
     ) as mock_lock:
         # Nothing available for processing
-        mock_lock.return_value = []
+        mock_lock.return_value = {}
 
         response = client.post(
             "/integrations/github/timelines",
@@ -410,7 +411,7 @@ def test_generate_github_timelines_all_locked(
         assert data["status"] == "queued"
         assert "currently being processed" in data["message"]
 
-        mock_lock.assert_awaited_once_with(repo_ids=[1, 2])
+        mock_lock.assert_awaited_once_with(repo_ids=[1, 2], ttl=ANY)
 
 
 def test_generate_github_timelines_unauthorized(
@@ -0,0 +1,120 @@
+"""Read-replica routing, with two copies of the SQLite test database standing in for primary and replica."""
+
+import shutil
+from collections.abc import AsyncGenerator, Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.db.database import routing_sessionmaker
+from src.db.routing import bind_user, sticky_key
+from src.db.unit_of_work import UnitOfWork
+from src.models.integrations import ExternalProfile, PlatformEnum
+from src.models.timelines import Timeline
+from src.models.users import User
+from src.repositories.integrations.external_profile_repository import ExternalProfileRepository
+from src.repositories.timeline_repository import TimelineRepository
+
+USER_ID = 4242
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path: Path) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    engines = {}
+    for role in ("primary", "replica"):
+        shutil.copy("./test.db", tmp_path / f"{role}.db")
+        engines[role] = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / role}.db")
+        # Each copy gets its own title, so every read shows which database served it.
+        async with AsyncSession(engines[role]) as db:
+            db.add(User(id=USER_ID, email="replica@example.com", name="Replica Tester", hashed_password="x"))
+            db.add(Timeline(id=USER_ID, user_id=USER_ID, title=role))
+            # The primary is a sync ahead of the replica
+            versions = {"primary": 2, "replica": 1}
+            db.add(
+                ExternalProfile(
+                    id=USER_ID,
+                    external_id=USER_ID,
+                    user_id=USER_ID,
+                    platform=PlatformEnum.GITHUB,
+                    repositories_version=versions[role],
+                )
+            )
+            await db.commit()
+
+    yield routing_sessionmaker(primary=engines["primary"], replicas=[engines["replica"]])
+
+    for engine in engines.values():
+        await engine.dispose()
+
+
+@pytest.fixture
+def redis() -> Iterator[MagicMock]:
+    with patch("src.db.routing.redis_client") as redis:
+        redis.exists.return_value = 0
+        yield redis
+
+
+async def served_by(db: AsyncSession) -> dict[str, str]:
+    """Which copy answered a read-only method and a regular one, by the title of the seeded timeline."""
+    repo = TimelineRepository(db)
+    listed = await repo.get_timelines_by_user_id(user_id=USER_ID)
+    [listed_title] = [timeline.title for timeline in listed if timeline.id == USER_ID]
+    db.expunge_all()
+    fetched = await repo.get_timeline_by_id(timeline_id=USER_ID, user_id=USER_ID)
+    db.expunge_all()
+    return {"read_only": listed_title, "other": fetched.title}
+
+
+@pytest.mark.asyncio
+async def test_read_only_methods_go_to_the_replica(
+    session_factory: async_sessionmaker[AsyncSession], redis: MagicMock
+) -> None:
+    async with session_factory() as db:
+        assert await served_by(db) == {"read_only": "replica", "other": "primary"}
+
+
+@pytest.mark.asyncio
+async def test_session_reads_its_own_writes_from_the_primary(
+    session_factory: async_sessionmaker[AsyncSession], redis: MagicMock
+) -> None:
+    async with session_factory() as db:
+        await TimelineRepository(db).create_timeline(Timeline(user_id=USER_ID, title="new"))
+
+        repo = TimelineRepository(db)
+        titles = {timeline.title for timeline in await repo.get_timelines_by_user_id(user_id=USER_ID)}
+
+    assert titles == {"primary", "new"}
+
+
+@pytest.mark.asyncio
+async def test_users_stick_to_the_primary_after_writing(
+    session_factory: async_sessionmaker[AsyncSession], redis: MagicMock
+) -> None:
+    bind_user(USER_ID)
+    async with session_factory() as db, UnitOfWork(db):
+        await TimelineRepository(db).create_timeline(Timeline(user_id=USER_ID, title="new"))
+    redis.set.assert_called_once_with(sticky_key(USER_ID), 1, ex=10)
+
+    redis.exists.return_value = 1
+    async with session_factory() as db:
+        assert (await served_by(db))["read_only"] == "primary"
+
+    bind_user(USER_ID + 1)
+    redis.exists.return_value = 0
+    async with session_factory() as db:
+        assert (await served_by(db))["read_only"] == "replica"
+
+
+@pytest.mark.asyncio
+async def test_repository_list_tags_are_read_from_the_replica_with_the_list(
+    session_factory: async_sessionmaker[AsyncSession], redis: MagicMock
+) -> None:
+    async with session_factory() as db:
+        version = await ExternalProfileRepository(db).get_repositories_version(
+            user_id=USER_ID, platform=PlatformEnum.GITHUB
+        )
+
+    assert version == (USER_ID, 1)
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.exceptions.lease import LeaseLostError
+from src.models.integrations import ExternalProfile, PlatformEnum, SyncStatusEnum, SyncStepEnum
+from src.models.integrations.github import GithubRepository as GithubRepositoryModel
+from src.models.integrations.github.github_repositories import GenerationStatusEnum
+from src.models.users import User
+from src.repositories.integrations.external_profile_repository import ExternalProfileRepository
+from src.repositories.integrations.github_repository import GithubRepository
+
+TTL = timedelta(seconds=30)
+
+
+@pytest_asyncio.fixture
+async def profile_id(db: AsyncSession) -> int:
+    """A fresh GitHub profile (and owning user) for each test."""
+    user = User(email=f"lease-{datetime.now().timestamp()}@example.com", name="Lease Tester", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    profile = ExternalProfile(external_id=user.id, user_id=user.id, platform=PlatformEnum.GITHUB)
+    db.add(profile)
+    await db.commit()
+    return profile.id
+
+
+async def expire_sync_lease(db: AsyncSession, profile_id: int) -> None:
+    """Simulate a crashed worker by backdating its lease."""
+    profile = await db.get(ExternalProfile, profile_id)
+    profile.sync_lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await db.commit()
+
+
+async def fetch_profile(db: AsyncSession, profile_id: int) -> ExternalProfile:
+    db.expire_all()
+    result = await db.execute(select(ExternalProfile).where(ExternalProfile.id == profile_id))
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_sync_lease_is_exclusive_until_released(db: AsyncSession, profile_id: int) -> None:
+    repo = ExternalProfileRepository(db)
+
+    token = await repo.acquire_sync_lease(profile_id=profile_id, platform=PlatformEnum.GITHUB, ttl=TTL)
+
+    assert token is not None
+    assert await repo.acquire_sync_lease(profile_id=profile_id, platform=PlatformEnum.GITHUB, ttl=TTL) is None
+    assert await repo.renew_sync_lease(profile_id=profile_id, lease_token=token, ttl=TTL) is True
+
+    assert await repo.release_sync_lease(profile_id=profile_id, lease_token=token, status=SyncStatusEnum.COMPLETED)
+    assert (await fetch_profile(db, profile_id)).sync_status == SyncStatusEnum.COMPLETED
+    assert await repo.acquire_sync_lease(profile_id=profile_id, platform=PlatformEnum.GITHUB, ttl=TTL) == token + 1
+
+
+@pytest.mark.asyncio
+async def test_expired_sync_lease_is_fenced_off_after_takeover(db: AsyncSession, profile_id: int) -> None:
+    """A worker that stalled past its TTL can no longer renew, write steps or release once someone took over."""
+    repo = ExternalProfileRepository(db)
+    stale_token = await repo.acquire_sync_lease(profile_id=profile_id, platform=PlatformEnum.GITHUB, ttl=TTL)
+    await expire_sync_lease(db, profile_id)
+
+    new_token = await repo.acquire_sync_lease(profile_id=profile_id, platform=PlatformEnum.GITHUB, ttl=TTL)
+
+    assert new_token == stale_token + 1
+    assert await repo.renew_sync_lease(profile_id=profile_id, lease_token=stale_token, ttl=TTL) is False
+    with pytest.raises(LeaseLostError):
+        await repo.set_sync_step(profile_id=profile_id, step=SyncStepEnum.REPOS, lease_token=stale_token)
+    assert not await repo.release_sync_lease(
+        profile_id=profile_id, lease_token=stale_token, status=SyncStatusEnum.FAILED
+    )
+    assert (await fetch_profile(db, profile_id)).sync_status == SyncStatusEnum.SYNCING
+
+
+@pytest.mark.asyncio
+async def test_reaper_fails_expired_sync_leases(db: AsyncSession, profile_id: int) -> None:
+    repo = ExternalProfileRepository(db)
+    token = await repo.acquire_sync_lease(profile_id=profile_id, platform=PlatformEnum.GITHUB, ttl=TTL)
+    await expire_sync_lease(db, profile_id)
+
+    assert profile_id in await repo.reap_expired_sync_leases()
+
+    profile = await fetch_profile(db, profile_id)
+    assert profile.sync_status == SyncStatusEnum.FAILED
+    assert profile.sync_lease_expires_at is None
+    assert await repo.renew_sync_lease(profile_id=profile_id, lease_token=token, ttl=TTL) is False
+
+
+@pytest.mark.asyncio
+async def test_generation_leases_renew_release_and_reap(db: AsyncSession, profile_id: int) -> None:
+    now = datetime.now(timezone.utc)
+    repos = [
+        GithubRepositoryModel(
+            external_profile_id=profile_id,
+            github_repo_id=profile_id * 1000 + i,
+            name=f"repo-{i}",
+            full_name=f"octo/repo-{i}",
+            html_url=f"https://github.com/octo/repo-{i}",
+            repo_created_at=now,
+            repo_updated_at=now,
+        )
+        for i in range(2)
+    ]
+    db.add_all(repos)
+    await db.commit()
+    repo_ids = [r.id for r in repos]
+    github_repo = GithubRepository(db)
+
+    leases = await github_repo.acquire_generation_leases(repo_ids=repo_ids, ttl=TTL)
+
+    assert set(leases) == set(repo_ids)
+    assert await github_repo.acquire_generation_leases(repo_ids=repo_ids, ttl=TTL) == {}
+    assert await github_repo.renew_generation_leases(leases=leases, ttl=TTL) is True
+
+    await github_repo.release_generation_leases(
+        leases={repo_ids[0]: leases[repo_ids[0]]}, status=GenerationStatusEnum.COMPLETED
+    )
+    repos[1].generation_lease_expires_at = now - timedelta(seconds=1)
+    await db.commit()
+
+    assert await github_repo.reap_expired_generation_leases() == [repo_ids[1]]
+    assert await github_repo.renew_generation_leases(leases=leases, ttl=TTL) is False
+
+    db.expire_all()
+    statuses = {r.id: r.generation_status for r in (await db.execute(select(GithubRepositoryModel))).scalars()}
+    assert statuses[repo_ids[0]] == GenerationStatusEnum.COMPLETED
+    assert statuses[repo_ids[1]] == GenerationStatusEnum.FAILED
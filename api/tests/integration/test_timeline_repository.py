@@ -0,0 +1,463 @@
+import json
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.exceptions.timeline import InvalidTimelineNodeError, InvalidTimelineWindowError, TimelineNotFoundError
+from src.models.node_artifacts import NodeArtifact
+from src.models.timeline_nodes import NodeType, TimelineNode
+from src.models.timelines import Timeline
+from src.models.users import User
+from src.repositories.timeline_repository import TimelineRepository
+from src.schemas.media import StoredMedia
+from src.schemas.timelines import Timeline as TimelineSchema
+from src.schemas.timelines import TimelineLayout, TimelineNodeBatchItem, TimelineNodeCreate, TimelineWindow
+from src.services.factory import ServiceFactory
+from src.workers.change_log import compact_change_log
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def timeline(db: AsyncSession) -> Timeline:
+    user = User(email=f"writes-{datetime.now().timestamp()}@example.com", name="Write Tester", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    timeline = Timeline(user_id=user.id, title="Writes")
+    db.add(timeline)
+    await db.commit()
+    return timeline
+
+
+StatementCounter = Callable[[], AbstractContextManager[list[str]]]
+
+
+@pytest.fixture
+def count_statements(db_engine: AsyncEngine) -> StatementCounter:
+    """Records the SQL sent to the test database inside a `with count_statements() as statements:` block."""
+
+    @contextmanager
+    def counting() -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def record(conn: object, cursor: object, statement: str, *args: object) -> None:
+            statements.append(statement)
+
+        event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+    return counting
+
+
+def make_node(timeline_id: int, title: str = "Node") -> TimelineNode:
+    return TimelineNode(timeline_id=timeline_id, title=title, type=NodeType.PROJECT, start_date=START, is_current=True)
+
+
+@pytest.mark.asyncio
+async def test_create_timeline_is_a_single_insert(
+    db: AsyncSession, timeline: Timeline, count_statements: StatementCounter
+) -> None:
+    with count_statements() as statements:
+        created = await TimelineRepository(db).create_timeline(Timeline(user_id=timeline.user_id, title="New"))
+
+    assert len(statements) == 1
+    assert created.id is not None
+    assert created.nodes == []
+
+
+@pytest.mark.asyncio
+async def test_create_timeline_node_does_not_reload_relationships(
+    db: AsyncSession, timeline: Timeline, count_statements: StatementCounter
+) -> None:
+    repo = TimelineRepository(db)
+    with count_statements() as statements:
+        plain = await repo.create_timeline_node(make_node(timeline.id))
+    with count_statements() as with_media_statements:
+        media = StoredMedia(content_hash="ab" * 32, size_bytes=3, media_type="image/png", filename="shot.png")
+        with_media = await repo.create_timeline_node(make_node(timeline.id), media=media)
+
+    assert len(statements) == 1
+    assert (plain.children, plain.media) == ([], [])
+    # The node and its artifact
+    assert len(with_media_statements) == 2
+    assert [(artifact.caption, artifact.content_hash) for artifact in with_media.media] == [("shot.png", "ab" * 32)]
+
+
+@pytest.mark.asyncio
+async def test_update_timeline_node_returns_the_updated_row(
+    db: AsyncSession, timeline: Timeline, count_statements: StatementCounter
+) -> None:
+    repo = TimelineRepository(db)
+    node = await repo.create_timeline_node(make_node(timeline.id))
+    await db.commit()
+
+    node.title = "Renamed"
+    with count_statements() as statements:
+        updated = await repo.update_timeline_node(node_id=node.id, timelineNode=node)
+
+    assert len(statements) == 1
+    assert "RETURNING" in statements[0]
+    assert updated is node
+    assert (updated.title, updated.media) == ("Renamed", [])
+
+
+@pytest.mark.asyncio
+async def test_timeline_tree_json_matches_the_schema_response(
+    db: AsyncSession, timeline: Timeline, count_statements: StatementCounter, session_factory: sessionmaker
+) -> None:
+    def at(days: int, **fields: object) -> TimelineNode:
+        fields.setdefault("is_current", True)
+        return TimelineNode(
+            timeline_id=timeline.id, type=NodeType.WORK, start_date=START + timedelta(days=days), **fields
+        )
+
+    late_parent = at(30, title="Late parent")
+    early_parent = at(0, title="Early parent", end_date=START + timedelta(days=90), is_current=False)
+    db.add_all([late_parent, early_parent])
+    await db.flush()
+    # The child starts before its parent, and the grandchild is below the depth the tree shows
+    child = at(-5, title="Child", parent_id=late_parent.id)
+    db.add(child)
+    await db.flush()
+    db.add_all(
+        [
+            at(40, title="Grandchild", parent_id=child.id),
+            NodeArtifact(node_id=child.id, content_hash="ab" * 32, size_bytes=1, media_type="image/png", caption="a"),
+            NodeArtifact(node_id=child.id, content_hash="cd" * 32, size_bytes=1, media_type="image/png"),
+            NodeArtifact(node_id=early_parent.id, content_hash="ef" * 32, size_bytes=1, media_type="application/pdf"),
+        ]
+    )
+    await db.commit()
+
+    async with session_factory() as session:
+        service = ServiceFactory.create_timeline_service(session)
+        with count_statements() as statements:
+            encoded = await service.get_timeline_details_json(timeline_id=timeline.id, user_id=timeline.user_id)
+    async with session_factory() as session:
+        service = ServiceFactory.create_timeline_service(session)
+        expected = await service.get_timeline_details(timeline_id=timeline.id, user_id=timeline.user_id)
+        expected_json = TimelineSchema.model_validate(expected).model_dump_json()
+
+    document = json.loads(encoded)
+    # The lanes are only computed on this path
+    layout = document.pop("layout")
+    assert len(statements) == 1
+    assert document | {"layout": None} == json.loads(expected_json)
+    assert [node["title"] for node in document["nodes"]] == ["Early parent", "Late parent"]
+    assert [(placement["node_id"], placement["lane"]) for placement in layout["placements"]] == [
+        (early_parent.id, 0),
+        (late_parent.id, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_timeline_tree_json_of_an_empty_timeline(db: AsyncSession, timeline: Timeline) -> None:
+    service = ServiceFactory.create_timeline_service(db)
+
+    encoded = json.loads(await service.get_timeline_details_json(timeline_id=timeline.id, user_id=timeline.user_id))
+
+    assert (encoded["id"], encoded["title"], encoded["nodes"]) == (timeline.id, "Writes", [])
+
+
+@pytest_asyncio.fixture
+async def spread_timeline(db: AsyncSession, timeline: Timeline) -> Timeline:
+    """Nodes around a window from day 40 to day 60."""
+
+    def at(title: str, start: int, end: int | None = None, **fields: object) -> TimelineNode:
+        return TimelineNode(
+            timeline_id=timeline.id,
+            title=title,
+            type=NodeType.WORK,
+            start_date=START + timedelta(days=start),
+            end_date=START + timedelta(days=end) if end is not None else None,
+            **fields,
+        )
+
+    spanning, outer = at("Spanning", -10, 100), at("Outer", 200, 210)
+    db.add_all([at("Before", 0, 10), spanning, outer, at("Ongoing", -300, is_current=True), at("After", 70)])
+    await db.flush()
+    db.add_all(
+        [
+            at("Milestone in", 50, parent_id=spanning.id),
+            at("Milestone out", 5, parent_id=spanning.id),
+            at("Early child", 45, 46, parent_id=outer.id),
+        ]
+    )
+    await db.commit()
+    return timeline
+
+
+async def window_tree(
+    session_factory: sessionmaker, timeline: Timeline, **window: object
+) -> list[tuple[str, list[str]]]:
+    async with session_factory() as session:
+        service = ServiceFactory.create_timeline_service(session)
+        encoded = await service.get_timeline_window_json(
+            timeline_id=timeline.id,
+            user_id=timeline.user_id,
+            window=TimelineWindow(start=START + timedelta(days=40), end=START + timedelta(days=60), **window),
+        )
+    return [(node["title"], [child["title"] for child in node["children"]]) for node in json.loads(encoded)]
+
+
+@pytest.mark.asyncio
+async def test_timeline_window_returns_overlapping_nodes(
+    spread_timeline: Timeline, session_factory: sessionmaker
+) -> None:
+    # "Outer" is outside the window, but comes along for its child
+    assert await window_tree(session_factory, spread_timeline) == [
+        ("Ongoing", []),
+        ("Spanning", ["Milestone in"]),
+        ("Outer", ["Early child"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_timeline_window_without_children(spread_timeline: Timeline, session_factory: sessionmaker) -> None:
+    assert await window_tree(session_factory, spread_timeline, include_children=False) == [
+        ("Ongoing", []),
+        ("Spanning", []),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_timeline_window_checks_its_bounds_and_owner(db: AsyncSession, timeline: Timeline) -> None:
+    service = ServiceFactory.create_timeline_service(db)
+    window = TimelineWindow(start=START, end=START + timedelta(days=1))
+
+    with pytest.raises(InvalidTimelineWindowError):
+        await service.get_timeline_window_json(
+            timeline_id=timeline.id, user_id=timeline.user_id, window=TimelineWindow(start=window.end, end=START)
+        )
+    with pytest.raises(TimelineNotFoundError):
+        await service.get_timeline_window_json(timeline_id=timeline.id, user_id=timeline.user_id + 1, window=window)
+    assert await service.get_timeline_window_json(timeline_id=timeline.id, user_id=timeline.user_id, window=window) == (
+        b"[]"
+    )
+
+
+@pytest.mark.asyncio
+async def test_node_changes_bump_the_timeline_version(
+    db: AsyncSession, timeline: Timeline, session_factory: sessionmaker
+) -> None:
+    service = ServiceFactory.create_timeline_service(db)
+    node = TimelineNodeCreate(
+        timeline_id=timeline.id, title="Job", type=NodeType.WORK, start_date=START, is_current=True
+    )
+
+    list_version = await TimelineRepository(db).get_timelines_version(user_id=timeline.user_id)
+
+    created = await service.create_timeline_node(user_id=timeline.user_id, timeline_node=node, media=None)
+    await service.update_timeline_node(user_id=timeline.user_id, node_id=created.id, timeline_node=node)
+    await service.delete_timeline_node(node_id=created.id, user_id=timeline.user_id)
+
+    async with session_factory() as session:
+        repo = TimelineRepository(session)
+        assert await repo.get_timeline_version(timeline.id, timeline.user_id) == 4
+        # The owner's list of timelines is untouched by node writes
+        assert await repo.get_timelines_version(user_id=timeline.user_id) == list_version
+        assert (await repo.get_timeline_by_id(timeline.id, timeline.user_id)).updated_at == timeline.updated_at
+
+
+@pytest.mark.asyncio
+async def test_timeline_layout_is_computed_once_per_version(
+    spread_timeline: Timeline, count_statements: StatementCounter, session_factory: sessionmaker
+) -> None:
+    async def layout() -> tuple[TimelineLayout, list[str]]:
+        async with session_factory() as session:
+            service = ServiceFactory.create_timeline_service(session)
+            with count_statements() as statements:
+                result = await service.get_timeline_layout(
+                    timeline_id=spread_timeline.id, user_id=spread_timeline.user_id
+                )
+        return result, statements
+
+    first, first_statements = await layout()
+    cached, cached_statements = await layout()
+    async with session_factory() as session:
+        service = ServiceFactory.create_timeline_service(session)
+        await service.create_timeline_node(
+            user_id=spread_timeline.user_id,
+            timeline_node=TimelineNodeCreate(
+                timeline_id=spread_timeline.id,
+                title="Side project",
+                type=NodeType.PROJECT,
+                start_date=START,
+                is_current=True,
+            ),
+            media=None,
+        )
+    changed, _ = await layout()
+
+    assert (len(first_statements), len(cached_statements)) == (2, 1)
+    assert cached == first
+    assert first.lane_count == 3
+    assert changed.version == first.version + 1
+    assert len(changed.placements) == len(first.placements) + 1
+
+
+@pytest.mark.asyncio
+async def test_timeline_changes_collapse_to_the_current_state(
+    db: AsyncSession, timeline: Timeline, count_statements: StatementCounter, session_factory: sessionmaker
+) -> None:
+    service = ServiceFactory.create_timeline_service(db)
+
+    def node(title: str, parent_id: int | None = None) -> TimelineNodeCreate:
+        return TimelineNodeCreate(
+            timeline_id=timeline.id,
+            title=title,
+            type=NodeType.WORK,
+            start_date=START,
+            is_current=True,
+            parent_id=parent_id,
+        )
+
+    kept = await service.create_timeline_node(user_id=timeline.user_id, timeline_node=node("Kept"), media=None)
+    dropped = await service.create_timeline_node(user_id=timeline.user_id, timeline_node=node("Dropped"), media=None)
+    child = await service.create_timeline_node(
+        user_id=timeline.user_id, timeline_node=node("Child", parent_id=dropped.id), media=None
+    )
+    # Version 4: the client's copy from here on
+    await service.update_timeline_node(user_id=timeline.user_id, node_id=kept.id, timeline_node=node("Renamed"))
+    await service.update_timeline_node(user_id=timeline.user_id, node_id=kept.id, timeline_node=node("Renamed again"))
+    added = await service.create_timeline_node(user_id=timeline.user_id, timeline_node=node("Added"), media=None)
+    await service.delete_timeline_node(node_id=dropped.id, user_id=timeline.user_id)
+
+    async with session_factory() as session:
+        service = ServiceFactory.create_timeline_service(session)
+        with count_statements() as statements:
+            changes = await service.get_timeline_changes(timeline_id=timeline.id, user_id=timeline.user_id, since=4)
+        current = await service.get_timeline_changes(timeline_id=timeline.id, user_id=timeline.user_id, since=8)
+        ahead = await service.get_timeline_changes(timeline_id=timeline.id, user_id=timeline.user_id, since=9)
+        with pytest.raises(TimelineNotFoundError):
+            await service.get_timeline_changes(timeline_id=timeline.id, user_id=timeline.user_id + 1, since=4)
+
+    # The version and floor, the log, the changed nodes, and their media
+    assert len(statements) == 4
+    assert (changes.version, changes.reset) == (8, False)
+    assert [(n.id, n.title) for n in changes.upserted] == [(kept.id, "Renamed again"), (added.id, "Added")]
+    assert sorted(changes.deleted) == sorted([dropped.id, child.id])
+    assert (current.version, current.reset, current.upserted, current.deleted) == (8, False, [], [])
+    assert (ahead.version, ahead.reset) == (8, True)
+
+
+@pytest.mark.asyncio
+async def test_compacted_change_log_asks_older_clients_to_reload(
+    db: AsyncSession, timeline: Timeline, session_factory: sessionmaker
+) -> None:
+    service = ServiceFactory.create_timeline_service(db)
+    node = TimelineNodeCreate(
+        timeline_id=timeline.id, title="Job", type=NodeType.WORK, start_date=START, is_current=True
+    )
+    await service.create_timeline_node(user_id=timeline.user_id, timeline_node=node, media=None)
+    await service.create_timeline_node(user_id=timeline.user_id, timeline_node=node, media=None)
+
+    # A cutoff in the future compacts everything logged so far
+    assert await compact_change_log(retention=timedelta(days=-1), session_factory=session_factory) >= 2
+
+    async with session_factory() as session:
+        service = ServiceFactory.create_timeline_service(session)
+        stale = await service.get_timeline_changes(timeline_id=timeline.id, user_id=timeline.user_id, since=2)
+        current = await service.get_timeline_changes(timeline_id=timeline.id, user_id=timeline.user_id, since=3)
+
+    assert (stale.version, stale.reset, stale.upserted) == (3, True, [])
+    assert (current.version, current.reset) == (3, False)
+
+
+@pytest.mark.asyncio
+async def test_compacting_the_change_log_keeps_timelines_in_place(
+    db: AsyncSession, timeline: Timeline, session_factory: sessionmaker
+) -> None:
+    edited_at = datetime(2020, 1, 1)
+    await db.execute(update(Timeline).where(Timeline.id == timeline.id).values(updated_at=edited_at))
+    await db.commit()
+    service = ServiceFactory.create_timeline_service(db)
+    node = TimelineNodeCreate(
+        timeline_id=timeline.id, title="Job", type=NodeType.WORK, start_date=START, is_current=True
+    )
+    await service.create_timeline_node(user_id=timeline.user_id, timeline_node=node, media=None)
+
+    await compact_change_log(retention=timedelta(days=-1), session_factory=session_factory)
+
+    async with session_factory() as session:
+        compacted = await TimelineRepository(session).get_timeline_by_id(timeline.id, timeline.user_id)
+    assert compacted.change_log_floor == compacted.version == 2
+    assert compacted.updated_at.replace(tzinfo=None) == edited_at
+
+
+def batch_item(title: str, days: int = 0, **fields: object) -> TimelineNodeBatchItem:
+    fields.setdefault("is_current", True)
+    return TimelineNodeBatchItem(title=title, type=NodeType.PROJECT, start_date=START + timedelta(days=days), **fields)
+
+
+@pytest.mark.asyncio
+async def test_create_timeline_nodes_inserts_each_level_at_once(
+    db: AsyncSession, timeline: Timeline, count_statements: StatementCounter, session_factory: sessionmaker
+) -> None:
+    existing = await TimelineRepository(db).create_timeline_node(make_node(timeline.id, title="Existing"))
+    await db.commit()
+    nodes = [
+        batch_item("Parent"),
+        batch_item("Other parent", days=10),
+        batch_item("Child", days=1, parent_index=0),
+        # SQLite hands the existing parent's dates back without a zone
+        batch_item("Child of existing", parent_id=existing.id).model_copy(
+            update={"start_date": START.replace(tzinfo=None) + timedelta(days=2)}
+        ),
+        batch_item("Second child", days=3, parent_index=0),
+    ]
+
+    async with session_factory() as session:
+        service = ServiceFactory.create_timeline_service(session)
+        with count_statements() as statements:
+            created = await service.create_timeline_nodes(
+                user_id=timeline.user_id, timeline_id=timeline.id, nodes=nodes
+            )
+
+    others = [statement for statement in statements if not statement.startswith("INSERT INTO timeline_nodes")]
+    # The timeline, the existing parents, the version bump, and the change log, however many nodes there are.
+    # The nodes go in with one INSERT per level on PostgreSQL; SQLite can't order RETURNING, so it takes one per row.
+    assert len(others) == 4
+    assert [node.title for node in created] == [node.title for node in nodes]
+    assert [node.parent_id for node in created] == [None, None, created[0].id, existing.id, created[0].id]
+    assert [child.title for child in created[0].children] == ["Child", "Second child"]
+    async with session_factory() as session:
+        changes = await ServiceFactory.create_timeline_service(session).get_timeline_changes(
+            timeline_id=timeline.id, user_id=timeline.user_id, since=1
+        )
+    assert (changes.version, len(changes.upserted)) == (2, 5)
+
+
+@pytest.mark.asyncio
+async def test_create_timeline_nodes_validates_the_whole_batch_first(
+    db: AsyncSession, timeline: Timeline, session_factory: sessionmaker
+) -> None:
+    service = ServiceFactory.create_timeline_service(db)
+    parent = batch_item("Parent", days=10, is_current=False, end_date=START + timedelta(days=20))
+    invalid_batches = [
+        # Points at itself, at a child, and starts before its parent
+        [batch_item("Loop", parent_index=0)],
+        [batch_item("Parent"), batch_item("Child", parent_index=0), batch_item("Grandchild", parent_index=1)],
+        [parent, batch_item("Early", days=5, is_current=False, end_date=START + timedelta(days=15), parent_index=0)],
+        [batch_item("Valid"), batch_item("Undated", is_current=False)],
+    ]
+
+    for nodes in invalid_batches:
+        with pytest.raises(InvalidTimelineNodeError):
+            await service.create_timeline_nodes(user_id=timeline.user_id, timeline_id=timeline.id, nodes=nodes)
+    with pytest.raises(TimelineNotFoundError):
+        await service.create_timeline_nodes(
+            user_id=timeline.user_id + 1, timeline_id=timeline.id, nodes=[batch_item("Elsewhere")]
+        )
+
+    async with session_factory() as session:
+        assert await TimelineRepository(session).get_timeline_version(timeline.id, timeline.user_id) == 1
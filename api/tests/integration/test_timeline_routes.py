@@ -1,8 +1,12 @@
+import hashlib
+import io
 import json
 from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
+from PIL import Image
 
+from src.core.config import settings
 from tests.test_helpers import AuthHelper
 
 
@@ -254,6 +258,227 @@ def test_delete_timeline_node_success(mock_redis: MagicMock, client: TestClient,
     assert response.status_code == 204
 
 
+@patch("src.services.auth_service.redis_client")
+def test_node_artifact_served_separately_with_etag_and_ranges(
+    mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper
+) -> None:
+    headers = auth_helper.get_auth_headers("appa")
+    mock_redis.exists.return_value = 0
+    image = bytes(range(100))
+
+    timeline_id = client.post(
+        "/timelines",
+        json={"title": "Artifact Timeline", "description": "", "is_public": False},
+        headers=headers,
+    ).json()["id"]
+    node = client.post(
+        "/timelines/node",
+        data={
+            "timeline_node": json.dumps(
+                {
+                    "timeline_id": timeline_id,
+                    "title": "Shipped",
+                    "type": "work",
+                    "start_date": "2022-01-01",
+                    "is_current": True,
+                }
+            )
+        },
+        files={"media": ("shot.png", image, "image/png")},
+        headers=headers,
+    ).json()
+
+    # The tree only carries metadata
+    [listed] = client.get(f"/timelines/{timeline_id}", headers=headers).json()["nodes"][0]["media"]
+    assert listed == {"id": listed["id"], "node_id": node["id"], "media_type": "image/png", "caption": "shot.png"}
+    url = f"/timelines/node/{node['id']}/media/{listed['id']}"
+
+    full = client.get(url, headers=headers)
+    assert (full.status_code, full.content, full.headers["content-type"]) == (200, image, "image/png")
+    etag = full.headers["etag"]
+    assert etag == f'"{hashlib.sha256(image).hexdigest()}"'
+
+    assert client.get(url, headers=headers | {"If-None-Match": etag}).status_code == 304
+
+    partial = client.get(url, headers=headers | {"Range": "bytes=10-19"})
+    assert (partial.status_code, partial.content) == (206, image[10:20])
+    assert partial.headers["content-range"] == "bytes 10-19/100"
+
+    suffix = client.get(url, headers=headers | {"Range": "bytes=-5", "If-Range": etag})
+    assert (suffix.status_code, suffix.content) == (206, image[-5:])
+
+    stale = client.get(url, headers=headers | {"Range": "bytes=-5", "If-Range": '"stale"'})
+    assert (stale.status_code, stale.content) == (200, image)
+
+    unsatisfiable = client.get(url, headers=headers | {"Range": "bytes=100-"})
+    assert unsatisfiable.status_code == 416
+    # Starlette leaves the unit off the unsatisfied-range header
+    assert unsatisfiable.headers["content-range"].endswith("*/100")
+
+    other_user = client.get(url, headers=auth_helper.get_auth_headers("momo"))
+    assert other_user.status_code == 404
+
+
+@patch("src.services.auth_service.redis_client")
+def test_node_image_variants_are_served_by_query_parameter(
+    mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper
+) -> None:
+    headers = auth_helper.get_auth_headers("appa")
+    mock_redis.exists.return_value = 0
+    png = io.BytesIO()
+    Image.new("RGB", (1600, 900), color="green").save(png, format="PNG")
+    timeline_id = client.post("/timelines", json={"title": "Variants"}, headers=headers).json()["id"]
+    node = {"timeline_id": timeline_id, "title": "Screenshot", "type": "work", "start_date": "2022-01-01"}
+
+    created = client.post(
+        "/timelines/node",
+        data={"timeline_node": json.dumps(node | {"is_current": True})},
+        files={"media": ("shot.png", png.getvalue(), "image/png")},
+        headers=headers,
+    ).json()
+    [artifact] = created["media"]
+    url = f"/timelines/node/{created['id']}/media/{artifact['id']}"
+
+    original = client.get(url, headers=headers)
+    thumb = client.get(url, params={"variant": "thumb"}, headers=headers)
+
+    assert thumb.status_code == 200
+    assert thumb.headers["content-type"] == "image/webp"
+    assert thumb.headers["etag"] == original.headers["etag"][:-1] + '-thumb"'
+    assert Image.open(io.BytesIO(thumb.content)).size == (320, 180)
+    assert len(thumb.content) < len(original.content)
+    assert client.get(url, params={"variant": "huge"}, headers=headers).status_code == 422
+
+
+@patch("src.services.auth_service.redis_client")
+def test_node_media_over_the_size_limit_is_rejected(
+    mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper
+) -> None:
+    headers = auth_helper.get_auth_headers("appa")
+    mock_redis.exists.return_value = 0
+    timeline_id = client.post("/timelines", json={"title": "Limits"}, headers=headers).json()["id"]
+    node = {"timeline_id": timeline_id, "title": "Huge", "type": "work", "start_date": "2022-01-01", "is_current": True}
+
+    with patch.object(settings, "MEDIA_MAX_UPLOAD_BYTES", 10):
+        response = client.post(
+            "/timelines/node",
+            data={"timeline_node": json.dumps(node)},
+            files={"media": ("huge.png", b"x" * 11, "image/png")},
+            headers=headers,
+        )
+
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == "MEDIA_TOO_LARGE"
+
+
+@patch("src.services.auth_service.redis_client")
+def test_get_timeline_window(mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper) -> None:
+    headers = auth_helper.get_auth_headers("appa")
+    mock_redis.exists.return_value = 0
+    timeline_id = client.post("/timelines", json={"title": "Window"}, headers=headers).json()["id"]
+    for title, start_date, end_date in (("2019", "2019-01-01", "2019-12-31"), ("2021", "2021-01-01", "2021-12-31")):
+        node = {"timeline_id": timeline_id, "title": title, "type": "work", "start_date": start_date}
+        client.post(
+            "/timelines/node", data={"timeline_node": json.dumps(node | {"end_date": end_date})}, headers=headers
+        )
+    url = f"/timelines/{timeline_id}/nodes"
+
+    in_window = client.get(
+        url, params={"from": "2020-06-01T00:00:00+02:00", "to": "2021-03-01", "zoom": 0}, headers=headers
+    )
+    inverted = client.get(url, params={"from": "2021-03-01", "to": "2020-06-01"}, headers=headers)
+
+    assert in_window.status_code == 200
+    assert [node["title"] for node in in_window.json()] == ["2021"]
+    assert inverted.status_code == 400
+    assert inverted.json()["error"]["code"] == "INVALID_TIMELINE_WINDOW"
+    assert client.get(url, params={"from": "2020-06-01"}, headers=headers).status_code == 422
+
+
+@patch("src.services.auth_service.redis_client")
+def test_timeline_responses_are_cached_by_version(
+    mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper, cached_responses: dict[str, str]
+) -> None:
+    headers = auth_helper.get_auth_headers("appa")
+    mock_redis.exists.return_value = 0
+    timeline_id = client.post("/timelines", json={"title": "Cached"}, headers=headers).json()["id"]
+    node = {"timeline_id": timeline_id, "title": "Job", "type": "work", "start_date": "2022-01-01", "is_current": True}
+    node_id = client.post("/timelines/node", data={"timeline_node": json.dumps(node)}, headers=headers).json()["id"]
+    urls = ["/timelines", f"/timelines/{timeline_id}", f"/timelines/node/{node_id}"]
+
+    first = {url: client.get(url, headers=headers) for url in urls}
+    cached = len(cached_responses)
+    revalidated = {
+        url: client.get(url, headers=headers | {"If-None-Match": response.headers["etag"]})
+        for url, response in first.items()
+    }
+    client.patch(
+        f"/timelines/node/{node_id}",
+        data={"timeline_node": json.dumps(node | {"title": "Promoted"})},
+        headers=headers,
+    )
+    changed = {
+        url: client.get(url, headers=headers | {"If-None-Match": response.headers["etag"]})
+        for url, response in first.items()
+    }
+
+    assert cached == len(urls)
+    assert all(response.status_code == 304 and not response.content for response in revalidated.values())
+    # A node edit doesn't show in the list of timelines, so only the timeline and the node change
+    assert changed["/timelines"].status_code == 304
+    assert changed[f"/timelines/node/{node_id}"].json()["title"] == "Promoted"
+    assert changed[f"/timelines/{timeline_id}"].json()["nodes"][0]["title"] == "Promoted"
+    for url in urls[1:]:
+        assert changed[url].status_code == 200
+        assert changed[url].headers["etag"] != first[url].headers["etag"]
+        assert changed[url].headers["etag"] == client.get(url, headers=headers).headers["etag"]
+
+
+@patch("src.services.auth_service.redis_client")
+def test_timeline_changes_since_a_version(mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper) -> None:
+    headers = auth_helper.get_auth_headers("appa")
+    mock_redis.exists.return_value = 0
+    timeline_id = client.post("/timelines", json={"title": "Synced"}, headers=headers).json()["id"]
+    node = {"timeline_id": timeline_id, "title": "Job", "type": "work", "start_date": "2022-01-01", "is_current": True}
+    node_id = client.post("/timelines/node", data={"timeline_node": json.dumps(node)}, headers=headers).json()["id"]
+    version = client.get(f"/timelines/{timeline_id}", headers=headers).json()["version"]
+    client.patch(
+        f"/timelines/node/{node_id}", data={"timeline_node": json.dumps(node | {"title": "Lead"})}, headers=headers
+    )
+    url = f"/timelines/{timeline_id}/changes"
+
+    response = client.get(url, params={"since": version}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["version"] == version + 1
+    assert [(n["id"], n["title"]) for n in response.json()["upserted"]] == [(node_id, "Lead")]
+    assert client.get(url, params={"since": 0}, headers=headers).json()["reset"] is True
+    assert client.get(url, headers=headers).status_code == 422
+
+
+@patch("src.services.auth_service.redis_client")
+def test_create_timeline_nodes_in_a_batch(mock_redis: MagicMock, client: TestClient, auth_helper: AuthHelper) -> None:
+    headers = auth_helper.get_auth_headers("appa")
+    mock_redis.exists.return_value = 0
+    timeline_id = client.post("/timelines", json={"title": "Bulk"}, headers=headers).json()["id"]
+    node = {"type": "work", "start_date": "2022-01-01", "is_current": True}
+    url = f"/timelines/{timeline_id}/nodes:batch"
+
+    response = client.post(
+        url,
+        json={"nodes": [node | {"title": "Job"}, node | {"title": "Project", "parent_index": 0}]},
+        headers=headers,
+    )
+    invalid = client.post(url, json={"nodes": [node | {"title": "Orphan", "parent_index": 3}]}, headers=headers)
+
+    assert response.status_code == 201
+    job, project = response.json()
+    assert (job["title"], project["title"], project["parent_id"]) == ("Job", "Project", job["id"])
+    assert invalid.status_code == 400
+    assert client.post(url, json={"nodes": []}, headers=headers).status_code == 422
+    assert [n["title"] for n in client.get(f"/timelines/{timeline_id}", headers=headers).json()["nodes"]] == ["Job"]
+
+
 def test_timelines_unauthorized(client: TestClient) -> None:
     response = client.get("/timelines")
     assert response.status_code == 403
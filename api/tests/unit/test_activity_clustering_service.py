@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, timezone
 import pytest
 
 from src.schemas.integrations.analysis.significance import SignificanceLevel
-from src.schemas.integrations.github import CommitInDB
+from src.schemas.integrations.github import CommitSummary
 from src.services.integrations.analysis.activity_clustering_service import ActivityClusteringService
 
 
@@ -15,22 +15,15 @@ def clustering_service() -> ActivityClusteringService:
 
 def create_mock_commit(
     days_offset: int, score: float, classification: SignificanceLevel, files: list[str]
-) -> CommitInDB:
-    """Helper to generate a CommitInDB object for testing."""
-    return CommitInDB(
+) -> CommitSummary:
+    """Helper to generate a CommitSummary object for testing."""
+    return CommitSummary(
         sha=f"sha_{days_offset}",
-        external_profile_id=1,
-        author_id=1,
-        repository_id=1,
         message="Test commit",
         authored_at=datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(days=days_offset),
-        html_url="http://github.com",
-        additions=10,
-        deletions=2,
-        total=12,
-        files=[{"filename": f} for f in files],
         significance_score=score,
         significance_classification=classification,
+        filenames=files,
     )
 
 
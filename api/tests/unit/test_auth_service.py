@@ -1,14 +1,18 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from fastapi import UploadFile
+from fastapi import Response, UploadFile
 from jose import jwt
 
+from src.core.config import settings
+from src.core.lru_cache import BytesLRUCache
+from src.db.unit_of_work import UnitOfWork
 from src.exceptions.auth import AuthenticationError, InvalidTokenError, TokenExpiredError, UserAlreadyExistsError
 from src.exceptions.validation import ValidationError
 from src.models.users import User
-from src.schemas.users import UserCreate, UserUpdate
+from src.schemas.media import MediaVariant, StoredMedia
+from src.schemas.users import AvatarRef, UserCreate, UserUpdate
 from src.services.auth_service import AuthService
 
 
@@ -18,8 +22,43 @@ def mock_user_repo() -> AsyncMock:
 
 
 @pytest.fixture
-def auth_service(mock_user_repo: AsyncMock) -> AuthService:
-    return AuthService(user_repo=mock_user_repo)
+def mock_media_service() -> AsyncMock:
+    return AsyncMock()
+
+
+@pytest.fixture
+def avatar_cache() -> BytesLRUCache:
+    return BytesLRUCache(max_bytes=1024)
+
+
+@pytest.fixture
+def mock_redis_cache(monkeypatch: pytest.MonkeyPatch) -> dict[str, object]:
+    """In-memory stand-in for the Redis helpers the avatar ref is cached with."""
+    cache: dict[str, object] = {}
+    monkeypatch.setattr("src.services.auth_service.redis_get", lambda key, model=None: cache.get(key))
+    monkeypatch.setattr(
+        "src.services.auth_service.redis_set", lambda key, value, ex=None: cache.__setitem__(key, value)
+    )
+    monkeypatch.setattr("src.services.auth_service.redis_delete", lambda key: cache.pop(key, None))
+    return cache
+
+
+@pytest.fixture
+def mock_db() -> AsyncMock:
+    return AsyncMock(info={})
+
+
+@pytest.fixture
+def auth_service(
+    mock_user_repo: AsyncMock,
+    mock_media_service: AsyncMock,
+    avatar_cache: BytesLRUCache,
+    mock_redis_cache: dict[str, object],
+    mock_db: AsyncMock,
+) -> AuthService:
+    return AuthService(
+        user_repo=mock_user_repo, media_service=mock_media_service, avatar_cache=avatar_cache, uow=UnitOfWork(mock_db)
+    )
 
 
 # --- Password and Token Tests ---
@@ -216,52 +255,101 @@ async def test_update_user_metadata(auth_service: AuthService, mock_user_repo: A
 
 
 @pytest.mark.asyncio
-async def test_get_avatar_info_success(auth_service: AuthService, mock_user_repo: AsyncMock) -> None:
+async def test_get_avatar_ref_caches_the_database_lookup(
+    auth_service: AuthService, mock_user_repo: AsyncMock, mock_redis_cache: dict[str, object]
+) -> None:
     # --- Setup ---
-    user_id = 1
-    expected_info = (datetime.now(), "image/png")
-    mock_user_repo.get_avatar_metadata.return_value = expected_info
+    avatar = AvatarRef(avatar_hash="ab" * 32, media_type="image/png")
+    mock_user_repo.get_avatar_ref.return_value = avatar
 
     # --- Execute ---
-    result = await auth_service.get_avatar_info(user_id)
+    first = await auth_service.get_avatar_ref(1)
+    second = await auth_service.get_avatar_ref(1)
 
     # --- Assert ---
-    assert result == expected_info
-    mock_user_repo.get_avatar_metadata.assert_called_once_with(user_id)
+    assert first == second == avatar
+    assert mock_redis_cache == {"avatar:ref:1": avatar}
+    mock_user_repo.get_avatar_ref.assert_called_once_with(1)
 
 
 @pytest.mark.asyncio
-async def test_get_avatar_bytes_success(auth_service: AuthService, mock_user_repo: AsyncMock) -> None:
+async def test_get_avatar_ref_without_avatar(
+    auth_service: AuthService, mock_user_repo: AsyncMock, mock_redis_cache: dict[str, object]
+) -> None:
+    mock_user_repo.get_avatar_ref.return_value = None
+
+    assert await auth_service.get_avatar_ref(1) is None
+    assert mock_redis_cache == {}
+
+
+@pytest.mark.asyncio
+async def test_serve_avatar_keeps_hot_images_in_memory(
+    auth_service: AuthService, mock_media_service: AsyncMock, avatar_cache: BytesLRUCache
+) -> None:
     # --- Setup ---
-    user_id = 1
-    expected_bytes = b"fake_image_blob"
-    mock_user_repo.get_avatar_blob.return_value = expected_bytes
+    avatar = AvatarRef(avatar_hash="ab" * 32, media_type="image/png")
+    mock_media_service.resolve.return_value = ("ab" * 32 + "-thumb", "image/webp")
+    mock_media_service.store.read_small.return_value = b"thumb-bytes"
+    mock_media_service.store.serve.return_value = Response(content=b"thumb-bytes", media_type="image/webp")
+
+    # --- Execute ---
+    first = await auth_service.serve_avatar(avatar=avatar, headers={"ETag": '"x"'}, variant=MediaVariant.THUMB)
+    second = await auth_service.serve_avatar(avatar=avatar, headers={"ETag": '"x"'}, variant=MediaVariant.THUMB)
+
+    # --- Assert ---
+    # The miss is served by the store, the repeat from memory
+    assert first is mock_media_service.store.serve.return_value
+    mock_media_service.store.serve.assert_called_once_with("ab" * 32 + "-thumb", "image/webp", {"ETag": '"x"'})
+    assert second.body == b"thumb-bytes"
+    assert second.media_type == "image/webp"
+    assert second.headers["etag"] == '"x"'
+    mock_media_service.resolve.assert_called_once_with("ab" * 32, "image/png", variant=MediaVariant.THUMB)
+    assert avatar_cache.size_bytes == len(b"thumb-bytes")
+
+
+@pytest.mark.asyncio
+async def test_serve_avatar_leaves_large_images_to_the_store(
+    auth_service: AuthService, mock_media_service: AsyncMock, avatar_cache: BytesLRUCache
+) -> None:
+    # --- Setup ---
+    avatar = AvatarRef(avatar_hash="ab" * 32, media_type="image/png")
+    mock_media_service.resolve.return_value = ("ab" * 32, "image/png")
+    mock_media_service.store.read_small.return_value = None
 
     # --- Execute ---
-    result = await auth_service.get_avatar_bytes(user_id)
+    await auth_service.serve_avatar(avatar=avatar, headers={})
+    await auth_service.serve_avatar(avatar=avatar, headers={})
 
     # --- Assert ---
-    assert result == expected_bytes
-    mock_user_repo.get_avatar_blob.assert_called_once_with(user_id)
+    mock_media_service.store.read_small.assert_called_with("ab" * 32, max_bytes=settings.AVATAR_CACHE_MAX_OBJECT_BYTES)
+    assert mock_media_service.store.serve.call_count == 2
+    assert len(avatar_cache) == 0
 
 
 @pytest.mark.asyncio
-async def test_update_avatar_success(auth_service: AuthService, mock_user_repo: AsyncMock) -> None:
+async def test_update_avatar_success(
+    auth_service: AuthService,
+    mock_user_repo: AsyncMock,
+    mock_media_service: AsyncMock,
+    mock_redis_cache: dict[str, object],
+) -> None:
     # --- Setup ---
     user_id = 1
-    file_content = b"fake_image_data"
 
     # Mock FastAPI UploadFile
     mock_file = AsyncMock(spec=UploadFile)
     mock_file.content_type = "image/jpeg"
-    mock_file.read.return_value = file_content
+    stored = StoredMedia(content_hash="ab" * 32, size_bytes=15, media_type="image/jpeg", filename="me.jpg")
+    mock_media_service.ingest.return_value = stored
 
     # --- Execute ---
-    await auth_service.update_avatar(user_id, mock_file)
+    result = await auth_service.update_avatar(user_id, mock_file)
 
     # --- Assert ---
-    mock_user_repo.upload_avatar.assert_called_once_with(user_id=user_id, blob=file_content, mime_type="image/jpeg")
-    mock_file.read.assert_called_once()
+    assert result == stored
+    assert mock_redis_cache["avatar:ref:1"] == AvatarRef(avatar_hash="ab" * 32, media_type="image/jpeg")
+    mock_user_repo.upload_avatar.assert_called_once_with(user_id=user_id, avatar_hash="ab" * 32, mime_type="image/jpeg")
+    mock_media_service.ingest.assert_called_once()
     mock_file.close.assert_called_once()
 
 
@@ -283,12 +371,16 @@ async def test_update_avatar_invalid_type(auth_service: AuthService, mock_user_r
 
 
 @pytest.mark.asyncio
-async def test_remove_avatar_success(auth_service: AuthService, mock_user_repo: AsyncMock) -> None:
+async def test_remove_avatar_success(
+    auth_service: AuthService, mock_user_repo: AsyncMock, mock_redis_cache: dict[str, object]
+) -> None:
     # --- Setup ---
     user_id = 1
+    mock_redis_cache["avatar:ref:1"] = AvatarRef(avatar_hash="ab" * 32, media_type="image/png")
 
     # --- Execute ---
     await auth_service.remove_avatar(user_id)
 
     # --- Assert ---
     mock_user_repo.remove_avatar.assert_called_once_with(user_id=user_id)
+    assert mock_redis_cache == {}
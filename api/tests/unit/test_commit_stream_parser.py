@@ -0,0 +1,109 @@
+import json
+from collections.abc import AsyncIterator
+
+import pytest
+
+from src.services.integrations.commit_stream_parser import parse_commit_detail, parse_commit_detail_stream
+
+
+async def chunked(payload: dict, chunk_size: int = 7) -> AsyncIterator[bytes]:
+    """Yield a JSON payload in small chunks to exercise token boundaries."""
+    body = json.dumps(payload).encode()
+    for i in range(0, len(body), chunk_size):
+        yield body[i : i + chunk_size]
+
+
+@pytest.fixture
+def commit_payload() -> dict:
+    return {
+        "sha": "abc123",
+        "node_id": "C_kwDO",
+        "url": "https://api.github.com/repos/octo/repo/commits/abc123",
+        "html_url": "https://github.com/octo/repo/commit/abc123",
+        "author": {
+            "login": "octocat",
+            "id": 1,
+            "repos_url": "https://api.github.com/users/octocat/repos",
+            "events_url": "https://api.github.com/users/octocat/events{/privacy}",
+            "type": "User",
+            "site_admin": False,
+        },
+        "commit": {
+            "message": "feat: add parser",
+            "author": {"name": "Octo Cat", "email": "octo@example.com", "date": "2025-11-13T10:00:00Z"},
+            "tree": {"sha": "tree1", "url": "https://api.github.com/tree1"},
+        },
+        "parents": [{"sha": "parent1", "url": "https://api.github.com/parent1"}],
+        "stats": {"total": 12, "additions": 10, "deletions": 2},
+        "files": [
+            {
+                "sha": "f1",
+                "filename": "src/parser.py",
+                "status": "added",
+                "additions": 10,
+                "deletions": 0,
+                "changes": 10,
+                "blob_url": "https://github.com/blob/f1",
+                "raw_url": "https://github.com/raw/f1",
+                "contents_url": "https://api.github.com/contents/f1",
+                "patch": "@@ -0,0 +1,10 @@\n+import ijson\n" * 50,
+            },
+            {
+                "sha": "f2",
+                "filename": "README.md",
+                "status": "modified",
+                "additions": 0,
+                "deletions": 2,
+                "changes": 2,
+                "patch": "@@ -1,2 +0,0 @@\n-old\n-lines",
+            },
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_parse_keeps_commit_metadata(commit_payload: dict) -> None:
+    commit = await parse_commit_detail_stream(chunked(commit_payload))
+
+    assert commit.sha == "abc123"
+    assert commit.author.login == "octocat"
+    assert commit.commit.message == "feat: add parser"
+    assert commit.commit.author.email == "octo@example.com"
+    assert commit.stats.total == 12
+
+
+@pytest.mark.asyncio
+async def test_parse_keeps_only_file_counts(commit_payload: dict) -> None:
+    """Per-file patch bodies and URLs are discarded while parsing."""
+    commit = await parse_commit_detail_stream(chunked(commit_payload))
+
+    assert [(f.filename, f.status, f.additions, f.deletions) for f in commit.files] == [
+        ("src/parser.py", "added", 10, 0),
+        ("README.md", "modified", 0, 2),
+    ]
+    assert all(f.patch is None and f.blob_url is None and f.sha is None for f in commit.files)
+
+
+@pytest.mark.asyncio
+async def test_parse_handles_missing_github_author(commit_payload: dict) -> None:
+    """Commits by unknown emails have `author: null`; the parser must keep that as None."""
+    commit_payload["author"] = None
+
+    commit = await parse_commit_detail_stream(chunked(commit_payload, chunk_size=3))
+
+    assert commit.author is None
+    assert commit.commit.author.name == "Octo Cat"
+
+
+@pytest.mark.asyncio
+async def test_parse_commit_detail_switches_to_streaming_past_the_limit(commit_payload: dict) -> None:
+    """Small bodies are validated whole, patches included; larger ones are streamed from where they got to."""
+    size = len(json.dumps(commit_payload).encode())
+
+    whole = await parse_commit_detail(chunked(commit_payload), buffer_limit=size)
+    streamed = await parse_commit_detail(chunked(commit_payload), buffer_limit=size // 2)
+
+    assert whole.files[0].patch is not None
+    assert streamed.files[0].patch is None
+    assert [f.filename for f in streamed.files] == [f.filename for f in whole.files]
+    assert streamed.commit.message == whole.commit.message
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.db.database import engine_options
+from src.db.pool import InstrumentedPool
+
+
+def test_engine_options_only_pass_statement_caches_to_asyncpg() -> None:
+    asyncpg = engine_options("postgresql+asyncpg://u:p@db/app", pool_size=3, max_overflow=2, pool_timeout=5)
+    sqlite = engine_options("sqlite+aiosqlite:///./app.db", pool_size=3, max_overflow=2, pool_timeout=5)
+
+    assert asyncpg["poolclass"] is InstrumentedPool
+    assert (asyncpg["pool_size"], asyncpg["max_overflow"], asyncpg["pool_timeout"]) == (3, 2, 5)
+    assert set(asyncpg["connect_args"]) == {"statement_cache_size", "prepared_statement_cache_size"}
+    assert "connect_args" not in sqlite
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_reports_occupancy_and_timeouts(tmp_path: Path) -> None:
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+            busy = engine.pool.stats("test")
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect() as third:
+                    await third.execute(text("SELECT 1"))
+        idle = engine.pool.stats("test")
+    finally:
+        await engine.dispose()
+
+    assert (busy.checked_out, busy.overflow, busy.checkouts) == (2, 1, 2)
+    # The timed-out attempt is not a checkout, and its wait is kept apart
+    assert (idle.checked_out, idle.timeouts, idle.checkouts) == (0, 1, 2)
+    assert idle.wait_seconds_total == busy.wait_seconds_total
+    assert idle.timeout_wait_seconds_total >= 0.05
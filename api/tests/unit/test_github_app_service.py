@@ -0,0 +1,157 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+from pytest import MonkeyPatch
+
+from src.exceptions.external import GitHubIntegrationError
+from src.schemas.integrations.github import InstallationToken
+from src.services.integrations.github_app_service import GithubAppService
+
+APP_ID = "424242"
+FAKE_API_URL = "http://github.fake"
+
+
+@pytest.fixture(scope="module")
+def rsa_key_pair() -> tuple[str, str]:
+    """Generate a throwaway RSA key pair for signing app JWTs."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode()
+    public_pem = (
+        key.public_key()
+        .public_bytes(encoding=serialization.Encoding.PEM, format=serialization.PublicFormat.SubjectPublicKeyInfo)
+        .decode()
+    )
+    return private_pem, public_pem
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: MonkeyPatch) -> Generator[dict[str, object], None, None]:
+    """In-memory stand-in for the Redis helpers used by the app service."""
+    store: dict[str, object] = {}
+
+    def fake_get(key: str, model: type | None = None) -> object:
+        return store.get(key)
+
+    def fake_set(key: str, value: object, ex: int | None = None) -> None:
+        store[key] = value
+
+    monkeypatch.setattr("src.services.integrations.github_app_service.redis_get", fake_get)
+    monkeypatch.setattr("src.services.integrations.github_app_service.redis_set", fake_set)
+    yield store
+
+
+class FakeGithubTokenEndpoint:
+    """Local fake of GitHub's installation lookup and token-minting endpoints."""
+
+    def __init__(self, public_key: str) -> None:
+        self.public_key = public_key
+        self.minted = 0
+        self.installations = {"big-org": 77}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        claims = jwt.decode(token, self.public_key, algorithms=["RS256"])
+        assert claims["iss"] == APP_ID
+
+        path = request.url.path
+        if request.method == "GET" and path.endswith("/installation"):
+            owner = path.split("/")[2]
+            if owner not in self.installations:
+                return httpx.Response(404, json={"message": "Not Found"})
+            return httpx.Response(200, json={"id": self.installations[owner]})
+
+        if request.method == "POST" and path == "/app/installations/77/access_tokens":
+            self.minted += 1
+            expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+            return httpx.Response(
+                201, json={"token": f"ghs_minted_{self.minted}", "expires_at": expires_at.isoformat()}
+            )
+
+        return httpx.Response(500)
+
+
+@pytest.fixture
+def fake_endpoint(rsa_key_pair: tuple[str, str]) -> FakeGithubTokenEndpoint:
+    return FakeGithubTokenEndpoint(public_key=rsa_key_pair[1])
+
+
+@pytest.fixture
+def app_service(rsa_key_pair: tuple[str, str], fake_endpoint: FakeGithubTokenEndpoint) -> GithubAppService:
+    return GithubAppService(
+        app_id=APP_ID,
+        private_key=rsa_key_pair[0],
+        api_url=FAKE_API_URL,
+        transport=httpx.MockTransport(fake_endpoint),
+    )
+
+
+def test_enabled_requires_credentials() -> None:
+    assert GithubAppService(app_id="", private_key="", api_url=FAKE_API_URL).enabled is False
+
+
+def test_create_app_jwt_is_short_lived(app_service: GithubAppService, rsa_key_pair: tuple[str, str]) -> None:
+    """The app JWT is RS256-signed, issued by the app, and valid for under ten minutes."""
+    claims = jwt.decode(app_service.create_app_jwt(), rsa_key_pair[1], algorithms=["RS256"])
+
+    assert claims["iss"] == APP_ID
+    assert claims["exp"] - claims["iat"] <= 600
+
+
+@pytest.mark.asyncio
+async def test_get_token_for_repo_mints_and_caches(
+    app_service: GithubAppService, fake_endpoint: FakeGithubTokenEndpoint, fake_redis: dict[str, object]
+) -> None:
+    """A covered repo gets an installation token; the second lookup is served from the cache."""
+    first = await app_service.get_token_for_repo(repo_full_name="big-org/service")
+    second = await app_service.get_token_for_repo(repo_full_name="big-org/other-service")
+
+    assert first == "ghs_minted_1"
+    assert second == "ghs_minted_1"
+    assert fake_endpoint.minted == 1
+    assert isinstance(fake_redis["github:app:token:77"], InstallationToken)
+
+
+@pytest.mark.asyncio
+async def test_get_installation_token_refreshes_when_expiring(
+    app_service: GithubAppService, fake_endpoint: FakeGithubTokenEndpoint, fake_redis: dict[str, object]
+) -> None:
+    """Tokens close to expiry are re-minted rather than reused."""
+    fake_redis["github:app:token:77"] = InstallationToken(
+        installation_id=77, token="ghs_stale", expires_at=datetime.now(timezone.utc) + timedelta(minutes=1)
+    )
+
+    token = await app_service.get_installation_token(installation_id=77)
+
+    assert token.token == "ghs_minted_1"
+
+
+@pytest.mark.asyncio
+async def test_get_token_for_repo_without_installation(
+    app_service: GithubAppService, fake_redis: dict[str, object]
+) -> None:
+    """Owners without the app installed fall back to OAuth, and the miss is cached."""
+    assert await app_service.get_token_for_repo(repo_full_name="someone-else/repo") is None
+    assert fake_redis["github:app:installation:someone-else"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_installation_token_error(rsa_key_pair: tuple[str, str], fake_redis: dict[str, object]) -> None:
+    """A failing token endpoint surfaces as a GitHubIntegrationError."""
+    service = GithubAppService(
+        app_id=APP_ID,
+        private_key=rsa_key_pair[0],
+        api_url=FAKE_API_URL,
+        transport=httpx.MockTransport(lambda request: httpx.Response(401, json={"message": "Bad credentials"})),
+    )
+
+    with pytest.raises(GitHubIntegrationError):
+        await service.get_installation_token(installation_id=77)
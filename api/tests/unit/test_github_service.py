@@ -1,11 +1,17 @@
+import gzip
+import json
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
-from src.exceptions.external import GitHubIntegrationError
+from src.core.response_cache import ResponseCache
+from src.db.unit_of_work import UnitOfWork
+from src.exceptions.external import ExternalServiceError, GitHubIntegrationError
 from src.models.integrations import ExternalProfile, PlatformEnum
 from src.models.integrations.external_profiles import SyncStatusEnum
+from src.models.integrations.github.github_repositories import GenerationStatusEnum
 from src.schemas.integrations.github import GithubSyncStatusResponse, GithubToken, RepoCommit, TokenResponse, User
 from src.services.integrations.github_service import GithubService
 
@@ -34,18 +40,37 @@ def mock_timeline_service() -> AsyncMock:
     return AsyncMock()
 
 
+@pytest.fixture
+def mock_github_app_service() -> AsyncMock:
+    """Fixture for a mocked GithubAppService (app mode disabled by default)."""
+    mock = AsyncMock()
+    mock.enabled = False
+    return mock
+
+
+@pytest.fixture
+def mock_db() -> AsyncMock:
+    """Fixture for the AsyncSession behind the unit of work."""
+    return AsyncMock(info={})
+
+
 @pytest.fixture
 def github_service(
     mock_github_repo: AsyncMock,
     mock_external_profile_repo: AsyncMock,
     mock_significance_service: MagicMock,
     mock_timeline_service: AsyncMock,
+    mock_github_app_service: AsyncMock,
+    mock_db: AsyncMock,
 ) -> GithubService:
     return GithubService(
         repo=mock_github_repo,
         external_profile_repo=mock_external_profile_repo,
         analyzer_service=mock_significance_service,
         timeline_service=mock_timeline_service,
+        response_cache=ResponseCache(ttl_seconds=60),
+        app_service=mock_github_app_service,
+        uow=UnitOfWork(mock_db),
     )
 
 
@@ -363,10 +388,7 @@ async def test_fetch_with_semaphore_missing_url(github_service: GithubService) -
             "author": {"name": "octocat", "email": "octocat@example.com", "date": "2025-11-13T00:00:00Z"},
         },
     )
-    client = AsyncMock()
-
-    mock_response = MagicMock()
-    mock_response.json.return_value = {
+    payload = {
         "sha": "abc",
         "url": "https://api.github.com/repos/test/commits/abc",
         "html_url": "https://github.com/test/commit/abc",
@@ -397,15 +419,75 @@ async def test_fetch_with_semaphore_missing_url(github_service: GithubService) -
             }
         ],
     }
-
-    mock_response.raise_for_status.return_value = None
-
-    client.get.return_value = mock_response
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=payload)))
 
     result = await github_service.fetch_with_semaphore(client, commit)
     assert result.sha == "abc"
 
 
+@pytest.mark.asyncio
+async def test_fetch_commit_detail_streams_oversized_payload(
+    github_service: GithubService, mock_significance_service: MagicMock
+) -> None:
+    """Bodies above the threshold are stream-parsed and their patch text is never kept."""
+    github_service.STREAMING_THRESHOLD_BYTES = 100
+    commit = RepoCommit(
+        sha="big",
+        url="https://api.github.com/repos/test/commits/big",
+        html_url="https://github.com/test/commit/big",
+        commit={"message": "Vendor dump"},
+    )
+    payload = {
+        "sha": "big",
+        "url": commit.url,
+        "html_url": commit.html_url,
+        "commit": {"message": "Vendor dump", "author": None},
+        "stats": {"total": 3000, "additions": 3000, "deletions": 0},
+        "files": [
+            {"filename": f"vendor/lib_{i}.js", "status": "added", "additions": 1, "deletions": 0, "patch": "+x" * 500}
+            for i in range(3000)
+        ],
+    }
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=payload)))
+
+    result = await github_service.fetch_commit_detail(client=client, commit=commit)
+
+    assert len(result.files) == 3000
+    assert all(f.patch is None for f in result.files)
+    file_changes = mock_significance_service.analyze_commit.call_args.kwargs["files"]
+    assert file_changes[0].filename == "vendor/lib_0.js"
+
+
+@pytest.mark.asyncio
+async def test_fetch_commit_detail_measures_the_decoded_body(github_service: GithubService) -> None:
+    """A gzipped body is small on the wire; the threshold applies to what it decodes to."""
+    commit = RepoCommit(
+        sha="zip",
+        url="https://api.github.com/repos/test/commits/zip",
+        html_url="https://github.com/test/commit/zip",
+        commit={"message": "Generated code"},
+    )
+    payload = {
+        "sha": "zip",
+        "url": commit.url,
+        "html_url": commit.html_url,
+        "commit": {"message": "Generated code", "author": None},
+        "stats": {"total": 1, "additions": 1, "deletions": 0},
+        "files": [{"filename": "gen.py", "status": "added", "additions": 1, "deletions": 0, "patch": "+x" * 50_000}],
+    }
+    body = gzip.compress(json.dumps(payload).encode())
+    github_service.STREAMING_THRESHOLD_BYTES = len(body) * 2
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=body, headers={"Content-Encoding": "gzip"})
+        )
+    )
+
+    result = await github_service.fetch_commit_detail(client=client, commit=commit)
+
+    assert [(f.filename, f.patch) for f in result.files] == [("gen.py", None)]
+
+
 @pytest.mark.asyncio
 async def test_get_commits_by_repo_id_success(
     github_service: GithubService, mock_external_profile_repo: AsyncMock, mock_github_repo: AsyncMock
@@ -426,7 +508,7 @@ async def test_get_commits_by_repo_id_success(
 
     # Mock Commits return
     mock_commits = [MagicMock(), MagicMock()]
-    mock_github_repo.get_commits_by_repo_id.return_value = mock_commits
+    mock_github_repo.get_commit_summaries_by_repo_id.return_value = mock_commits
 
     # --- Execute ---
     result = await github_service.get_commits_by_repo_id(repo_id, user_id)
@@ -438,7 +520,9 @@ async def test_get_commits_by_repo_id_success(
     )
 
     # 2. Verify repo lookup using the retrieved profile ID
-    mock_github_repo.get_commits_by_repo_id.assert_called_once_with(repo_id=repo_id, external_profile_id=profile_id)
+    mock_github_repo.get_commit_summaries_by_repo_id.assert_called_once_with(
+        repo_id=repo_id, external_profile_id=profile_id
+    )
 
     # 3. Verify final output
     assert result == mock_commits
@@ -471,7 +555,7 @@ async def test_generate_timeline_for_repo_success(
     mock_external_profile_repo.get_external_profile_by_user_id.return_value = mock_profile
 
     # Mock commits as a list of real/mocked objects that won't fail validation
-    mock_github_repo.get_commits_by_repo_id.return_value = [MagicMock(), MagicMock()]
+    mock_github_repo.get_commit_summaries_by_repo_id.return_value = [MagicMock(), MagicMock()]
 
     # Mock timeline creation return value
     created_timeline = MagicMock()
@@ -484,7 +568,10 @@ async def test_generate_timeline_for_repo_success(
     # --- Assert ---
     mock_timeline_service.create_timeline.assert_called_once()
     mock_timeline_service.generate_nodes_for_commits.assert_called_once_with(
-        commits=mock_github_repo.get_commits_by_repo_id.return_value, timeline_id=99, repo_id=101, user_id=user_id
+        commits=mock_github_repo.get_commit_summaries_by_repo_id.return_value,
+        timeline_id=99,
+        repo_id=101,
+        user_id=user_id,
     )
 
 
@@ -505,12 +592,43 @@ async def test_generate_github_timelines_multiple_repos(
     # Patch the single-repo method so we don't run the full logic twice
     with patch.object(github_service, "generate_timeline_for_repo", new_callable=AsyncMock) as mock_single_gen:
         # --- Execute ---
-        await github_service.generate_github_timelines(token_data=token_data, repository_ids=[101, 102])
+        await github_service.generate_github_timelines(token_data=token_data, leases={101: 7, 102: 3})
 
         # --- Assert ---
         assert mock_single_gen.call_count == 2
         mock_single_gen.assert_any_call(repo=repo1, token_data=token_data)
         mock_single_gen.assert_any_call(repo=repo2, token_data=token_data)
+        mock_github_repo.release_generation_leases.assert_any_await(
+            leases={101: 7, 102: 3}, status=GenerationStatusEnum.COMPLETED
+        )
+
+
+@pytest.mark.asyncio
+async def test_generate_github_timelines_failure_releases_leases(
+    github_service: GithubService, mock_external_profile_repo: AsyncMock, mock_github_repo: AsyncMock
+) -> None:
+    """A failing repo is released as FAILED, finished ones as COMPLETED and unreached ones back to IDLE."""
+    # --- Setup ---
+    token_data = MagicMock(sub=1)
+    mock_external_profile_repo.get_external_profile_by_user_id.return_value = MagicMock(id=50)
+    repos = [MagicMock(id=101), MagicMock(id=102), MagicMock(id=103)]
+    mock_github_repo.get_repositories_by_ids.return_value = repos
+    leases = {101: 1, 102: 1, 103: 1}
+
+    with (
+        patch.object(
+            github_service, "generate_timeline_for_repo", AsyncMock(side_effect=[None, ValueError("boom"), None])
+        ),
+        pytest.raises(ValueError),
+    ):
+        # --- Execute ---
+        await github_service.generate_github_timelines(token_data=token_data, leases=leases)
+
+    # --- Assert ---
+    release = mock_github_repo.release_generation_leases
+    release.assert_any_await(leases={102: 1}, status=GenerationStatusEnum.FAILED, error="boom")
+    release.assert_any_await(leases={101: 1}, status=GenerationStatusEnum.COMPLETED)
+    release.assert_any_await(leases={102: 1, 103: 1}, status=GenerationStatusEnum.IDLE)
 
 
 @pytest.mark.asyncio
@@ -523,7 +641,7 @@ async def test_generate_github_timelines_no_profile(
 
     # --- Execute & Assert ---
     with pytest.raises(GitHubIntegrationError) as exc:
-        await github_service.generate_github_timelines(token_data=token_data, repository_ids=[101, 102])
+        await github_service.generate_github_timelines(token_data=token_data, leases={101: 1, 102: 1})
 
     assert exc.value.details["error"] == "GitHub external profile not found"
 
@@ -571,36 +689,54 @@ async def test_get_sync_status_connected(
 
 
 @pytest.mark.asyncio
-async def test_attempt_sync_lock_success(github_service: GithubService, mock_external_profile_repo: AsyncMock) -> None:
-    """Test successfully acquiring a sync lock."""
+async def test_get_sync_status_does_not_repair_state(
+    github_service: GithubService, mock_external_profile_repo: AsyncMock
+) -> None:
+    """Status reads never write; expired syncs are handled by the lease reaper."""
+    mock_profile = MagicMock(spec=ExternalProfile)
+    mock_profile.sync_status = SyncStatusEnum.SYNCING
+    mock_profile.last_synced_at = None
+    mock_profile.last_sync_error = None
+
+    with patch.object(github_service, "get_external_profile", return_value=mock_profile):
+        result = await github_service.get_sync_status(123)
+
+    assert result.sync_status == SyncStatusEnum.SYNCING
+    mock_external_profile_repo.set_sync_status.assert_not_called()
+    mock_external_profile_repo.release_sync_lease.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_acquire_sync_lease_success(github_service: GithubService, mock_external_profile_repo: AsyncMock) -> None:
+    """Test successfully acquiring a sync lease."""
     # --- Setup ---
     profile_id = 50
-    mock_external_profile_repo.attempt_sync_lock.return_value = True
+    mock_external_profile_repo.acquire_sync_lease.return_value = 4
 
     # --- Execute ---
-    result = await github_service.attempt_sync_lock(profile_id)
+    result = await github_service.acquire_sync_lease(profile_id)
 
     # --- Assert ---
-    mock_external_profile_repo.attempt_sync_lock.assert_called_once_with(
-        profile_id=profile_id, platform=PlatformEnum.GITHUB
+    mock_external_profile_repo.acquire_sync_lease.assert_called_once_with(
+        profile_id=profile_id, platform=PlatformEnum.GITHUB, ttl=github_service.LEASE_TTL
     )
-    assert result is True
+    assert result == 4
 
 
 @pytest.mark.asyncio
-async def test_attempt_sync_lock_already_locked(
+async def test_acquire_sync_lease_already_held(
     github_service: GithubService, mock_external_profile_repo: AsyncMock
 ) -> None:
-    """Test failing to acquire a lock because a sync is already in progress."""
+    """Test failing to acquire a lease because a sync is already in progress."""
     # --- Setup ---
     profile_id = 50
-    mock_external_profile_repo.attempt_sync_lock.return_value = False
+    mock_external_profile_repo.acquire_sync_lease.return_value = None
 
     # --- Execute ---
-    result = await github_service.attempt_sync_lock(profile_id)
+    result = await github_service.acquire_sync_lease(profile_id)
 
     # --- Assert ---
-    assert result is False
+    assert result is None
 
 
 @pytest.mark.asyncio
@@ -694,7 +830,10 @@ async def test_revoke_github_access_api_error(mock_async_client: MagicMock, gith
 
 @pytest.mark.asyncio
 async def test_disconnect_github_full_success(
-    github_service: GithubService, mock_external_profile_repo: AsyncMock
+    github_service: GithubService,
+    mock_github_repo: AsyncMock,
+    mock_external_profile_repo: AsyncMock,
+    mock_timeline_service: AsyncMock,
 ) -> None:
     """Test successful disconnect including token revocation."""
     # --- Setup ---
@@ -712,6 +851,8 @@ async def test_disconnect_github_full_success(
 
         # --- Assert ---
         mock_revoke.assert_called_once_with("valid_token")
+        mock_timeline_service.unlink_github_profile.assert_called_once_with(external_profile_id=profile_id)
+        mock_github_repo.delete_commits_by_profile_id.assert_called_once_with(external_profile_id=profile_id)
         mock_external_profile_repo.delete_external_profile.assert_called_once_with(profile_id=profile_id)
 
 
@@ -766,3 +907,138 @@ async def test_disconnect_github_profile_not_found(
 
     # Access the 'details' attribute instead of the string representation
     assert exc.value.details["error"] == "GitHub external profile not found"
+
+
+# --- Tests for run_scheduled_sync ---
+
+
+@pytest.mark.asyncio
+async def test_run_scheduled_sync_runs_under_lease(
+    github_service: GithubService, mock_external_profile_repo: AsyncMock
+) -> None:
+    """A leased profile gets its token refreshed and a sync run under the same fencing token."""
+    mock_profile = MagicMock(spec=ExternalProfile, id=5)
+    mock_external_profile_repo.get_external_profile_by_id.return_value = mock_profile
+
+    with (
+        patch.object(github_service, "get_valid_access_token", AsyncMock(return_value="fresh_token")),
+        patch.object(github_service, "run_full_sync", AsyncMock()) as mock_run_full_sync,
+    ):
+        result = await github_service.run_scheduled_sync(profile_id=5, lease_token=9)
+
+    assert result is True
+    mock_run_full_sync.assert_awaited_once_with(access_token="fresh_token", github_profile=mock_profile, lease_token=9)
+
+
+@pytest.mark.asyncio
+async def test_run_scheduled_sync_skips_missing_profile(
+    github_service: GithubService, mock_external_profile_repo: AsyncMock
+) -> None:
+    """Profiles deleted after being scheduled are skipped."""
+    mock_external_profile_repo.get_external_profile_by_id.return_value = None
+
+    with patch.object(github_service, "run_full_sync", AsyncMock()) as mock_run_full_sync:
+        result = await github_service.run_scheduled_sync(profile_id=5, lease_token=9)
+
+    assert result is False
+    mock_run_full_sync.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_scheduled_sync_token_failure_releases_lease(
+    github_service: GithubService, mock_external_profile_repo: AsyncMock
+) -> None:
+    """If the token cannot be refreshed the lease is released as FAILED instead of waiting for the reaper."""
+    mock_external_profile_repo.get_external_profile_by_id.return_value = MagicMock(spec=ExternalProfile, id=5)
+
+    with (
+        patch.object(
+            github_service, "get_valid_access_token", AsyncMock(side_effect=GitHubIntegrationError("expired"))
+        ),
+        pytest.raises(GitHubIntegrationError),
+    ):
+        await github_service.run_scheduled_sync(profile_id=5, lease_token=9)
+
+    mock_external_profile_repo.release_sync_lease.assert_awaited_once_with(
+        profile_id=5, lease_token=9, status=SyncStatusEnum.FAILED, error="expired"
+    )
+
+
+# --- Tests for get_repo_client ---
+
+
+@pytest.mark.asyncio
+async def test_get_repo_client_oauth_when_app_disabled(github_service: GithubService) -> None:
+    """Without GitHub App credentials every repo call stays on the OAuth client."""
+    oauth_client = httpx.AsyncClient(headers={"Authorization": "Bearer oauth"})
+
+    repo_client = await github_service.get_repo_client(
+        client=oauth_client, repo_full_name="octo/repo", installation_clients={}
+    )
+
+    assert repo_client is oauth_client
+    await oauth_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_repo_client_uses_installation_token(
+    github_service: GithubService, mock_github_app_service: AsyncMock
+) -> None:
+    """Repos covered by an installation share one client carrying the installation token."""
+    mock_github_app_service.enabled = True
+    mock_github_app_service.get_token_for_repo.return_value = "ghs_installation"
+    oauth_client = httpx.AsyncClient(headers={"Authorization": "Bearer oauth", "Accept": "application/json"})
+    installation_clients: dict[str, httpx.AsyncClient] = {}
+
+    first = await github_service.get_repo_client(
+        client=oauth_client, repo_full_name="org/one", installation_clients=installation_clients
+    )
+    second = await github_service.get_repo_client(
+        client=oauth_client, repo_full_name="org/two", installation_clients=installation_clients
+    )
+
+    assert first is second
+    assert first.headers["Authorization"] == "Bearer ghs_installation"
+    assert first.headers["Accept"] == "application/json"
+    await first.aclose()
+    await oauth_client.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [GitHubIntegrationError("boom"), ExternalServiceError("redis down")])
+async def test_get_repo_client_falls_back_to_oauth_on_app_error(
+    github_service: GithubService, mock_github_app_service: AsyncMock, error: Exception
+) -> None:
+    """An installation lookup or token cache failure degrades to OAuth instead of failing the sync."""
+    mock_github_app_service.enabled = True
+    mock_github_app_service.get_token_for_repo.side_effect = error
+    oauth_client = httpx.AsyncClient()
+
+    repo_client = await github_service.get_repo_client(
+        client=oauth_client, repo_full_name="org/one", installation_clients={}
+    )
+
+    assert repo_client is oauth_client
+    await oauth_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sync_solo_commits_commits_each_repo_with_its_sync_time(
+    github_service: GithubService, mock_github_repo: AsyncMock, mock_db: AsyncMock
+) -> None:
+    """A repo's commits and its new sync time are written in one transaction, so they never drift apart."""
+    writes: list[str] = []
+    mock_github_repo.bulk_upsert_commit_details.side_effect = lambda **kwargs: writes.append("upsert")
+    mock_github_repo.update_repo_sync_time.side_effect = lambda **kwargs: writes.append("sync_time")
+    mock_db.commit.side_effect = lambda: writes.append("commit")
+    repos = [MagicMock(id=1, is_fork=False, full_name="octo/one"), MagicMock(id=2, is_fork=False, full_name="octo/two")]
+
+    with (
+        patch.object(github_service, "fetch_author_commits_for_repo", new_callable=AsyncMock, return_value=["c"]),
+        patch.object(github_service, "fetch_details_for_commits", new_callable=AsyncMock, return_value=["detail"]),
+    ):
+        await github_service.sync_solo_commits(
+            client=httpx.AsyncClient(), username="octo", external_profile_id=10, db_repos=repos
+        )
+
+    assert writes == ["upsert", "sync_time", "commit"] * 2
@@ -0,0 +1,74 @@
+import random
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.workers.scheduler import GithubSyncScheduler
+
+
+@pytest.fixture
+def mock_sync_worker() -> AsyncMock:
+    """Fixture for a mocked scheduled sync worker."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def scheduler(mock_sync_worker: AsyncMock) -> GithubSyncScheduler:
+    return GithubSyncScheduler(
+        interval=timedelta(hours=6),
+        window=timedelta(minutes=10),
+        jitter_seconds=30,
+        batch_size=50,
+        concurrency=2,
+        session_factory=AsyncMock(),
+        sync_worker=mock_sync_worker,
+        rng=random.Random(42),  # noqa: S311
+    )
+
+
+def test_plan_staggers_profiles_across_window(scheduler: GithubSyncScheduler) -> None:
+    """Each profile gets its own slot in the window, and jitter never leaves that slot."""
+    plan = scheduler.plan([11, 22, 33, 44])
+
+    assert [profile_id for _, profile_id in plan] == [11, 22, 33, 44]
+
+    slot = scheduler.window.total_seconds() / 4
+    for index, (offset, _) in enumerate(plan):
+        assert index * slot <= offset <= index * slot + 30
+
+
+def test_plan_caps_jitter_to_slot_size(scheduler: GithubSyncScheduler) -> None:
+    """With many profiles the jitter shrinks so offsets stay ordered and inside the window."""
+    plan = scheduler.plan(list(range(100)))
+    offsets = [offset for offset, _ in plan]
+
+    assert offsets == sorted(offsets)
+    assert offsets[-1] <= scheduler.window.total_seconds()
+
+
+def test_plan_empty(scheduler: GithubSyncScheduler) -> None:
+    assert scheduler.plan([]) == []
+
+
+@pytest.mark.asyncio
+@patch("src.workers.scheduler.asyncio.sleep", new_callable=AsyncMock)
+async def test_run_once_dispatches_due_profiles(
+    mock_sleep: AsyncMock, scheduler: GithubSyncScheduler, mock_sync_worker: AsyncMock
+) -> None:
+    """Every due profile is handed to the worker after sleeping for its planned offset."""
+    with patch.object(scheduler, "select_due_profiles", AsyncMock(return_value=[7, 8])):
+        scheduled = await scheduler.run_once()
+
+    assert scheduled == 2
+    assert sorted(call.args[0] for call in mock_sync_worker.call_args_list) == [7, 8]
+    assert mock_sleep.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_run_once_nothing_due(scheduler: GithubSyncScheduler, mock_sync_worker: AsyncMock) -> None:
+    with patch.object(scheduler, "select_due_profiles", AsyncMock(return_value=[])):
+        scheduled = await scheduler.run_once()
+
+    assert scheduled == 0
+    mock_sync_worker.assert_not_called()
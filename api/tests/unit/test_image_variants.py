@@ -0,0 +1,45 @@
+import io
+
+from PIL import Image
+
+from src.schemas.media import MediaVariant
+from src.services.media.image_variants import render_variants
+
+
+def make_image(size: tuple[int, int], mode: str = "RGB", fmt: str = "PNG") -> bytes:
+    out = io.BytesIO()
+    Image.new(mode, size, color="red" if mode == "RGB" else None).save(out, format=fmt)
+    return out.getvalue()
+
+
+def decode(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def test_variants_are_webp_scaled_to_their_longest_side() -> None:
+    rendered = render_variants(make_image((2000, 1000)), list(MediaVariant))
+
+    sizes = {variant: (decode(data).format, decode(data).size) for variant, data in rendered.items()}
+    assert sizes == {
+        MediaVariant.THUMB: ("WEBP", (320, 160)),
+        MediaVariant.MEDIUM: ("WEBP", (1280, 640)),
+        MediaVariant.WEBP: ("WEBP", (2000, 1000)),
+    }
+
+
+def test_small_images_are_not_upscaled() -> None:
+    rendered = render_variants(make_image((100, 50)), [MediaVariant.THUMB])
+
+    assert decode(rendered[MediaVariant.THUMB]).size == (100, 50)
+
+
+def test_transparency_is_kept() -> None:
+    rendered = render_variants(make_image((64, 64), mode="RGBA"), [MediaVariant.THUMB])
+
+    assert decode(rendered[MediaVariant.THUMB]).mode == "RGBA"
+
+
+def test_bytes_that_are_not_an_image_render_nothing() -> None:
+    assert render_variants(b"%PDF-1.7 not an image", list(MediaVariant)) == {}
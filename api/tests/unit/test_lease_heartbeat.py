@@ -0,0 +1,90 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.exceptions.lease import LeaseLostError
+from src.workers.lease import LeaseHeartbeat
+
+
+@asynccontextmanager
+async def fake_session() -> AsyncGenerator[MagicMock, None]:
+    yield MagicMock()
+
+
+def make_heartbeat(renewals: list[bool]) -> tuple[LeaseHeartbeat, list[int]]:
+    """Heartbeat whose renewals answer from `renewals` in order, recording each call."""
+    calls: list[int] = []
+
+    async def renew(db: MagicMock) -> bool:
+        calls.append(1)
+        return renewals[min(len(calls), len(renewals)) - 1]
+
+    return LeaseHeartbeat(renew=renew, interval=0.01, session_factory=fake_session), calls
+
+
+@pytest.mark.asyncio
+async def test_run_returns_work_result_and_renews_meanwhile() -> None:
+    heartbeat, calls = make_heartbeat(renewals=[True])
+
+    async def work() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    assert await heartbeat.run(work()) == "done"
+    assert len(calls) >= 2
+
+
+@pytest.mark.asyncio
+async def test_run_cancels_work_when_lease_is_lost() -> None:
+    """Once a renewal fails the guarded work is cancelled and the loss is surfaced."""
+    heartbeat, _ = make_heartbeat(renewals=[True, False])
+    cancelled = asyncio.Event()
+
+    async def work() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(LeaseLostError):
+        await heartbeat.run(work())
+
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_run_retries_transient_renewal_errors() -> None:
+    """A flaky database does not cost the lease; only an explicit rejection does."""
+    attempts: list[int] = []
+
+    async def renew(db: MagicMock) -> bool:
+        attempts.append(1)
+        if len(attempts) == 1:
+            message = "db blip"
+            raise ConnectionError(message)
+        return True
+
+    heartbeat = LeaseHeartbeat(renew=renew, interval=0.01, session_factory=fake_session)
+
+    async def work() -> int:
+        await asyncio.sleep(0.05)
+        return 42
+
+    assert await heartbeat.run(work()) == 42
+    assert len(attempts) >= 2
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_work_errors() -> None:
+    heartbeat, _ = make_heartbeat(renewals=[True])
+
+    async def work() -> None:
+        message = "sync failed"
+        raise ValueError(message)
+
+    with pytest.raises(ValueError, match="sync failed"):
+        await heartbeat.run(work())
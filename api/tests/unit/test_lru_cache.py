@@ -0,0 +1,43 @@
+from src.core.lru_cache import BytesLRUCache, LRUCache
+
+
+def test_least_recently_used_entries_are_evicted_to_fit_the_budget() -> None:
+    cache = BytesLRUCache(max_bytes=10)
+    cache.put("a", b"aaaa", "image/png")
+    cache.put("b", b"bbbb", "image/png")
+    assert cache.get("a") == (b"aaaa", "image/png")  # "b" is now the least recently used
+
+    cache.put("c", b"cccc", "image/webp")
+
+    assert cache.get("b") is None
+    assert (len(cache), cache.size_bytes) == (2, 8)
+
+
+def test_replacing_an_entry_keeps_the_size_accurate() -> None:
+    cache = BytesLRUCache(max_bytes=10)
+    cache.put("a", b"aaaa", "image/png")
+    cache.put("a", b"aa", "image/png")
+
+    assert (len(cache), cache.size_bytes) == (1, 2)
+
+
+def test_entries_larger_than_the_budget_are_not_cached() -> None:
+    cache = BytesLRUCache(max_bytes=10)
+    cache.put("a", b"aaaa", "image/png")
+    cache.put("huge", b"x" * 11, "image/png")
+
+    assert cache.get("huge") is None
+    assert cache.get("a") is not None
+
+
+def test_object_cache_evicts_the_least_recently_used_entry() -> None:
+    cache: LRUCache[dict] = LRUCache(max_entries=2)
+    cache.put("a", {"lanes": 1})
+    cache.put("b", {"lanes": 2})
+    assert cache.get("a") == {"lanes": 1}  # "b" is now the least recently used
+
+    cache.put("c", {"lanes": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is cache.get("a")
+    assert len(cache) == 2
@@ -0,0 +1,136 @@
+import hashlib
+import io
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from src.exceptions.media import MediaNotFoundError, MediaTooLargeError
+from src.schemas.media import MediaVariant, media_key
+from src.services.media.local_store import LocalMediaStore
+from src.services.media.media_service import MediaService
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> LocalMediaStore:
+    return LocalMediaStore(root=tmp_path)
+
+
+@pytest.fixture
+def media_service(store: LocalMediaStore) -> MediaService:
+    return MediaService(store, chunk_size=4)
+
+
+def make_upload(data: bytes, content_type: str | None = "image/png") -> UploadFile:
+    headers = Headers({"content-type": content_type}) if content_type else None
+    return UploadFile(file=io.BytesIO(data), filename="shot.png", headers=headers)
+
+
+def stored_files(store: LocalMediaStore) -> list[Path]:
+    return [path for path in store.root.rglob("*") if path.is_file()]
+
+
+@pytest.mark.asyncio
+async def test_ingest_stores_the_upload_under_its_hash(media_service: MediaService, store: LocalMediaStore) -> None:
+    data = b"0123456789"
+
+    stored = await media_service.ingest(make_upload(data), max_bytes=100)
+
+    assert stored.content_hash == hashlib.sha256(data).hexdigest()
+    assert (stored.size_bytes, stored.media_type, stored.filename) == (10, "image/png", "shot.png")
+    assert await media_service.read(stored.content_hash) == data
+    # The staged copy was moved into place, not left behind
+    assert stored_files(store) == [store.path(stored.content_hash)]
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_are_stored_once(media_service: MediaService, store: LocalMediaStore) -> None:
+    first = await media_service.ingest(make_upload(b"same bytes"), max_bytes=100)
+    second = await media_service.ingest(make_upload(b"same bytes", content_type=None), max_bytes=100)
+
+    assert first.content_hash == second.content_hash
+    assert second.media_type == "application/octet-stream"
+    assert len(stored_files(store)) == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_stops_reading_once_over_the_limit(media_service: MediaService, store: LocalMediaStore) -> None:
+    upload = make_upload(b"x" * 1000)
+
+    with pytest.raises(MediaTooLargeError) as exc_info:
+        await media_service.ingest(upload, max_bytes=10)
+
+    assert exc_info.value.details == {"max_bytes": 10}
+    # Three 4-byte chunks were enough to go over; the rest was never read
+    assert upload.file.tell() == 12
+    assert stored_files(store) == []
+
+
+@pytest.mark.asyncio
+async def test_missing_files_raise_not_found(media_service: MediaService) -> None:
+    with pytest.raises(MediaNotFoundError):
+        await media_service.read("ab" * 32)
+    with pytest.raises(MediaNotFoundError):
+        await media_service.serve("ab" * 32, "image/png", {})
+
+
+@pytest.mark.asyncio
+async def test_serve_streams_the_file_with_the_given_headers(media_service: MediaService) -> None:
+    stored = await media_service.ingest(make_upload(b"0123456789"), max_bytes=100)
+
+    response = await media_service.serve(stored.content_hash, "image/png", {"ETag": '"abc"'})
+
+    assert response.headers["etag"] == '"abc"'
+    assert response.headers["content-length"] == "10"
+    assert response.media_type == "image/png"
+
+
+@pytest.mark.asyncio
+async def test_read_small_skips_files_over_the_limit(media_service: MediaService, store: LocalMediaStore) -> None:
+    stored = await media_service.ingest(make_upload(b"0123456789"), max_bytes=100)
+
+    assert await store.read_small(stored.content_hash, max_bytes=10) == b"0123456789"
+    assert await store.read_small(stored.content_hash, max_bytes=9) is None
+    with pytest.raises(MediaNotFoundError):
+        await store.read_small("ab" * 32, max_bytes=10)
+
+
+def make_png(size: tuple[int, int]) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, color="blue").save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_variants_are_rendered_next_to_the_original(media_service: MediaService, store: LocalMediaStore) -> None:
+    stored = await media_service.ingest(make_upload(make_png((800, 400))), max_bytes=10_000_000)
+
+    generated = await media_service.generate_variants(stored.content_hash, stored.media_type)
+
+    assert generated == list(MediaVariant)
+    for variant in MediaVariant:
+        assert await store.exists(media_key(stored.content_hash, variant))
+    # Already rendered variants are not rendered again
+    assert await media_service.generate_variants(stored.content_hash, stored.media_type) == list(MediaVariant)
+
+
+@pytest.mark.asyncio
+async def test_serving_a_missing_variant_renders_it(media_service: MediaService, store: LocalMediaStore) -> None:
+    stored = await media_service.ingest(make_upload(make_png((800, 400))), max_bytes=10_000_000)
+
+    response = await media_service.serve(stored.content_hash, "image/png", {}, variant=MediaVariant.THUMB)
+
+    assert response.media_type == "image/webp"
+    assert await store.exists(media_key(stored.content_hash, MediaVariant.THUMB))
+    assert not await store.exists(media_key(stored.content_hash, MediaVariant.MEDIUM))
+
+
+@pytest.mark.asyncio
+async def test_variants_of_other_media_fall_back_to_the_original(media_service: MediaService) -> None:
+    stored = await media_service.ingest(make_upload(b"%PDF-1.7", content_type="application/pdf"), max_bytes=100)
+
+    assert await media_service.generate_variants(stored.content_hash, stored.media_type) == []
+    response = await media_service.serve(stored.content_hash, stored.media_type, {}, variant=MediaVariant.THUMB)
+    assert response.media_type == "application/pdf"
@@ -0,0 +1,103 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from src.core.response_cache import ResponseCache, etag_matches
+from src.exceptions.external import ExternalServiceError
+
+
+def tag_of(tag: str | None) -> Callable[[], Awaitable[str | None]]:
+    async def current_tag() -> str | None:
+        return tag
+
+    return current_tag
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_build_once(cached_responses: dict[str, str]) -> None:
+    cache = ResponseCache(ttl_seconds=60)
+    builds = 0
+    release = asyncio.Event()
+
+    async def build() -> bytes:
+        nonlocal builds
+        builds += 1
+        await release.wait()
+        return b'{"id":1}'
+
+    requests = [
+        asyncio.create_task(cache.get_or_build("timeline-1-v1", build, tag_of("timeline-1-v1"))) for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*requests) == [b'{"id":1}'] * 5
+    assert builds == 1
+    assert cached_responses == {"response:timeline-1-v1": '{"id":1}'}
+
+
+@pytest.mark.asyncio
+async def test_cached_responses_are_not_rebuilt(cached_responses: dict[str, str]) -> None:
+    cached_responses["response:timeline-1-v2"] = '{"id":1}'
+
+    async def build() -> bytes:
+        pytest.fail("a cached response was rebuilt")
+
+    assert (
+        await ResponseCache(ttl_seconds=60).get_or_build("timeline-1-v2", build, tag_of("timeline-1-v2")) == b'{"id":1}'
+    )
+
+
+@pytest.mark.asyncio
+async def test_a_failed_build_reaches_every_waiter_and_is_not_cached(cached_responses: dict[str, str]) -> None:
+    cache = ResponseCache(ttl_seconds=60)
+    release = asyncio.Event()
+
+    async def build() -> bytes:
+        await release.wait()
+        raise LookupError
+
+    requests = [
+        asyncio.create_task(cache.get_or_build("timeline-1-v3", build, tag_of("timeline-1-v3"))) for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*requests, return_exceptions=True)
+
+    assert [type(result) for result in results] == [LookupError, LookupError]
+    assert cached_responses == {}
+
+
+@pytest.mark.asyncio
+async def test_responses_built_across_a_write_are_not_cached(cached_responses: dict[str, str]) -> None:
+    async def build() -> bytes:
+        return b'{"id":1,"version":5}'
+
+    # The timeline moved on to v5 after the tag was read, so the body built does not belong to v4
+    content = await ResponseCache(ttl_seconds=60).get_or_build("timeline-1-v4", build, tag_of("timeline-1-v5"))
+
+    assert content == b'{"id":1,"version":5}'
+    assert cached_responses == {}
+
+
+@pytest.mark.asyncio
+async def test_responses_are_built_without_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    def unavailable(*args: object, **kwargs: object) -> None:
+        raise ExternalServiceError(details={"error": "down"})
+
+    monkeypatch.setattr("src.core.response_cache.redis_get", unavailable)
+    monkeypatch.setattr("src.core.response_cache.redis_set", unavailable)
+
+    async def build() -> bytes:
+        return b"[]"
+
+    assert await ResponseCache(ttl_seconds=60).get_or_build("timelines-1-v1", build, tag_of("timelines-1-v1")) == b"[]"
+
+
+def test_etag_matching() -> None:
+    assert etag_matches('"a", "timeline-1-v2"', '"timeline-1-v2"')
+    assert etag_matches('W/"timeline-1-v2"', '"timeline-1-v2"')
+    assert etag_matches("*", '"timeline-1-v2"')
+    assert not etag_matches('"timeline-1-v1"', '"timeline-1-v2"')
+    assert not etag_matches(None, '"timeline-1-v2"')
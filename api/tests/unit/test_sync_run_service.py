@@ -0,0 +1,71 @@
+from collections import Counter
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.models.integrations import SyncRunKindEnum
+from src.services.sync_run_service import SyncRunService
+
+
+def usage_row(user_id: int, kind: SyncRunKindEnum, requests_total: int, not_modified: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        user_id=user_id,
+        kind=kind,
+        runs=2,
+        failed_runs=1,
+        duration_ms=60_000,
+        max_duration_ms=45_000,
+        requests_total=requests_total,
+        not_modified_responses=not_modified,
+        bytes_received=1_000_000,
+        rows_written=300,
+        rows_unchanged=50,
+        rate_limited_responses=0,
+        llm_calls=4,
+        llm_tokens=8000,
+    )
+
+
+@pytest.fixture
+def mock_sync_run_repo() -> AsyncMock:
+    return AsyncMock()
+
+
+@pytest.fixture
+def sync_run_service(mock_sync_run_repo: AsyncMock) -> SyncRunService:
+    return SyncRunService(sync_run_repo=mock_sync_run_repo)
+
+
+@pytest.mark.asyncio
+async def test_get_summary_totals_users_and_endpoints(
+    sync_run_service: SyncRunService, mock_sync_run_repo: AsyncMock
+) -> None:
+    mock_sync_run_repo.get_usage_by_user.return_value = [
+        usage_row(user_id=1, kind=SyncRunKindEnum.SYNC, requests_total=300, not_modified=100),
+        usage_row(user_id=2, kind=SyncRunKindEnum.TIMELINE_GENERATION, requests_total=100, not_modified=0),
+    ]
+    mock_sync_run_repo.get_requests_by_endpoint.return_value = Counter({"GET /issues": 10, "GET /users/:user": 1})
+
+    summary = await sync_run_service.get_summary(hours=12)
+
+    assert summary.runs == 4
+    assert summary.failed_runs == 2
+    assert summary.requests_total == 400
+    assert summary.not_modified_ratio == 0.25
+    assert summary.llm_tokens == 16000
+    assert summary.rows_unchanged == 100
+    assert list(summary.requests_by_endpoint) == ["GET /issues", "GET /users/:user"]
+    assert [u.user_id for u in summary.users] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_get_summary_empty_window(sync_run_service: SyncRunService, mock_sync_run_repo: AsyncMock) -> None:
+    mock_sync_run_repo.get_usage_by_user.return_value = []
+    mock_sync_run_repo.get_requests_by_endpoint.return_value = Counter()
+
+    summary = await sync_run_service.get_summary(hours=24)
+
+    assert summary.runs == 0
+    assert summary.not_modified_ratio == 0.0
+    assert summary.users == []
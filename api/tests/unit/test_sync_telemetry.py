@@ -0,0 +1,94 @@
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+
+from src.db.bulk import UpsertResult
+from src.models.integrations import SyncRunKindEnum, SyncRunStatusEnum, SyncRunTriggerEnum
+from src.services import sync_telemetry
+from src.services.sync_telemetry import RecordingTransport, SyncRunRecorder
+
+
+class ChunkedBody(httpx.AsyncByteStream):
+    """Streamed body, like a real network response (in-memory bodies are pre-read by httpx)."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for _ in range(self.size // 100):
+            yield b"x" * 100
+
+
+def fake_github(request: httpx.Request) -> httpx.Response:
+    """Answers like GitHub would for the handful of routes a sync touches."""
+    if request.url.path.startswith("/repos/octo/repo/commits/"):
+        return httpx.Response(200, stream=ChunkedBody(size=1000), headers={"x-ratelimit-remaining": "4990"})
+    if request.url.path == "/users/octo/repos":
+        return httpx.Response(304, headers={"x-ratelimit-remaining": "4999"})
+    return httpx.Response(403, headers={"x-ratelimit-remaining": "0"})
+
+
+@pytest.fixture
+def recorder() -> SyncRunRecorder:
+    return SyncRunRecorder(user_id=1, kind=SyncRunKindEnum.SYNC, trigger=SyncRunTriggerEnum.SCHEDULED)
+
+
+@pytest.mark.asyncio
+async def test_recording_transport_counts_requests_bytes_and_rate_limits(recorder: SyncRunRecorder) -> None:
+    transport = RecordingTransport(recorder=recorder, transport=httpx.MockTransport(fake_github))
+
+    async with httpx.AsyncClient(base_url="https://api.github.com", transport=transport) as client:
+        await client.get("/repos/octo/repo/commits/abc")
+        await client.get("/repos/octo/repo/commits/def")
+        await client.get("/users/octo/repos")
+        await client.get("/issues")
+
+    assert recorder.requests_by_endpoint == {
+        "GET /repos/:owner/:repo/commits/:sha": 2,
+        "GET /users/:user/repos": 1,
+        "GET /issues": 1,
+    }
+    assert recorder.bytes_received == 2000
+    assert recorder.not_modified_responses == 1
+    assert recorder.rate_limited_responses == 1
+    assert recorder.min_rate_limit_remaining == 0
+
+
+def test_helpers_report_into_the_active_run(recorder: SyncRunRecorder) -> None:
+    with recorder.activate():
+        with sync_telemetry.step("repos"):
+            sync_telemetry.record_rows("github_repositories", 3)
+        sync_telemetry.record_upsert("github_commits", UpsertResult(inserted=30, updated=10, unchanged=60))
+        sync_telemetry.record_llm_call(tokens=1200)
+        sync_telemetry.record_llm_call(tokens=None)
+
+    run = recorder.to_model()
+
+    assert "repos" in run.step_durations_ms
+    assert run.rows_written == 43
+    assert run.rows_written_by_table == {"github_repositories": 3, "github_commits": 40}
+    assert run.rows_inserted == 30
+    assert run.rows_unchanged == 60
+    assert run.rows_unchanged_by_table == {"github_commits": 60}
+    assert run.llm_calls == 2
+    assert run.llm_tokens == 1200
+    assert run.status == SyncRunStatusEnum.COMPLETED
+
+
+def test_helpers_are_noops_outside_a_run(recorder: SyncRunRecorder) -> None:
+    """Request handlers share the services with workers; nothing is recorded for them."""
+    sync_telemetry.record_rows("timeline_nodes", 5)
+    sync_telemetry.record_llm_call(tokens=10)
+
+    assert sync_telemetry.current_run() is None
+    assert sync_telemetry.recording_transport() is None
+    assert recorder.rows_written_by_table == {}
+
+
+def test_to_model_records_failure(recorder: SyncRunRecorder) -> None:
+    run = recorder.to_model(error=RuntimeError("GitHub returned 502"))
+
+    assert run.status == SyncRunStatusEnum.FAILED
+    assert run.error == "GitHub returned 502"
+    assert run.duration_ms >= 0
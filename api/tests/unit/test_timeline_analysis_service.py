@@ -1,12 +1,12 @@
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock
 
 import pytest
 
 from src.models.integrations.github.github_commits import SignificanceLevel
 from src.schemas.integrations.ai.timeline_analysis import AnalysisAction, AnalysisResult
 from src.schemas.integrations.analysis.cluster import Cluster
-from src.schemas.integrations.github import CommitInDB
+from src.schemas.integrations.github import CommitSummary
 from src.schemas.timelines import DateGranularity, NodeType, TimelineNodeBase
 from src.services.integrations.ai.timeline_analysis_service import TimelineAnalysisService
 
@@ -28,23 +28,14 @@ def timeline_analysis_service(mock_provider: AsyncMock) -> TimelineAnalysisServi
 @pytest.fixture
 def sample_cluster() -> Cluster:
     """Fixture for a sample cluster object."""
-    mock_item = MagicMock()
-    mock_item.sha = "test_sha_123"
-    mock_item.html_url = "https://github.com/test/commit/123"
-    mock_item.message = "feat: add oauth2 login"
-    mock_item.files = [{"filename": "src/auth.py"}]
-    mock_item.significance_score = 25.5
-    # This must be the actual Enum value or the string equivalent
-    mock_item.significance_classification = SignificanceLevel.FEATURE
-
-    # Add other required fields from CommitInDB if they exist
-    mock_item.external_profile_id = 1
-    mock_item.author_id = 1
-    mock_item.repository_id = 1
-    mock_item.authored_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
-    mock_item.additions = 10
-    mock_item.deletions = 2
-    mock_item.total = 12
+    mock_item = CommitSummary(
+        sha="test_sha_123",
+        message="feat: add oauth2 login",
+        authored_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        significance_score=25.5,
+        significance_classification=SignificanceLevel.FEATURE,
+        filenames=["src/auth.py"],
+    )
 
     return Cluster(
         id="cluster_20260101_auth",
@@ -147,20 +138,13 @@ def test_build_context_capping(timeline_analysis_service: TimelineAnalysisServic
     """
     # Create a cluster with 30 items
     many_items = [
-        CommitInDB(
+        CommitSummary(
             sha=f"sha_{i}",
-            external_profile_id=1,
-            author_id=1,
-            repository_id=1,
             message=f"msg {i}",
             authored_at=datetime.now(),
-            html_url=f"https://github.com/commit/{i}",
-            additions=1,
-            deletions=1,
-            total=2,
-            files=[],  # Empty list is valid
             significance_score=1.0,
             significance_classification=SignificanceLevel.CHORE,
+            filenames=[],  # Empty list is valid
         )
         for i in range(30)
     ]
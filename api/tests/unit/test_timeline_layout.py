@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+from src.services.timeline_layout import NodeSpan, layout_lanes, node_span
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def span(node_id: int, start: int, end: int | None) -> NodeSpan:
+    return node_id, START + timedelta(days=start), START + timedelta(days=end) if end is not None else None
+
+
+def lanes(*spans: NodeSpan) -> dict[int, tuple[int, int]]:
+    layout = layout_lanes(spans, version=3)
+    assert layout.version == 3
+    return {placement.node_id: (placement.lane, placement.group) for placement in layout.placements}
+
+
+def test_each_node_takes_the_lowest_free_lane() -> None:
+    layout = layout_lanes([span(1, 0, 100), span(2, 10, 20), span(3, 30, 40), span(4, 15, 50)], version=1)
+
+    assert [(p.node_id, p.lane, p.group) for p in layout.placements] == [(1, 0, 0), (2, 1, 0), (4, 2, 0), (3, 1, 0)]
+    assert layout.lane_count == 3
+
+
+def test_a_lane_frees_only_after_its_node_has_ended() -> None:
+    # Node 2 starts on the day node 1 ends, so it needs a lane of its own
+    assert lanes(span(1, 0, 10), span(2, 10, 20), span(3, 11, 30)) == {1: (0, 0), 2: (1, 0), 3: (0, 0)}
+
+
+def test_disconnected_runs_of_overlaps_are_separate_groups() -> None:
+    assert lanes(span(1, 0, 10), span(2, 5, 20), span(3, 30, 40), span(4, 50, None), span(5, 900, 901)) == {
+        1: (0, 0),
+        2: (1, 0),
+        3: (0, 1),
+        4: (0, 2),
+        # A node without an end date keeps its lane and its group open
+        5: (1, 2),
+    }
+
+
+def test_ties_on_start_date_are_broken_by_id() -> None:
+    assert lanes(span(9, 0, 5), span(2, 0, 5)) == {2: (0, 0), 9: (1, 0)}
+
+
+def test_naive_dates_are_laid_out_too() -> None:
+    # SQLite hands dates back without an offset
+    naive = [(node_id, start.replace(tzinfo=None), None) for node_id, start, _ in (span(1, 0, None), span(2, 5, None))]
+
+    assert lanes(*naive) == {1: (0, 0), 2: (1, 0)}
+
+
+def test_an_empty_timeline_has_no_lanes() -> None:
+    layout = layout_lanes([], version=1)
+
+    assert (layout.lane_count, layout.placements) == (0, [])
+
+
+def test_a_finished_node_without_an_end_date_is_a_point_in_time() -> None:
+    start = START + timedelta(days=5)
+
+    assert node_span(1, start, None, is_current=False) == (1, start, start)
+    assert node_span(1, start, None, is_current=True) == (1, start, None)
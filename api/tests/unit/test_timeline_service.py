@@ -4,6 +4,9 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 from fastapi import UploadFile
 
+from src.core.lru_cache import LRUCache
+from src.core.response_cache import ResponseCache
+from src.db.unit_of_work import UnitOfWork
 from src.exceptions.timeline import (
     InvalidTimelineNodeError,
     TimelineNotFoundError,
@@ -12,6 +15,7 @@ from src.models.timeline_nodes import TimelineNode
 from src.models.timelines import Timeline
 from src.schemas.integrations.ai.timeline_analysis import AnalysisAction, AnalysisResult
 from src.schemas.integrations.analysis.cluster import Cluster
+from src.schemas.media import StoredMedia
 from src.schemas.timelines import TimelineCreate, TimelineNodeBase, TimelineNodeCreate
 from src.services.auth_service import TokenData
 from src.services.timeline_service import TimelineService
@@ -34,13 +38,35 @@ def mock_ai_service() -> AsyncMock:
     return AsyncMock()
 
 
+@pytest.fixture
+def mock_media_service() -> AsyncMock:
+    """Fixture for a mocked MediaService."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_db() -> AsyncMock:
+    """Fixture for the AsyncSession behind the unit of work."""
+    return AsyncMock(info={})
+
+
 @pytest.fixture
 def timeline_service(
-    mock_timeline_repo: AsyncMock, mock_clustering_service: MagicMock, mock_ai_service: AsyncMock
+    mock_timeline_repo: AsyncMock,
+    mock_clustering_service: MagicMock,
+    mock_ai_service: AsyncMock,
+    mock_media_service: AsyncMock,
+    mock_db: AsyncMock,
 ) -> TimelineService:
     """Fixture for TimelineService with all required dependencies."""
     return TimelineService(
-        timeline_repo=mock_timeline_repo, clustering_service=mock_clustering_service, ai_service=mock_ai_service
+        timeline_repo=mock_timeline_repo,
+        clustering_service=mock_clustering_service,
+        ai_service=mock_ai_service,
+        media_service=mock_media_service,
+        layout_cache=LRUCache(max_entries=16),
+        response_cache=ResponseCache(ttl_seconds=60),
+        uow=UnitOfWork(mock_db),
     )
 
 
@@ -109,7 +135,9 @@ async def test_create_timeline(
 
 # --- Timeline Node Tests ---
 @pytest.mark.asyncio
-async def test_create_timeline_node_success(timeline_service: TimelineService, mock_timeline_repo: AsyncMock) -> None:
+async def test_create_timeline_node_success(
+    timeline_service: TimelineService, mock_timeline_repo: AsyncMock, mock_media_service: AsyncMock
+) -> None:
     user_id = 1
     node_in = TimelineNodeCreate(
         timeline_id=10,
@@ -125,11 +153,14 @@ async def test_create_timeline_node_success(timeline_service: TimelineService, m
         file=MagicMock(read=AsyncMock(return_value=b"fake image data")),
     )
 
+    stored = StoredMedia(content_hash="ab" * 32, size_bytes=15, media_type="image/png", filename="test.png")
+    mock_media_service.ingest.return_value = stored
     mock_timeline_repo.get_timeline_by_id.return_value = MagicMock(id=10)
 
     await timeline_service.create_timeline_node(user_id, node_in, media)
 
-    mock_timeline_repo.create_timeline_node.assert_called_once()
+    mock_media_service.ingest.assert_called_once()
+    assert mock_timeline_repo.create_timeline_node.call_args.kwargs["media"] == stored
 
 
 @pytest.mark.asyncio
@@ -292,26 +323,20 @@ async def test_generate_nodes_for_commits_hierarchy_and_expansion(
     )
     mock_ai_service.analyze_cluster.side_effect = [ai_p, ai_c]
 
-    # --- Parent Mock Fix ---
-    parent_node_db = MagicMock()
-    parent_node_db.id = 55
-    parent_node_db.timeline_id = timeline_id
-    parent_node_db.start_date = cluster_p.start_date
-    parent_node_db.end_date = cluster_p.end_date
-    parent_node_db.is_current = False
-    parent_node_db.parent_id = None
-
     # Mock Repository
     mock_timeline_repo.get_timeline_by_id.return_value = MagicMock(id=timeline_id)
-    mock_timeline_repo.get_timeline_node_by_id.return_value = parent_node_db
-    mock_timeline_repo.get_timeline_node_lite.return_value = parent_node_db
-    mock_timeline_repo.create_timeline_node.side_effect = [parent_node_db, MagicMock(id=56)]
+    mock_timeline_repo.create_timeline_nodes.return_value = [MagicMock(id=55), MagicMock(id=56)]
 
     # --- Execute ---
     await timeline_service.generate_nodes_for_commits([], timeline_id, repo_id, user_id)
 
     # --- Assertions ---
-    assert mock_timeline_repo.create_timeline_node.call_count == 2
-
-    mock_timeline_repo.update_timeline_node.assert_called_once()
-    assert parent_node_db.end_date.date() == cluster_c.end_date.date()
+    # One batch, with the parent already extended to cover the merged child
+    mock_timeline_repo.create_timeline_nodes.assert_called_once()
+    mock_timeline_repo.create_timeline_node.assert_not_called()
+    mock_timeline_repo.update_timeline_node.assert_not_called()
+    parent, child = mock_timeline_repo.create_timeline_nodes.call_args.kwargs["nodes"]
+    assert (parent.parent_index, child.parent_index) == (None, 0)
+    assert parent.end_date.date() == cluster_c.end_date.date()
+    mock_timeline_repo.record_node_changes.assert_called_once()
+    assert mock_timeline_repo.record_node_changes.call_args.kwargs["node_ids"] == [55, 56]
@@ -0,0 +1,42 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.db.unit_of_work import UnitOfWork
+
+
+@pytest.fixture
+def mock_db() -> AsyncMock:
+    return AsyncMock(info={})
+
+
+@pytest.mark.asyncio
+async def test_commits_once_when_the_block_exits_cleanly(mock_db: AsyncMock) -> None:
+    async with UnitOfWork(mock_db):
+        mock_db.commit.assert_not_awaited()
+
+    mock_db.commit.assert_awaited_once()
+    mock_db.rollback.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_rolls_back_when_the_block_raises(mock_db: AsyncMock) -> None:
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(mock_db):
+            raise RuntimeError
+
+    mock_db.rollback.assert_awaited_once()
+    mock_db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_only_the_outermost_block_commits(mock_db: AsyncMock) -> None:
+    outer, inner = UnitOfWork(mock_db), UnitOfWork(mock_db)
+    async with outer:
+        async with inner:
+            pass
+        async with inner:
+            pass
+        mock_db.commit.assert_not_awaited()
+
+    mock_db.commit.assert_awaited_once()